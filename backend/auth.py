@@ -1,12 +1,14 @@
 import os
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from backend.cache import TTLCache
+from backend.database import get_async_db
+from backend.passwords import password_hasher
 from backend.models import User, UserRole
 
 SECRET_KEY = os.getenv("SESSION_SECRET")
@@ -16,14 +18,35 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+# Resolved users keyed by token subject (email). Entries are detached
+# snapshots merged into each request's session, so a hit costs no query. The
+# cache is per process: writes that change a user call invalidate_user(), and
+# the TTL bounds staleness for changes made by other workers.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return password_hasher.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+# Awaitable variants for async endpoints: the event loop keeps serving
+# other requests while the hash runs on the pool.
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.verify_and_update_async(plain_password, hashed_password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return (await verify_and_update_password_async(plain_password, hashed_password))[0]
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -42,7 +65,17 @@ def create_refresh_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    # The user is loaded into the request's session, so endpoints can modify
+    # and commit it through the same `db` dependency.
+    return await db.run_sync(lambda session: authenticate_token(token, session))
+
+def authenticate_token(token: str, db: Session) -> User:
+    """
+    Resolve an access token to its user, raising 401 if the token is invalid
+    or the user no longer exists. Used directly by endpoints that cannot take
+    the token from the Authorization header (e.g. EventSource streams).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,12 +90,31 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
+    cached = user_cache.get(email)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
+    user_cache.set(email, _snapshot(user))
     return user
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+def _snapshot(user: User) -> User:
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_user(*emails: Optional[str]) -> None:
+    """
+    Drop cached users after a write that changes them (profile, role,
+    deletion). Pass both the old and new email when the email changes.
+    """
+    for email in emails:
+        if email:
+            user_cache.invalidate(email)
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != UserRole.admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,117 @@
+"""
+Throughput of a sync endpoint (def + blocking Session on the threadpool)
+against the same endpoint written async (async def + AsyncSession.run_sync),
+under many concurrent connections:
+
+    python -m backend.bench.async_db --concurrency 1000 --requests 5000
+
+Both run the same query through the app's engines (DATABASE_URL) and are
+driven in-process over ASGI, so the numbers are server-side only. Pass a
+query that waits on the server, e.g. --query "SELECT pg_sleep(0.02)" on
+PostgreSQL, to see how each model behaves when the database is slow: the
+sync endpoint can only have as many queries in flight as it has threadpool
+workers, while the async one is bounded by the connection pool alone.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.database import async_engine, engine, get_async_db, get_db
+
+DEFAULT_QUERY = "SELECT id, name, department FROM users ORDER BY id LIMIT 20"
+
+def build_app(query: str) -> FastAPI:
+    app = FastAPI()
+    statement = text(query)
+
+    def run(db: Session) -> int:
+        return len(db.execute(statement).all())
+
+    @app.get("/sync")
+    def sync_endpoint(db: Session = Depends(get_db)):
+        return {"rows": run(db)}
+
+    @app.get("/async")
+    async def async_endpoint(db: AsyncSession = Depends(get_async_db)):
+        return {"rows": await db.run_sync(run)}
+
+    return app
+
+async def _request(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return result["status"]
+
+async def _measure(app, path: str, requests: int, concurrency: int) -> Dict[str, object]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(requests))
+
+    async def connection():
+        # Each task is one client connection issuing requests back to back.
+        for _ in remaining:
+            started = time.perf_counter()
+            status = await _request(app, path)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "statuses": statuses,
+    }
+
+async def _run(query: str, requests: int, concurrency: int) -> Dict[str, object]:
+    app = build_app(query)
+    results = {}
+    for name, path in (("sync", "/sync"), ("async", "/async")):
+        await _measure(app, path, min(requests, 100), min(concurrency, 10))  # warm up pools
+        results[name] = await _measure(app, path, requests, concurrency)
+    await async_engine.dispose()
+    return {
+        "database": engine.url.get_backend_name(),
+        "query": query,
+        "requests": requests,
+        "concurrency": concurrency,
+        **results,
+    }
+
+def run(query: str, requests: int, concurrency: int) -> Dict[str, object]:
+    return asyncio.run(_run(query, requests, concurrency))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async endpoint throughput.")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.query, args.requests, args.concurrency), indent=2))
+
+if __name__ == "__main__":
+    main()
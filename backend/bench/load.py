@@ -0,0 +1,235 @@
+"""
+Load test of the main endpoints against a board written by backend.bench.seed:
+
+    python -m backend.bench.seed --database-url sqlite:///bench.db --reset
+    python -m backend.bench.load --database-url sqlite:///bench.db --concurrency 50 --requests 2000 > before.json
+
+Each scenario runs on its own at a fixed concurrency, with requests spread
+over a random sample of seeded users:
+
+    feed           GET /api/shoutouts, half of them filtered by department
+    tagged         GET /api/users/me/tagged
+    reactions      POST /api/shoutouts/{id}/reactions on random shout-outs
+    notifications  GET /api/notifications
+    admin_stats    GET /api/admin/stats as the seeded admin, varying window and department
+    login          POST /api/auth/login with the seeded password
+
+The app runs in-process over ASGI, with its lifespan, so the numbers are
+server-side only. Statement counts and database time come from
+backend.profiling. The JSON output includes the git commit, so results can
+be compared between commits. The same --seed sends the same requests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from backend.bench.login import percentile
+from backend.bench.seed import ADMIN_EMAIL, DEFAULT_DATABASE_URL, DEFAULT_PASSWORD, use_database
+
+ENDPOINTS = {
+    "feed": "GET /api/shoutouts",
+    "tagged": "GET /api/users/me/tagged",
+    "reactions": "POST /api/shoutouts/{shoutout_id}/reactions",
+    "notifications": "GET /api/notifications",
+    "admin_stats": "GET /api/admin/stats",
+    "login": "POST /api/auth/login",
+}
+SCENARIOS = tuple(ENDPOINTS)
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    token: Optional[str] = None
+    body: Optional[dict] = None
+
+class Board:
+    """Users and shout-outs the scenarios pick from."""
+
+    def __init__(self, users: List[Tuple[int, str, str]], tokens: Dict[str, str], admin_token: str,
+                 departments: List[str], max_shoutout_id: int):
+        self.users = users
+        self.tokens = tokens
+        self.admin_token = admin_token
+        self.departments = departments
+        self.max_shoutout_id = max_shoutout_id
+
+def load_board(sample: int, rng: random.Random) -> Board:
+    from sqlalchemy import func
+    from backend import models
+    from backend.auth import create_access_token
+    from backend.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        users = (
+            db.query(models.User.id, models.User.email, models.User.department)
+            .filter(models.User.email != ADMIN_EMAIL)
+            .order_by(models.User.id)
+            .all()
+        )
+        departments = sorted({row.department for row in users})
+        max_shoutout_id = db.query(func.max(models.ShoutOut.id)).scalar() or 0
+    finally:
+        db.close()
+    if not users or not max_shoutout_id:
+        raise SystemExit("No seeded board found; run python -m backend.bench.seed first.")
+
+    picked = rng.sample(users, min(sample, len(users)))
+    tokens = {email: create_access_token({"sub": email}) for _, email, _ in picked}
+    return Board(picked, tokens, create_access_token({"sub": ADMIN_EMAIL}), departments, max_shoutout_id)
+
+def scenario_calls(board: Board, password: str) -> Dict[str, Callable[[random.Random], Call]]:
+    from backend.rollups import WINDOWS
+
+    def user(rng: random.Random) -> Tuple[int, str, str]:
+        return rng.choice(board.users)
+
+    def feed(rng):
+        _, email, _ = user(rng)
+        department = rng.choice(board.departments) if rng.random() < 0.5 else None
+        query = f"&department={department}" if department else ""
+        return Call("GET", f"/api/shoutouts?limit=20{query}", board.tokens[email])
+
+    def tagged(rng):
+        return Call("GET", "/api/users/me/tagged?limit=20", board.tokens[user(rng)[1]])
+
+    def reactions(rng):
+        shoutout_id = rng.randint(1, board.max_shoutout_id)
+        body = {"type": rng.choice(("like", "clap", "star"))}
+        return Call("POST", f"/api/shoutouts/{shoutout_id}/reactions", board.tokens[user(rng)[1]], body)
+
+    def notifications(rng):
+        return Call("GET", "/api/notifications", board.tokens[user(rng)[1]])
+
+    def admin_stats(rng):
+        query = f"window={rng.choice(WINDOWS)}"
+        if rng.random() < 0.5:
+            query += f"&department={rng.choice(board.departments)}"
+        return Call("GET", f"/api/admin/stats?{query}", board.admin_token)
+
+    def login(rng):
+        return Call("POST", "/api/auth/login", body={"email": user(rng)[1], "password": password})
+
+    return {
+        "feed": feed, "tagged": tagged, "reactions": reactions,
+        "notifications": notifications, "admin_stats": admin_stats, "login": login,
+    }
+
+async def _request(app, call: Call) -> int:
+    path, _, query = call.path.partition("?")
+    body = json.dumps(call.body).encode() if call.body is not None else b""
+    headers = [(b"content-type", b"application/json")]
+    if call.token:
+        headers.append((b"authorization", f"Bearer {call.token}".encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": call.method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query.encode(),
+        "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return result["status"]
+
+async def _measure(app, endpoint: str, make_call: Callable[[random.Random], Call], rng: random.Random, requests: int, concurrency: int) -> Dict[str, object]:
+    from backend.profiling import request_db_time, request_queries
+
+    calls = [make_call(rng) for _ in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(calls)
+    queries_before, db_before = request_queries.totals()[1], request_db_time.totals()[1]
+
+    async def connection():
+        # Each task is one client connection issuing requests back to back.
+        for call in remaining:
+            started = time.perf_counter()
+            status = await _request(app, call)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    queries = request_queries.totals()[1] - queries_before
+    db_time = request_db_time.totals()[1] - db_before
+    return {
+        "endpoint": endpoint,
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(queries / requests, 2),
+        "db_ms_per_request": round(db_time * 1000 / requests, 3),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def _run(scenarios: List[str], requests: int, concurrency: int, sample: int, password: str, seed: int) -> Dict[str, object]:
+    from backend.database import async_engine, engine
+    from backend.main import app
+
+    rng = random.Random(seed)
+    board = load_board(sample, rng)
+    calls = scenario_calls(board, password)
+    results = {}
+    async with app.router.lifespan_context(app):
+        for name in scenarios:
+            await _measure(app, ENDPOINTS[name], calls[name], rng, min(requests, 50), min(concurrency, 10))  # warm up
+            results[name] = await _measure(app, ENDPOINTS[name], calls[name], rng, requests, concurrency)
+    await async_engine.dispose()
+    return {
+        "commit": _git_commit(),
+        "database": engine.url.get_backend_name(),
+        "concurrency": concurrency,
+        "users_sampled": len(board.users),
+        "seed": seed,
+        "scenarios": results,
+    }
+
+def run(scenarios: List[str], requests: int, concurrency: int, sample: int = 500,
+        password: str = DEFAULT_PASSWORD, seed: int = 1) -> Dict[str, object]:
+    return asyncio.run(_run(scenarios, requests, concurrency, sample, password, seed))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the main endpoints against a seeded board.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=500, help="seeded users to spread requests over")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    use_database(args.database_url)
+    print(json.dumps(run(scenarios, args.requests, args.concurrency, args.users, args.password, args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Login latency under concurrent load against a running server.
+
+    python -m backend.bench.login --url http://localhost:8000 \
+        --email alice@example.com --password secret --concurrency 50 --requests 1000
+
+Prints a JSON summary with p50/p95/p99 latency (ms), throughput and the
+count of non-200 responses (e.g. 503s when the hashing pool is saturated).
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def _login(url: str, body: bytes) -> Tuple[int, float]:
+    request = urllib.request.Request(
+        f"{url}/api/auth/login", data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+def run(url: str, email: str, password: str, concurrency: int, requests: int) -> Dict[str, object]:
+    body = json.dumps({"email": email, "password": password}).encode()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: _login(url, body), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for _, ms in results]
+    return {
+        "endpoint": "POST /api/auth/login",
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(1 for status, _ in results if status != 200),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark login latency under concurrent load.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.email, args.password, args.concurrency, args.requests), indent=2))
+
+if __name__ == "__main__":
+    main()
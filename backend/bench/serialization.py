@@ -0,0 +1,82 @@
+"""
+CPU cost of turning loaded feed rows into a response body:
+
+    python -m backend.bench.serialization --items 500 --repeat 20
+
+Compares the validated path (ShoutOutResponse models built with from_orm,
+validated again as the response model and dumped by Pydantic) with the
+trusted path in backend.serialization (plain dicts built in one pass and
+encoded by orjson, as one array or as NDJSON lines). The rows come from a
+synthetic board (backend.bench.seed) in an in-memory SQLite database and
+are loaded once, so the numbers exclude query time.
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from backend.bench.seed import Generator, insert_rows, use_database
+
+def _time(fn: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    samples: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(fn())
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "min_ms": round(min(samples), 3), "bytes": size}
+
+def run(items: int, repeat: int) -> Dict[str, object]:
+    from backend import models, schemas
+    from backend.database import Base
+    from backend.feed import build_payloads, build_responses, load_shoutouts
+    from backend.serialization import dumps, ndjson_lines
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    rows = Generator(max(50, items // 5), items, 30, 1, "x").generate()
+    with Session(engine) as db:
+        for model, name in (
+            (models.User, "users"), (models.ShoutOut, "shoutouts"), (models.ShoutOutRecipient, "recipients"),
+            (models.Comment, "comments"), (models.Reaction, "reactions"),
+        ):
+            insert_rows(db, model, rows[name])
+        db.commit()
+
+        ids = [row["id"] for row in rows["shoutouts"]][::-1]
+        shoutouts, user_reactions = load_shoutouts(db, ids, viewer_id=1)
+        adapter = TypeAdapter(List[schemas.ShoutOutResponse])
+
+        def validated() -> bytes:
+            payload = build_responses(shoutouts, user_reactions)
+            return adapter.dump_json(adapter.validate_python(payload, from_attributes=True))
+
+        def fast() -> bytes:
+            return dumps(build_payloads(shoutouts, user_reactions))
+
+        def ndjson() -> bytes:
+            return b"".join(ndjson_lines(build_payloads(shoutouts, user_reactions)))
+
+        assert json.loads(validated()) == json.loads(fast())
+        results = {name: _time(fn, repeat) for name, fn in (("from_orm", validated), ("orjson", fast), ("ndjson", ndjson))}
+
+    baseline = results["from_orm"]["median_ms"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["median_ms"], 2) if result["median_ms"] else None
+    return {"items": len(shoutouts), "repeat": repeat, **results}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare feed serialization paths.")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    # Nothing here touches the app's database.
+    use_database("sqlite://")
+    print(json.dumps(run(args.items, args.repeat), indent=2))
+
+if __name__ == "__main__":
+    main()
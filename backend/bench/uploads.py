@@ -0,0 +1,87 @@
+"""
+Requests per second for /uploads, comparing a plain StaticFiles mount with
+UploadFiles. Both are driven in-process over ASGI so the numbers reflect
+server-side cost only:
+
+    python -m backend.bench.uploads --requests 5000
+
+Each mount is measured for a full GET and for a revalidation carrying the
+ETag from the first response. The bigger win for UploadFiles is on the
+client, where `immutable` avatars skip the request entirely; that does not
+show up here.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+from starlette.staticfiles import StaticFiles
+from backend.images import render_variants, store_variants
+from backend.static import UploadFiles
+
+async def _request(app, path: str, headers: List[Tuple[bytes, bytes]]) -> Tuple[int, Dict[str, str]]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+
+    await app(scope, receive, send)
+    return result["status"], result["headers"]
+
+async def _measure(app, path: str, requests: int, etag: Optional[str]) -> Dict[str, object]:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    statuses: Dict[int, int] = {}
+    started = time.perf_counter()
+    for _ in range(requests):
+        status, _ = await _request(app, path, headers)
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - started
+    return {"throughput_rps": round(requests / elapsed, 1), "statuses": statuses}
+
+async def _run(requests: int) -> Dict[str, object]:
+    directory = tempfile.mkdtemp(prefix="bench-uploads-")
+    try:
+        source = io.BytesIO()
+        Image.new("RGB", (512, 512), "teal").save(source, "PNG")
+        rendered = render_variants(source.getvalue())
+        store_variants(rendered["files"], os.path.join(directory, "avatars"))
+
+        path = f"/avatars/{rendered['hash']}_128.jpeg"
+        results = {}
+        for name, app in (("static_files", StaticFiles(directory=directory)), ("upload_files", UploadFiles(directory=directory))):
+            _, headers = await _request(app, path, [])
+            results[name] = {
+                "cache_control": headers.get("cache-control"),
+                "full_get": await _measure(app, path, requests, None),
+                "revalidate": await _measure(app, path, requests, headers["etag"]),
+            }
+        return {"path": path, "requests": requests, **results}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def run(requests: int) -> Dict[str, object]:
+    return asyncio.run(_run(requests))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare /uploads serving throughput.")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=2))
+
+if __name__ == "__main__":
+    main()
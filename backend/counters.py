@@ -0,0 +1,114 @@
+"""
+Denormalized reaction and comment counters on `shoutouts`.
+
+The write endpoints adjust the counters with in-place `col = col + delta`
+UPDATEs inside their own transaction, so feed reads never aggregate the
+`reactions` or `comments` tables. If the counters ever drift (manual SQL,
+restored backups, rows written before the columns existed), rebuild them
+from the base tables with:
+
+    python -m backend.counters [--batch-size N]
+"""
+import argparse
+import logging
+from typing import List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from backend import models, schemas
+
+logger = logging.getLogger(__name__)
+
+REACTION_COUNT_COLUMNS = {
+    models.ReactionType.like: "like_count",
+    models.ReactionType.clap: "clap_count",
+    models.ReactionType.star: "star_count",
+}
+
+def adjust_reaction_count(db: Session, shoutout_id: int, reaction_type: models.ReactionType, delta: int) -> None:
+    column = getattr(models.ShoutOut, REACTION_COUNT_COLUMNS[reaction_type])
+    db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).update(
+        {column: column + delta}, synchronize_session=False
+    )
+
+def adjust_comment_count(db: Session, shoutout_id: int, delta: int) -> None:
+    db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).update(
+        {models.ShoutOut.comment_count: models.ShoutOut.comment_count + delta}, synchronize_session=False
+    )
+
+def reaction_counts(shoutout: models.ShoutOut) -> List[schemas.ReactionCount]:
+    """
+    Read the reaction counters of a shout-out in the shape the feed returns,
+    omitting reaction types nobody has used.
+    """
+    counts = []
+    for reaction_type, attr in REACTION_COUNT_COLUMNS.items():
+        count = getattr(shoutout, attr) or 0
+        if count > 0:
+            counts.append(schemas.ReactionCount(type=reaction_type, count=count))
+    return counts
+
+def rebuild_counters(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute every shout-out's counters from `reactions` and `comments`,
+    committing one id range at a time so no single transaction holds locks on
+    the whole table. Returns the number of shout-outs processed.
+    """
+    values = {
+        attr: (
+            select(func.count(models.Reaction.id))
+            .where(
+                models.Reaction.shoutout_id == models.ShoutOut.id,
+                models.Reaction.type == reaction_type,
+            )
+            .scalar_subquery()
+        )
+        for reaction_type, attr in REACTION_COUNT_COLUMNS.items()
+    }
+    values["comment_count"] = (
+        select(func.count(models.Comment.id))
+        .where(models.Comment.shoutout_id == models.ShoutOut.id)
+        .scalar_subquery()
+    )
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = [
+            row.id for row in
+            db.query(models.ShoutOut.id)
+            .filter(models.ShoutOut.id > last_id)
+            .order_by(models.ShoutOut.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            break
+
+        db.query(models.ShoutOut).filter(
+            models.ShoutOut.id >= ids[0],
+            models.ShoutOut.id <= ids[-1],
+        ).update(values, synchronize_session=False)
+        db.commit()
+
+        processed += len(ids)
+        last_id = ids[-1]
+        logger.info("Rebuilt counters for %d shout-outs", processed)
+
+    return processed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild shout-out reaction and comment counters.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        processed = rebuild_counters(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Rebuilt counters for {processed} shout-outs")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import logging
 
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -14,15 +21,143 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://bragboard_db_whbd_user:rX
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(DATABASE_URL)
+# Async driver for each sync dialect the app runs on.
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Connection pool and statement limits. A checkout that waits longer than
+# DB_POOL_TIMEOUT raises PoolTimeoutError, which the API turns into a 503, so
+# a saturated pool sheds load instead of queueing requests indefinitely.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+class PoolMetrics:
+    """Checkout wait times and timeouts for one engine's pool."""
+
+    def __init__(self, recent: int = 1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._recent.append(waited)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "wait_p95_ms": round(recent[int(len(recent) * 0.95) - 1] * 1000, 3) if recent else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+pool_metrics = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+class _TimedPool:
+    """Pool mixin that records how long each checkout waits for a connection."""
+    metrics_name = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics[self.metrics_name].record(time.perf_counter() - started, True)
+            raise
+        pool_metrics[self.metrics_name].record(time.perf_counter() - started, False)
+        return connection
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    metrics_name = "sync"
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+def _engine_options(url: str, poolclass) -> Dict[str, Any]:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep its default pool.
+        return {}
+    options: Dict[str, Any] = {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def pool_stats() -> Dict[str, Any]:
+    """Live pool occupancy plus checkout wait metrics for both engines."""
+    stats = {}
+    for name, bound in (("sync", engine), ("async", async_engine.sync_engine)):
+        pool = bound.pool
+        occupancy = {}
+        if isinstance(pool, QueuePool):
+            occupancy = {
+                "size": pool.size(),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "timeout_seconds": DB_POOL_TIMEOUT,
+            }
+        stats[name] = {"pool": type(pool).__name__, **occupancy, **pool_metrics[name].stats()}
+    return stats
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL, TimedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Request handlers use the async engine; CLIs, the outbox dispatcher and
+# startup DDL keep the sync one. ORM code is shared between them through
+# AsyncSession.run_sync.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, TimedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 def get_db():
     db = SessionLocal()
     try:
-        logger.info("Database connection successful")
         yield db
     finally:
         db.close()
-        logger.info("Database connection closed")
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_in_session(fn, *args):
+    """Run `fn(session, *args)` on a short-lived async session."""
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(fn, *args)
@@ -0,0 +1,152 @@
+"""
+In-memory user directory for recipient typeahead.
+
+The directory is a snapshot of every user's (name, department, id, avatar)
+held in sorted arrays: one keyed by the full normalized name and one by
+each word of it, for the whole company and per department. A prefix
+lookup is a binary search plus a short scan, so it never touches the
+database. The user endpoints call `invalidate()` after committing and the
+next lookup rebuilds the snapshot with one query; DIRECTORY_TTL_SECONDS
+bounds how stale another worker's snapshot can get.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend import models
+
+DIRECTORY_TTL_SECONDS = float(os.getenv("DIRECTORY_TTL_SECONDS", "60"))
+
+class DirectoryEntry(NamedTuple):
+    id: int
+    name: str
+    department: Optional[str]
+    profile_picture_url: Optional[str]
+
+def normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+class _SortedKeys:
+    """Keys and user ids sorted by key, ties broken by full name."""
+
+    def __init__(self, items: List[Tuple[str, str, int]]):
+        items.sort()
+        self.keys = [item[0] for item in items]
+        self.ids = [item[2] for item in items]
+
+    def matches(self, prefix: str):
+        start = bisect.bisect_left(self.keys, prefix)
+        for index in range(start, len(self.keys)):
+            if not self.keys[index].startswith(prefix):
+                return
+            yield self.ids[index]
+
+class _Snapshot:
+    def __init__(self, entries: List[DirectoryEntry]):
+        self.entries: Dict[int, DirectoryEntry] = {e.id: e for e in entries}
+        scopes: Dict[Optional[str], Tuple[list, list]] = {None: ([], [])}
+        for entry in entries:
+            name = normalize(entry.name)
+            words = name.split(" ")
+            for scope in {None, entry.department}:
+                names, word_keys = scopes.setdefault(scope, ([], []))
+                names.append((name, name, entry.id))
+                # The first word is already covered by the full-name key.
+                word_keys.extend((word, name, entry.id) for word in set(words[1:]))
+        self.scopes = {
+            scope: (_SortedKeys(names), _SortedKeys(word_keys))
+            for scope, (names, word_keys) in scopes.items()
+        }
+
+    def lookup(self, query: str, department: Optional[str], limit: int) -> List[DirectoryEntry]:
+        scope = self.scopes.get(department)
+        if scope is None:
+            return []
+        prefix = normalize(query)
+        names, words = scope
+        found: List[DirectoryEntry] = []
+        seen = set()
+        # Full-name prefix matches rank ahead of matches on a later word.
+        for keys in (names, words):
+            for user_id in keys.matches(prefix):
+                if user_id in seen:
+                    continue
+                seen.add(user_id)
+                found.append(self.entries[user_id])
+                if len(found) >= limit:
+                    return found
+        return found
+
+def load_entries(db: Session) -> List[DirectoryEntry]:
+    rows = db.query(
+        models.User.id, models.User.name, models.User.department, models.User.profile_picture_url
+    ).all()
+    return [DirectoryEntry(*row) for row in rows]
+
+class UserDirectory:
+    def __init__(self, loader: Callable[[Session], List[DirectoryEntry]] = load_entries, ttl: float = DIRECTORY_TTL_SECONDS):
+        self._loader = loader
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._built_generation = -1
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.builds = 0
+        self.invalidations = 0
+        self.last_build_ms = 0.0
+
+    def invalidate(self) -> None:
+        """Call after committing a change to any user's name, department or avatar."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+
+    def _fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and self._built_generation == self._generation
+            and time.monotonic() - self._built_at < self.ttl
+        )
+
+    def _current(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and self._fresh():
+            return snapshot
+        generation = self._generation
+        # Build without holding the lock: under run_sync the query yields to
+        # the event loop, and another lookup waiting on the lock there would
+        # block the loop. Concurrent callers may each build; the newest wins.
+        started = time.perf_counter()
+        snapshot = _Snapshot(self._loader(db))
+        with self._lock:
+            self.last_build_ms = (time.perf_counter() - started) * 1000
+            self.builds += 1
+            if generation >= self._built_generation:
+                self._snapshot = snapshot
+                self._built_at = time.monotonic()
+                self._built_generation = generation
+        return snapshot
+
+    def lookup(self, db: Session, query: str, department: Optional[str] = None, limit: int = 10) -> List[DirectoryEntry]:
+        """Top `limit` users whose name, or a word of it, starts with `query`."""
+        snapshot = self._current(db)
+        self.lookups += 1
+        return snapshot.lookup(query, department, limit)
+
+    def stats(self) -> Dict[str, float]:
+        snapshot = self._snapshot
+        return {
+            "users": len(snapshot.entries) if snapshot else 0,
+            "departments": len(snapshot.scopes) - 1 if snapshot else 0,
+            "lookups": self.lookups,
+            "builds": self.builds,
+            "invalidations": self.invalidations,
+            "last_build_ms": round(self.last_build_ms, 3),
+            "ttl_seconds": self.ttl,
+        }
+
+user_directory = UserDirectory()
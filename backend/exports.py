@@ -0,0 +1,252 @@
+"""
+Streaming admin exports of shout-outs and per-user recognition stats.
+
+Each export opens its own Session and reads its rows through a server-side
+cursor (`yield_per`), one partition at a time. Rows are formatted into
+CSV or NDJSON chunks as they arrive, so memory stays flat however large the
+tables get. For shout-outs, each partition's recipients and comments are
+fetched with one query each.
+
+Filters: an inclusive UTC `start_date`/`end_date` (or a stats `window`) and
+a `department`. For shout-outs the department is the sender's.
+"""
+import csv
+import io
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from backend import models
+from backend.serialization import NDJSON_MEDIA_TYPE, ndjson_lines
+
+EXPORT_BATCH_SIZE = 1000
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": NDJSON_MEDIA_TYPE}
+
+SHOUTOUT_COLUMNS = (
+    "id", "created_at", "sender_id", "sender_name", "sender_department", "message",
+    "recipient_ids", "recipient_names", "like_count", "clap_count", "star_count", "comment_count", "comments",
+)
+USER_STATS_COLUMNS = (
+    "user_id", "name", "email", "department", "joined_at", "shoutouts_sent", "shoutouts_received",
+)
+
+def media_type(export_format: str) -> str:
+    if export_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    return FORMATS[export_format]
+
+def _utc_bounds(window: Optional[Tuple[date, date]]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    if window is None:
+        return None, None
+    start, end = window
+    lower = None if start == date.min else datetime.combine(start, time.min, tzinfo=timezone.utc)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return lower, upper
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+# Shout-outs
+
+def _shoutout_rows(db: Session, window: Optional[Tuple[date, date]], department: Optional[str]):
+    lower, upper = _utc_bounds(window)
+    statement = (
+        select(
+            models.ShoutOut.id, models.ShoutOut.created_at, models.ShoutOut.sender_id,
+            models.User.name.label("sender_name"), models.User.department.label("sender_department"),
+            models.ShoutOut.message, models.ShoutOut.like_count, models.ShoutOut.clap_count,
+            models.ShoutOut.star_count, models.ShoutOut.comment_count,
+        )
+        .outerjoin(models.User, models.User.id == models.ShoutOut.sender_id)
+        .order_by(models.ShoutOut.created_at, models.ShoutOut.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if lower is not None:
+        statement = statement.where(models.ShoutOut.created_at >= lower)
+    if upper is not None:
+        statement = statement.where(models.ShoutOut.created_at < upper)
+    if department:
+        statement = statement.where(models.User.department == department)
+    return db.execute(statement)
+
+def _recipients(db: Session, ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    found: Dict[int, List[Dict[str, Any]]] = {}
+    rows = db.execute(
+        select(models.ShoutOutRecipient.shoutout_id, models.User.id, models.User.name)
+        .join(models.User, models.User.id == models.ShoutOutRecipient.recipient_id)
+        .where(models.ShoutOutRecipient.shoutout_id.in_(ids))
+        .order_by(models.ShoutOutRecipient.shoutout_id, models.ShoutOutRecipient.id)
+    )
+    for shoutout_id, user_id, name in rows:
+        found.setdefault(shoutout_id, []).append({"id": user_id, "name": name})
+    return found
+
+def _comments(db: Session, ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    found: Dict[int, List[Dict[str, Any]]] = {}
+    rows = db.execute(
+        select(
+            models.Comment.shoutout_id, models.Comment.id, models.Comment.user_id,
+            models.User.name, models.Comment.content, models.Comment.created_at,
+        )
+        .outerjoin(models.User, models.User.id == models.Comment.user_id)
+        .where(models.Comment.shoutout_id.in_(ids))
+        .order_by(models.Comment.shoutout_id, models.Comment.created_at, models.Comment.id)
+    )
+    for shoutout_id, comment_id, user_id, name, content, created_at in rows:
+        found.setdefault(shoutout_id, []).append({
+            "id": comment_id, "user_id": user_id, "user_name": name,
+            "content": content, "created_at": _isoformat(created_at),
+        })
+    return found
+
+def shoutout_records(db: Session, window: Optional[Tuple[date, date]] = None,
+                     department: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per shout-out, oldest first, with recipients and comments."""
+    for partition in _shoutout_rows(db, window, department).partitions():
+        ids = [row.id for row in partition]
+        recipients = _recipients(db, ids)
+        comments = _comments(db, ids)
+        for row in partition:
+            yield {
+                "id": row.id,
+                "created_at": _isoformat(row.created_at),
+                "sender_id": row.sender_id,
+                "sender_name": row.sender_name,
+                "sender_department": row.sender_department,
+                "message": row.message,
+                "recipients": recipients.get(row.id, []),
+                "reaction_counts": {"like": row.like_count, "clap": row.clap_count, "star": row.star_count},
+                "comment_count": row.comment_count,
+                "comments": comments.get(row.id, []),
+            }
+
+def _shoutout_csv_row(record: Dict[str, Any]) -> List[Any]:
+    return [
+        record["id"], record["created_at"], record["sender_id"], record["sender_name"],
+        record["sender_department"], record["message"],
+        ";".join(str(r["id"]) for r in record["recipients"]),
+        "; ".join(r["name"] for r in record["recipients"]),
+        record["reaction_counts"]["like"], record["reaction_counts"]["clap"], record["reaction_counts"]["star"],
+        record["comment_count"],
+        "\n".join(f"{c['user_name']}: {c['content']}" for c in record["comments"]),
+    ]
+
+# Per-user stats
+
+def user_stats_records(db: Session, window: Optional[Tuple[date, date]] = None,
+                       department: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield sent/received counts for every user, all time from `user_stats`
+    or summed over the window's `user_daily_stats` buckets. Users with no
+    activity are included with zeros.
+    """
+    if window is None:
+        stats = models.UserStats
+        sent, received, user_id = stats.shoutouts_sent, stats.shoutouts_received, stats.user_id
+    else:
+        daily = models.UserDailyStats
+        stats = (
+            select(
+                daily.user_id,
+                func.sum(daily.shoutouts_sent).label("sent"),
+                func.sum(daily.shoutouts_received).label("received"),
+            )
+            .where(and_(daily.day >= window[0], daily.day <= window[1]))
+            .group_by(daily.user_id)
+            .subquery()
+        )
+        sent, received, user_id = stats.c.sent, stats.c.received, stats.c.user_id
+
+    statement = (
+        select(
+            models.User.id, models.User.name, models.User.email, models.User.department,
+            models.User.joined_at, sent.label("sent"), received.label("received"),
+        )
+        .outerjoin(stats, user_id == models.User.id)
+        .order_by(models.User.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if department:
+        statement = statement.where(models.User.department == department)
+    for row in db.execute(statement):
+        yield {
+            "user_id": row.id,
+            "name": row.name,
+            "email": row.email,
+            "department": row.department,
+            "joined_at": _isoformat(row.joined_at),
+            "shoutouts_sent": row.sent or 0,
+            "shoutouts_received": row.received or 0,
+        }
+
+# Output
+
+def _safe_cell(value: Any) -> Any:
+    # Keep spreadsheet apps from evaluating user text as a formula.
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+def csv_chunks(columns: Sequence[str], rows: Iterable[List[Any]], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_safe_cell(value) for value in row])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+class Export(NamedTuple):
+    name: str
+    records: Callable[..., Iterator[Dict[str, Any]]]
+    columns: Sequence[str]
+    csv_row: Callable[[Dict[str, Any]], List[Any]]
+
+EXPORTS = {
+    export.name: export for export in (
+        Export("shoutouts", shoutout_records, SHOUTOUT_COLUMNS, _shoutout_csv_row),
+        Export("user-stats", user_stats_records, USER_STATS_COLUMNS,
+               lambda record: [record[column] for column in USER_STATS_COLUMNS]),
+    )
+}
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    export: Export,
+    export_format: str,
+    window: Optional[Tuple[date, date]],
+    department: Optional[str],
+) -> Iterator[bytes]:
+    """
+    Body of an export response. Opens its own Session, which stays open
+    while the client reads and is closed when the stream ends or is dropped.
+    """
+    db = session_factory()
+    try:
+        records = export.records(db, window, department)
+        if export_format == "ndjson":
+            yield from ndjson_lines(records)
+        else:
+            yield from csv_chunks(export.columns, (export.csv_row(record) for record in records))
+    finally:
+        db.close()
+
+def filename(export: Export, export_format: str, window: Optional[Tuple[date, date]], department: Optional[str]) -> str:
+    parts = [export.name]
+    if department:
+        parts.append("".join(ch if ch.isalnum() else "-" for ch in department).lower())
+    if window:
+        start, end = window
+        parts.append(f"{'' if start == date.min else start.isoformat()}_{end.isoformat()}")
+    return f"{'-'.join(parts)}.{export_format}"
@@ -0,0 +1,154 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from backend import models, schemas
+from backend.counters import REACTION_COUNT_COLUMNS, reaction_counts
+
+def load_shoutouts(db: Session, shoutout_ids: Sequence[int], viewer_id: int) -> Tuple[List[models.ShoutOut], Dict[int, models.ReactionType]]:
+    """
+    Load the given shout-outs with everything a feed item shows in a fixed
+    number of queries, independent of how many ids are passed in. Returns
+    them in the order of `shoutout_ids`, skipping ids that no longer exist,
+    along with the viewer's own reaction per shout-out.
+
+    Queries issued: shout-outs + senders (with their reaction/comment
+    counters), recipients + users, comments + authors and the viewer's own
+    reactions.
+    """
+    shoutout_ids = list(dict.fromkeys(shoutout_ids))
+    if not shoutout_ids:
+        return [], {}
+
+    shoutouts = (
+        db.query(models.ShoutOut)
+        .options(
+            joinedload(models.ShoutOut.sender),
+            selectinload(models.ShoutOut.recipients).joinedload(models.ShoutOutRecipient.recipient),
+            selectinload(models.ShoutOut.comments).joinedload(models.Comment.user),
+        )
+        .filter(models.ShoutOut.id.in_(shoutout_ids))
+        .all()
+    )
+    by_id = {s.id: s for s in shoutouts}
+
+    user_reactions: Dict[int, models.ReactionType] = dict(
+        db.query(models.Reaction.shoutout_id, models.Reaction.type)
+        .filter(
+            models.Reaction.shoutout_id.in_(shoutout_ids),
+            models.Reaction.user_id == viewer_id,
+        )
+        .all()
+    )
+
+    return [by_id[sid] for sid in shoutout_ids if sid in by_id], user_reactions
+
+def hydrate_shoutouts(db: Session, shoutout_ids: Sequence[int], viewer_id: int) -> List[schemas.ShoutOutResponse]:
+    """Feed items for the given shout-out ids as validated response models."""
+    shoutouts, user_reactions = load_shoutouts(db, shoutout_ids, viewer_id)
+    return build_responses(shoutouts, user_reactions)
+
+def build_responses(shoutouts: Iterable[models.ShoutOut], user_reactions: Dict[int, models.ReactionType]) -> List[schemas.ShoutOutResponse]:
+    return [_build_response(s, user_reactions.get(s.id)) for s in shoutouts]
+
+def shoutout_payloads(db: Session, shoutout_ids: Sequence[int], viewer_id: int) -> List[Dict[str, Any]]:
+    """
+    Feed items for the given shout-out ids as plain dicts in the
+    ShoutOutResponse shape, for `backend.serialization`. Built in one pass
+    from the loaded rows, without Pydantic models.
+    """
+    shoutouts, user_reactions = load_shoutouts(db, shoutout_ids, viewer_id)
+    return build_payloads(shoutouts, user_reactions)
+
+def build_payloads(shoutouts: Iterable[models.ShoutOut], user_reactions: Dict[int, models.ReactionType]) -> List[Dict[str, Any]]:
+    users: Dict[int, Dict[str, Any]] = {}
+    return [_build_payload(s, user_reactions.get(s.id), users) for s in shoutouts]
+
+def hydrate_shoutout(db: Session, shoutout_id: int, viewer_id: int) -> Optional[schemas.ShoutOutResponse]:
+    items = hydrate_shoutouts(db, [shoutout_id], viewer_id)
+    return items[0] if items else None
+
+def _build_response(
+    shoutout: models.ShoutOut,
+    user_reaction: Optional[models.ReactionType],
+) -> schemas.ShoutOutResponse:
+    recipients_data = [
+        schemas.RecipientResponse(
+            id=r.recipient.id,
+            name=r.recipient.name,
+            email=r.recipient.email,
+            department=r.recipient.department,
+            profile_picture_url=r.recipient.profile_picture_url
+        ) for r in shoutout.recipients
+    ]
+
+    return schemas.ShoutOutResponse(
+        id=shoutout.id,
+        sender_id=shoutout.sender_id,
+        message=shoutout.message,
+        created_at=shoutout.created_at,
+        sender=schemas.UserResponse.from_orm(shoutout.sender),
+        recipients=recipients_data,
+        comments=shoutout.comments,
+        reaction_counts=reaction_counts(shoutout),
+        comment_count=shoutout.comment_count,
+        user_reaction=user_reaction
+    )
+
+def _user_payload(user: models.User, users: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    # The same sender or commenter shows up across a page; build each once.
+    payload = users.get(user.id)
+    if payload is None:
+        payload = users[user.id] = {
+            "email": user.email,
+            "name": user.name,
+            "department": user.department,
+            "id": user.id,
+            "role": user.role,
+            "joined_at": user.joined_at,
+            "profile_picture_url": user.profile_picture_url,
+            "profile_picture_variants": user.profile_picture_variants,
+        }
+    return payload
+
+def _reaction_count_payloads(shoutout: models.ShoutOut) -> List[Dict[str, Any]]:
+    counts = []
+    for reaction_type, attr in REACTION_COUNT_COLUMNS.items():
+        count = getattr(shoutout, attr) or 0
+        if count > 0:
+            counts.append({"type": reaction_type, "count": count})
+    return counts
+
+def _build_payload(
+    shoutout: models.ShoutOut,
+    user_reaction: Optional[models.ReactionType],
+    users: Dict[int, Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "id": shoutout.id,
+        "sender_id": shoutout.sender_id,
+        "message": shoutout.message,
+        "created_at": shoutout.created_at,
+        "sender": _user_payload(shoutout.sender, users),
+        "recipients": [
+            {
+                "id": r.recipient.id,
+                "name": r.recipient.name,
+                "email": r.recipient.email,
+                "department": r.recipient.department,
+                "profile_picture_url": r.recipient.profile_picture_url,
+            }
+            for r in shoutout.recipients
+        ],
+        "comments": [
+            {
+                "id": c.id,
+                "user_id": c.user_id,
+                "content": c.content,
+                "created_at": c.created_at,
+                "user": _user_payload(c.user, users),
+            }
+            for c in shoutout.comments
+        ],
+        "reaction_counts": _reaction_count_payloads(shoutout),
+        "comment_count": shoutout.comment_count,
+        "user_reaction": user_reaction,
+    }
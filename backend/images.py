@@ -0,0 +1,233 @@
+"""
+Profile picture processing.
+
+Upload request bodies are capped by UploadSizeLimitMiddleware while they are
+received, before the multipart form is parsed and spooled. The file itself
+is read in chunks up to MAX_UPLOAD_BYTES, then decoded and resized
+on a dedicated process pool into square JPEG and WebP variants for every
+size in AVATAR_SIZES. Variant files are named after a hash of the source
+bytes, so their URLs never change content and can be cached forever.
+Decompression bombs are rejected from the image header, before any pixel
+data is decoded.
+
+The pool worker only needs Pillow and the standard library, so keep
+database and settings imports out of this module.
+"""
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from PIL import Image, ImageOps
+from starlette.datastructures import Headers
+
+UPLOAD_DIR = "backend/uploads"
+AVATAR_DIR = os.path.join(UPLOAD_DIR, "avatars")
+AVATAR_URL_PREFIX = "/uploads/avatars"
+AVATAR_SIZES = (32, 64, 128, 256)
+DEFAULT_AVATAR_SIZE = 128
+AVATAR_FORMATS = {"jpeg": ("JPEG", {"quality": 85, "optimize": True}), "webp": ("WEBP", {"quality": 80, "method": 4})}
+
+MAX_UPLOAD_BYTES = int(os.getenv("AVATAR_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(40_000_000)))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", "32"))
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+READ_CHUNK_BYTES = 64 * 1024
+# Allowance for the multipart boundaries and part headers around the file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def avatar_filename(content_hash: str, size: int, ext: str) -> str:
+    return f"{content_hash}_{size}.{ext}"
+
+def avatar_url(content_hash: str, size: int = DEFAULT_AVATAR_SIZE, ext: str = "jpeg") -> str:
+    return f"{AVATAR_URL_PREFIX}/{avatar_filename(content_hash, size, ext)}"
+
+def render_variants(data: bytes) -> Dict[str, object]:
+    """
+    Pool worker: decode `data` and return its content hash plus
+    {filename: encoded bytes} for every size and format. Raises ValueError
+    for anything that is not an acceptable image.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        img = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError:
+        raise ValueError("Image dimensions are too large")
+    except OSError:
+        raise ValueError("Unsupported or invalid image")
+    if img.format not in ALLOWED_FORMATS:
+        raise ValueError(f"Unsupported image format: {img.format}")
+    width, height = img.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError("Image dimensions are too large")
+
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("RGB")
+
+    content_hash = hashlib.sha256(data).hexdigest()[:32]
+    variants = {}
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        resized = ImageOps.fit(img, (size, size), Image.Resampling.LANCZOS)
+        for ext, (fmt, options) in AVATAR_FORMATS.items():
+            out = io.BytesIO()
+            resized.save(out, fmt, **options)
+            variants[avatar_filename(content_hash, size, ext)] = out.getvalue()
+        # Downscale from the previous variant rather than the full image.
+        img = resized
+    return {"hash": content_hash, "files": variants}
+
+class ImageProcessor:
+    """
+    Lazily started process pool for avatar rendering, bounded to
+    `max_pending` queued or running jobs.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def render(self, data: bytes) -> Dict[str, object]:
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Image processing is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(executor.submit(render_variants, data))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.workers),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+image_processor = ImageProcessor(workers=IMAGE_WORKERS, max_pending=IMAGE_MAX_PENDING)
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"Image must be at most {max_bytes // (1024 * 1024)} MB"
+
+class UploadSizeLimitMiddleware:
+    """
+    Cap request bodies on upload paths ({path: max file bytes}) while they
+    are received, so Starlette never parses or spools an oversized multipart
+    form. A declared Content-Length over the cap is answered with 413 before
+    reading anything; a chunked body fails with 413 once it passes the cap.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": _too_large_detail(max_bytes)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+async def read_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Read a parsed upload in chunks, failing with 413 once the file exceeds
+    `max_bytes`. The request body was already bounded by
+    UploadSizeLimitMiddleware; this enforces the exact limit on the file.
+    """
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+    if not buffer:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload")
+    return bytes(buffer)
+
+def store_variants(files: Dict[str, bytes], directory: str = AVATAR_DIR) -> None:
+    """
+    Write rendered variants. Files are content-addressed, so existing ones are
+    left alone; new ones are written to a temp name and renamed into place.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name, content in files.items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            continue
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+def remove_variants(content_hash: str) -> None:
+    for size in AVATAR_SIZES:
+        for ext in AVATAR_FORMATS:
+            path = os.path.join(AVATAR_DIR, avatar_filename(content_hash, size, ext))
+            if os.path.exists(path):
+                os.remove(path)
+
+def variant_urls(content_hash: str) -> List[Dict[str, object]]:
+    return [
+        {"size": size, **{ext: avatar_url(content_hash, size, ext) for ext in AVATAR_FORMATS}}
+        for size in AVATAR_SIZES
+    ]
@@ -1,27 +1,73 @@
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Body
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Body, Query, Response, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional
-from datetime import datetime
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, insert, literal, or_, select
+from sqlalchemy.exc import DBAPIError
+from typing import List, Optional, Union
+from datetime import date, datetime
+from contextlib import asynccontextmanager
 import os
 import pytz
-from PIL import Image
-import io
 from backend import models, schemas
-from backend.database import engine, get_db, Base
+from backend.database import engine, async_engine, get_async_db, pool_stats, Base, PoolTimeoutError, SessionLocal
+from backend.migrations import upgrade_schema
+from backend.feed import hydrate_shoutout, shoutout_payloads
+from backend.reports import list_report_groups, list_reports
+from backend.counters import adjust_comment_count, adjust_reaction_count
+from backend.timeline import fan_out_shoutout, prune_shoutout, timeline_query
+from backend.outbox import NotificationDispatcher, discard_comment_events, discard_shoutout_events, enqueue_event
+from backend.realtime import hub as notification_hub, count_unread, notification_stream, resolve_stream_user
+from backend.passwords import password_hasher
+from backend.response_cache import response_cache
+from backend.rollups import (
+    ROLLUPS_REBUILT_HEADER, ROLLUPS_UPDATED_HEADER, record_shoutout, record_user_created, record_user_deleted,
+    daily_shoutouts, department_totals, leaderboard, resolve_window, rollup_state, set_rollup_headers,
+)
+from backend.directory import user_directory
+from backend.search import KINDS as SEARCH_KINDS, search_index
+from backend.static import UploadFiles
+from backend.user_import import UserImport, batches, parse_rows, resolve_format as resolve_import_format, spool_request
+from backend.exports import EXPORTS, filename as export_filename, media_type as export_media_type, stream_export
+from backend.serialization import dumps, list_response, wants_ndjson
+from backend.profiling import ProfiledRoute, ProfilingMiddleware, instrument_engine, render_metrics
+from backend.images import (
+    MAX_UPLOAD_BYTES, UPLOAD_DIR, UploadSizeLimitMiddleware, avatar_url, image_processor, read_upload, remove_variants,
+    store_variants,
+)
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate, set_next_cursor
 from backend.auth import (
-    get_password_hash, verify_password, create_access_token, create_refresh_token,
-    get_current_user, get_current_admin
+    get_password_hash_async, verify_password_async, verify_and_update_password_async, create_access_token, create_refresh_token,
+    get_current_user, get_current_admin, invalidate_user, user_cache
 )
 
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+search_index.ensure_schema(engine)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+notification_dispatcher = NotificationDispatcher(SessionLocal, on_delivered=notification_hub.publish)
 
-app = FastAPI(title="BragBoard API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    notification_dispatcher.start()
+    yield
+    notification_dispatcher.stop()
+    password_hasher.shutdown()
+    image_processor.shutdown()
 
-app.mount("/uploads", StaticFiles(directory="backend/uploads"), name="uploads")
+app = FastAPI(title="BragBoard API", version="1.0.0", lifespan=lifespan)
+app.router.route_class = ProfiledRoute
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+app.mount("/uploads", UploadFiles(directory=UPLOAD_DIR), name="uploads")
+
+# Registered before CORSMiddleware so it runs inside it and its 413
+# responses still carry the CORS headers.
+app.add_middleware(UploadSizeLimitMiddleware, limits={"/api/users/me/picture": MAX_UPLOAD_BYTES})
 
 origins = [
     "http://localhost:5173",          # Vite dev (local)
@@ -34,398 +80,529 @@ app.add_middleware(
     allow_credentials=True,          
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, ROLLUPS_UPDATED_HEADER, ROLLUPS_REBUILT_HEADER,
+        "X-Query-Count", "X-DB-Time-Ms", "X-Serialization-Ms", "X-Slowest-Queries", "Server-Timing",
+    ],
 )
+app.add_middleware(ProfilingMiddleware)
+
+@app.exception_handler(PoolTimeoutError)
+async def database_pool_exhausted(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503, content={"detail": "Server is busy, please retry"}, headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(DBAPIError)
+async def database_error(request: Request, exc: DBAPIError):
+    # 57014 is PostgreSQL's query_canceled, raised when DB_STATEMENT_TIMEOUT_MS is hit.
+    if getattr(exc.orig, "pgcode", None) == "57014" or getattr(exc.orig, "sqlstate", None) == "57014":
+        return JSONResponse(
+            status_code=503, content={"detail": "Database query timed out"}, headers={"Retry-After": "1"}
+        )
+    raise exc
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "BragBoard API is running", "docs": "/docs"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post("/api/auth/register", response_model=schemas.LoginResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if existing_user:
+async def register(user_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    def email_taken(db: Session) -> bool:
+        return db.query(models.User.id).filter(models.User.email == user_data.email).first() is not None
+
+    if await db.run_sync(email_taken):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # hash the password BEFORE saving
-    hashed_password = get_password_hash(user_data.password)
-
-    user = models.User(
-        name=user_data.name,
-        email=user_data.email,
-        password=hashed_password,   # store hashed password
-        department=user_data.department,
-    )
+    hashed_password = await get_password_hash_async(user_data.password)
+
+    def create(db: Session):
+        user = models.User(
+            name=user_data.name,
+            email=user_data.email,
+            password=hashed_password,   # store hashed password
+            department=user_data.department,
+        )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+        db.add(user)
+        db.flush()
+        record_user_created(db, user)
+        search_index.index_user(db, user.id)
+        db.commit()
+        response_cache.bump()
+        user_directory.invalidate()
+        db.refresh(user)
+        return schemas.UserResponse.from_orm(user)
 
+    user = await db.run_sync(create)
     access_token = create_access_token({"sub": user.email})
 
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": schemas.UserResponse.from_orm(user),
+        "user": user,
     }
 
 @app.post("/api/auth/login", response_model=schemas.LoginResponse)
-def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.password):
+async def login(user_data: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.run_sync(
+        lambda db: db.query(models.User).filter(models.User.email == user_data.email).first()
+    )
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
-    
+
+    verified, new_hash = await verify_and_update_password_async(user_data.password, user.password)
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
+    if new_hash:
+        # Stored hash predates the current PASSWORD_HASH_ROUNDS; upgrade it.
+        def upgrade(db: Session):
+            user.password = new_hash
+            db.commit()
+            invalidate_user(user.email)
+            db.refresh(user)
+
+        await db.run_sync(upgrade)
+
     access_token = create_access_token({"sub": user.email})
-    
+
     return {
-        "access_token": access_token, 
+        "access_token": access_token,
         "token_type": "bearer",
         "user": schemas.UserResponse.from_orm(user)
     }
 
 @app.get("/api/auth/me", response_model=schemas.UserResponse)
-def get_me(current_user: models.User = Depends(get_current_user)):
+async def get_me(current_user: models.User = Depends(get_current_user)):
     return schemas.UserResponse.from_orm(current_user)
 
 @app.patch("/api/users/me", response_model=schemas.UserResponse)
-def update_me(user_data: schemas.UserUpdate, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if user_data.name is not None:
-        current_user.name = user_data.name
-    
+async def update_me(user_data: schemas.UserUpdate, current_user: models.User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    new_password_hash = None
     if hasattr(user_data, 'new_password') and user_data.new_password and hasattr(user_data, 'current_password') and user_data.current_password:
-        if not verify_password(user_data.current_password, current_user.password):
+        if not await verify_password_async(user_data.current_password, current_user.password):
             raise HTTPException(status_code=400, detail="Incorrect current password")
-        current_user.password = get_password_hash(user_data.new_password)
-
-    if user_data.email is not None and user_data.email != current_user.email:
-        existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        current_user.email = user_data.email
+        new_password_hash = await get_password_hash_async(user_data.new_password)
+
+    def update(db: Session):
+        previous_email = current_user.email
+        renamed = user_data.name is not None and user_data.name != current_user.name
+        if user_data.name is not None:
+            current_user.name = user_data.name
+
+        if new_password_hash:
+            current_user.password = new_password_hash
+
+        if user_data.email is not None and user_data.email != current_user.email:
+            existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+            if existing_user:
+                raise HTTPException(status_code=400, detail="Email already registered")
+            current_user.email = user_data.email
+
+        if renamed:
+            db.flush()
+            search_index.index_user(db, current_user.id, with_content=True)
+        db.commit()
+        response_cache.bump()
+        user_directory.invalidate()
+        invalidate_user(previous_email, current_user.email)
+        db.refresh(current_user)
+        return schemas.UserResponse.from_orm(current_user)
 
-    db.commit()
-    db.refresh(current_user)
-    
-    return current_user
+    return await db.run_sync(update)
 
-@app.delete("/api/users/me/picture", response_model=schemas.UserResponse)
-def delete_profile_picture(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.profile_picture_url:
-        file_path = f"backend{current_user.profile_picture_url}"
+def _remove_picture_files(db: Session, picture_hash: Optional[str], picture_url: Optional[str]) -> None:
+    """
+    Delete a replaced picture's files once the change is committed. Variants
+    are content-addressed, so they are kept while any user still uses them.
+    """
+    if picture_hash:
+        if not db.query(models.User.id).filter(models.User.profile_picture_hash == picture_hash).first():
+            remove_variants(picture_hash)
+    elif picture_url:
+        file_path = f"backend{picture_url}"
         if os.path.exists(file_path):
             os.remove(file_path)
-        current_user.profile_picture_url = None
-        db.commit()
-        db.refresh(current_user)
-    return current_user
+
+@app.delete("/api/users/me/picture", response_model=schemas.UserResponse)
+async def delete_profile_picture(current_user: models.User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    def delete(db: Session):
+        if current_user.profile_picture_url:
+            old_hash, old_url = current_user.profile_picture_hash, current_user.profile_picture_url
+            current_user.profile_picture_hash = None
+            current_user.profile_picture_url = None
+            db.commit()
+            response_cache.bump()
+            user_directory.invalidate()
+            invalidate_user(current_user.email)
+            _remove_picture_files(db, old_hash, old_url)
+            db.refresh(current_user)
+        return schemas.UserResponse.from_orm(current_user)
+
+    return await db.run_sync(delete)
 
 @app.post("/api/users/me/picture", response_model=schemas.UserResponse)
-def upload_profile_picture(
+async def upload_profile_picture(
     file: UploadFile = File(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not os.path.exists("backend/uploads"):
-        os.makedirs("backend/uploads")
+    # Read with a size cap and render on the image pool, so neither a large
+    # upload nor Pillow's decoding ties up the event loop or request threads.
+    image_data = await read_upload(file)
+    rendered = await image_processor.render(image_data)
+    await run_in_threadpool(store_variants, rendered["files"])
+
+    def save(db: Session):
+        old_hash, old_url = current_user.profile_picture_hash, current_user.profile_picture_url
+        current_user.profile_picture_hash = rendered["hash"]
+        current_user.profile_picture_url = avatar_url(rendered["hash"])
+        db.commit()
+        response_cache.bump()
+        user_directory.invalidate()
+        invalidate_user(current_user.email)
+        if old_hash != rendered["hash"]:
+            _remove_picture_files(db, old_hash, old_url)
+        db.refresh(current_user)
+        return schemas.UserResponse.from_orm(current_user)
 
-    image_data = file.file.read()
-    img = Image.open(io.BytesIO(image_data))
-    img = img.resize((128, 128), Image.Resampling.LANCZOS)
+    return await db.run_sync(save)
 
-    file_name = f"{current_user.id}_profile.jpeg"
-    file_path = f"backend/uploads/{file_name}"
-    img.save(file_path, "JPEG", quality=85)
+@app.get("/api/users", response_model=List[schemas.UserResponse])
+async def get_users(
+    request: Request,
+    response: Response,
+    department: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    def build(db: Session):
+        query = db.query(models.User)
+        if department:
+            query = query.filter(models.User.department == department)
+
+        users, next_cursor = paginate(
+            query, (models.User.joined_at, models.User.id), cursor, limit,
+            key=lambda u: (u.joined_at, u.id),
+        )
+        set_next_cursor(response, next_cursor)
+        return users
 
-    current_user.profile_picture_url = f"/uploads/{file_name}"
-    db.commit()
-    db.refresh(current_user)
-    
-    return current_user
+    return await db.run_sync(
+        lambda db: response_cache.respond(request, response, List[schemas.UserResponse], lambda: build(db))
+    )
 
-@app.get("/api/users", response_model=List[schemas.UserResponse])
-def get_users(
+@app.get("/api/users/directory", response_model=List[schemas.DirectoryUser])
+async def get_user_directory(
+    response: Response,
+    q: str = Query("", max_length=100),
     department: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=50),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(models.User)
-    if department:
-        query = query.filter(models.User.department == department)
-    return query.all()
+    response.headers["Cache-Control"] = "private, max-age=30"
+    return await db.run_sync(user_directory.lookup, q, department, limit)
 
 @app.get("/api/users/{user_id}", response_model=schemas.UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.run_sync(lambda db: db.query(models.User).filter(models.User.id == user_id).first())
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-def get_reaction_counts(db: Session, shoutout_id: int) -> List[schemas.ReactionCount]:
-    counts = db.query(
-        models.Reaction.type,
-        func.count(models.Reaction.id).label('count')
-    ).filter(models.Reaction.shoutout_id == shoutout_id).group_by(models.Reaction.type).all()
-    
-    return [schemas.ReactionCount(type=r.type, count=r.count) for r in counts]
-
-def get_user_reaction(db: Session, shoutout_id: int, user_id: int) -> Optional[models.ReactionType]:
-    reaction = db.query(models.Reaction).filter(
-        models.Reaction.shoutout_id == shoutout_id,
-        models.Reaction.user_id == user_id
-    ).first()
-    return reaction.type if reaction else None
-
-def _get_shoutout_related_user_ids(shoutout: models.ShoutOut, exclude_user_id: int) -> set[int]:
+def _paginate_shoutouts(query, cursor: Optional[str], limit: int):
     """
-    Get a set of user IDs related to a shoutout (sender and recipients),
-    excluding a specific user.
+    Keyset-paginate a query selecting (ShoutOut.id, ShoutOut.created_at),
+    newest first.
     """
-    user_ids = {shoutout.sender_id}
-    for recipient in shoutout.recipients:
-        user_ids.add(recipient.recipient_id)
-    
-    user_ids.discard(exclude_user_id)
-    return user_ids
-
-def format_shoutout(shoutout: models.ShoutOut, db: Session, current_user_id: int) -> schemas.ShoutOutResponse:
-    sender_data = schemas.UserResponse.from_orm(shoutout.sender)
-    recipients_data = [
-        schemas.RecipientResponse(
-            id=r.recipient.id,
-            name=r.recipient.name,
-            email=r.recipient.email,
-            department=r.recipient.department,
-            profile_picture_url=r.recipient.profile_picture_url
-        ) for r in shoutout.recipients
-    ]
+    return paginate(
+        query, (models.ShoutOut.created_at, models.ShoutOut.id), cursor, limit,
+        key=lambda r: (r.created_at, r.id),
+    )
 
-    reaction_counts = get_reaction_counts(db, shoutout.id)
-    user_reaction = get_user_reaction(db, shoutout.id, current_user_id)
-
-    return schemas.ShoutOutResponse(
-        id=shoutout.id,
-        sender_id=shoutout.sender_id,
-        message=shoutout.message,
-        created_at=shoutout.created_at,
-        sender=sender_data,
-        recipients=recipients_data,
-        comments=shoutout.comments,
-        reaction_counts=reaction_counts,
-        user_reaction=user_reaction
+def _paginate_timeline(query, cursor: Optional[str], limit: int):
+    return paginate(
+        query, (models.TimelineEntry.created_at, models.TimelineEntry.shoutout_id), cursor, limit,
+        key=lambda r: (r.created_at, r.shoutout_id),
     )
 
 @app.post("/api/shoutouts", response_model=schemas.ShoutOutResponse, status_code=status.HTTP_201_CREATED)
-def create_shoutout(
+async def create_shoutout(
     shoutout_data: schemas.ShoutOutCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not shoutout_data.recipient_ids:
+    if not shoutout_data.recipient_ids and not shoutout_data.department:
         raise HTTPException(status_code=400, detail="At least one recipient is required")
 
-    new_shoutout = models.ShoutOut(
-        sender_id=current_user.id,
-        message=shoutout_data.message
-    )
-    db.add(new_shoutout)
-    db.flush()
-
-    for recipient_id in shoutout_data.recipient_ids:
-        recipient = db.query(models.User).filter(models.User.id == recipient_id).first()
-        if recipient:
-            shoutout_recipient = models.ShoutOutRecipient(
-                shoutout_id=new_shoutout.id,
-                recipient_id=recipient.id
+    def create(db: Session):
+        new_shoutout = models.ShoutOut(
+            sender_id=current_user.id,
+            message=shoutout_data.message
+        )
+        db.add(new_shoutout)
+        db.flush()
+
+        # Recipients are resolved and written set-based: each user matches the
+        # filter once, so duplicate ids collapse and no per-recipient SELECT runs.
+        recipient_filters = []
+        if shoutout_data.recipient_ids:
+            recipient_filters.append(models.User.id.in_(set(shoutout_data.recipient_ids)))
+        if shoutout_data.department:
+            recipient_filters.append(
+                (models.User.department == shoutout_data.department) & (models.User.id != current_user.id)
+            )
+        recipients = select(models.User.id).where(or_(*recipient_filters)).subquery()
+
+        added = db.execute(
+            insert(models.ShoutOutRecipient).from_select(
+                [models.ShoutOutRecipient.shoutout_id, models.ShoutOutRecipient.recipient_id],
+                select(literal(new_shoutout.id), recipients.c.id),
             )
-            db.add(shoutout_recipient)
-            
-            if recipient.id != current_user.id:
-                notification = models.Notification(
-                    user_id=recipient.id,
-                    type=models.NotificationType.tag,
-                    message=f"{current_user.name} recognised you in a shout-out",
-                    shoutout_id=new_shoutout.id
-                )
-                db.add(notification)
-    
-    db.commit()
-    db.refresh(new_shoutout)
-    
-    return format_shoutout(new_shoutout, db, current_user.id)
+        ).rowcount
+        if not added:
+            raise HTTPException(status_code=400, detail="No valid recipients found")
+
+        fan_out_shoutout(db, new_shoutout.id)
+        record_shoutout(db, new_shoutout.id, 1)
+        search_index.index_shoutout(db, new_shoutout.id)
+        enqueue_event(db, models.NotificationType.tag, current_user, new_shoutout.id, shoutout_id=new_shoutout.id)
+        db.commit()
+        response_cache.bump()
+        notification_dispatcher.wake()
+
+        return hydrate_shoutout(db, new_shoutout.id, current_user.id)
+
+    return await db.run_sync(create)
 
 @app.get("/api/shoutouts", response_model=List[schemas.ShoutOutResponse])
-def get_shoutouts(
+async def get_shoutouts(
+    request: Request,
+    response: Response,
     department: Optional[str] = None,
     sender_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(models.ShoutOut)
-    
-    if department:
-        query = query.join(models.User, models.ShoutOut.sender_id == models.User.id).filter(models.User.department == department)
-    
-    if sender_id:
-        query = query.filter(models.ShoutOut.sender_id == sender_id)
-
-    if start_date:
-        if start_date.tzinfo is None:
-            start_date = pytz.UTC.localize(start_date)
-        query = query.filter(models.ShoutOut.created_at >= start_date)
-    
-    shoutouts = query.order_by(desc(models.ShoutOut.created_at)).all()
-    
-    return [format_shoutout(s, db, current_user.id) for s in shoutouts]
+    def build(db: Session):
+        query = db.query(models.ShoutOut.id, models.ShoutOut.created_at)
+
+        if department:
+            query = query.join(models.User, models.ShoutOut.sender_id == models.User.id).filter(models.User.department == department)
+
+        if sender_id:
+            query = query.filter(models.ShoutOut.sender_id == sender_id)
+
+        if start_date:
+            query = query.filter(
+                models.ShoutOut.created_at >= (pytz.UTC.localize(start_date) if start_date.tzinfo is None else start_date)
+            )
+
+        rows, next_cursor = _paginate_shoutouts(query, cursor, limit)
+        set_next_cursor(response, next_cursor)
+
+        return shoutout_payloads(db, [r.id for r in rows], current_user.id)
+
+    def respond(db: Session):
+        if wants_ndjson(request):
+            return list_response(request, response, build(db))
+        # Per viewer: each payload carries the viewer's own reactions.
+        return response_cache.respond(
+            request, response, List[schemas.ShoutOutResponse], lambda: build(db),
+            viewer_id=current_user.id, serialize=dumps,
+        )
+
+    return await db.run_sync(respond)
 
 @app.get("/api/users/me/shoutouts", response_model=List[schemas.ShoutOutResponse])
-def get_my_shoutouts(
+async def get_my_shoutouts(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutouts = db.query(models.ShoutOut).filter(models.ShoutOut.sender_id == current_user.id).order_by(desc(models.ShoutOut.created_at)).all()
-    return [format_shoutout(s, db, current_user.id) for s in shoutouts]
+    items = await db.run_sync(_timeline_page, response, current_user.id, models.TimelineKind.sent, cursor, limit)
+    return list_response(request, response, items)
 
 @app.get("/api/users/me/tagged", response_model=List[schemas.ShoutOutResponse])
-def get_tagged_shoutouts(
+async def get_tagged_shoutouts(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    items = await db.run_sync(_timeline_page, response, current_user.id, models.TimelineKind.tagged, cursor, limit)
+    return list_response(request, response, items)
+
+def _timeline_page(db: Session, response: Response, user_id: int, kind: models.TimelineKind, cursor: Optional[str], limit: int):
+    rows, next_cursor = _paginate_timeline(timeline_query(db, user_id, kind), cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return shoutout_payloads(db, [r.shoutout_id for r in rows], user_id)
+
+@app.get("/api/search", response_model=List[schemas.SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=50),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutout_ids = db.query(models.ShoutOutRecipient.shoutout_id).filter(models.ShoutOutRecipient.recipient_id == current_user.id).all()
-    shoutout_ids = [s.shoutout_id for s in shoutout_ids]
-    
-    shoutouts = db.query(models.ShoutOut).filter(models.ShoutOut.id.in_(shoutout_ids)).order_by(desc(models.ShoutOut.created_at)).all()
-    
-    return [format_shoutout(s, db, current_user.id) for s in shoutouts]
+    kinds = kind or list(SEARCH_KINDS)
+    unknown = set(kinds) - set(SEARCH_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search kind: {', '.join(sorted(unknown))}")
+    return await db.run_sync(search_index.search, q, kinds, limit)
 
 @app.get("/api/shoutouts/{shoutout_id}", response_model=schemas.ShoutOutResponse)
-def get_shoutout(
+async def get_shoutout(
     shoutout_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
+    shoutout = await db.run_sync(hydrate_shoutout, shoutout_id, current_user.id)
     if not shoutout:
         raise HTTPException(status_code=404, detail="Shout-out not found")
-    
-    return format_shoutout(shoutout, db, current_user.id)
+
+    return shoutout
 
 @app.post("/api/shoutouts/{shoutout_id}/comments", response_model=schemas.CommentResponse, status_code=status.HTTP_201_CREATED)
-def create_comment(
+async def create_comment(
     shoutout_id: int,
     comment_data: schemas.CommentCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
-    if not shoutout:
-        raise HTTPException(status_code=404, detail="Shout-out not found")
-    
-    new_comment = models.Comment(
-        shoutout_id=shoutout_id,
-        user_id=current_user.id,
-        content=comment_data.content
-    )
-    db.add(new_comment)
+    def create(db: Session):
+        shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
+        if not shoutout:
+            raise HTTPException(status_code=404, detail="Shout-out not found")
 
-    target_user_ids = _get_shoutout_related_user_ids(shoutout, exclude_user_id=current_user.id)
-    for user_id in target_user_ids:
-        if user_id == shoutout.sender_id:
-            message = f"{current_user.name} commented on your shout-out"
-        else:
-            message = f"{current_user.name} commented on a shout-out you are part of"
-
-        notification = models.Notification(
-            user_id=user_id,
-            type=models.NotificationType.comment,
-            message=message,
-            shoutout_id=shoutout.id
+        new_comment = models.Comment(
+            shoutout_id=shoutout_id,
+            user_id=current_user.id,
+            content=comment_data.content
         )
-        db.add(notification)
+        db.add(new_comment)
+        db.flush()
+        adjust_comment_count(db, shoutout_id, 1)
+        search_index.index_comment(db, new_comment.id)
+
+        enqueue_event(db, models.NotificationType.comment, current_user, new_comment.id, shoutout_id=shoutout.id)
+        db.commit()
+        response_cache.bump()
+        notification_dispatcher.wake()
+        db.refresh(new_comment)
+
+        return schemas.CommentResponse.from_orm(new_comment)
 
-    db.commit()
-    db.refresh(new_comment)
-    
-    return new_comment
+    return await db.run_sync(create)
 
 @app.post("/api/shoutouts/{shoutout_id}/reactions")
-def toggle_reaction(
+async def toggle_reaction(
     shoutout_id: int,
     reaction_data: schemas.ReactionCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
-    if not shoutout:
-        raise HTTPException(status_code=404, detail="Shout-out not found")
-    
-    existing_reaction = db.query(models.Reaction).filter(
-        models.Reaction.shoutout_id == shoutout_id,
-        models.Reaction.user_id == current_user.id
-    ).first()
-    
-    action = None
-    if existing_reaction:
-        if existing_reaction.type == reaction_data.type:
-            db.delete(existing_reaction)
-            action = "removed"
-        else:
-            existing_reaction.type = reaction_data.type
-            action = "updated"
-    else:
-        new_reaction = models.Reaction(
-            shoutout_id=shoutout_id,
-            user_id=current_user.id,
-            type=reaction_data.type
-        )
-        db.add(new_reaction)
-        action = "added"
-
-    if action == "added":
-        target_user_ids = _get_shoutout_related_user_ids(shoutout, exclude_user_id=current_user.id)
-        for user_id in target_user_ids:
-            if user_id == shoutout.sender_id:
-                message = f"{current_user.name} reacted to your shout-out"
+    def toggle(db: Session):
+        shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
+        if not shoutout:
+            raise HTTPException(status_code=404, detail="Shout-out not found")
+
+        existing_reaction = db.query(models.Reaction).filter(
+            models.Reaction.shoutout_id == shoutout_id,
+            models.Reaction.user_id == current_user.id
+        ).first()
+
+        action = None
+        if existing_reaction:
+            if existing_reaction.type == reaction_data.type:
+                db.delete(existing_reaction)
+                adjust_reaction_count(db, shoutout_id, existing_reaction.type, -1)
+                action = "removed"
             else:
-                message = f"{current_user.name} reacted to a shout-out you are part of"
-
-            notification = models.Notification(
-                user_id=user_id,
-                type=models.NotificationType.reaction,
-                message=message,
-                shoutout_id=shoutout.id
+                adjust_reaction_count(db, shoutout_id, existing_reaction.type, -1)
+                adjust_reaction_count(db, shoutout_id, reaction_data.type, 1)
+                existing_reaction.type = reaction_data.type
+                action = "updated"
+        else:
+            new_reaction = models.Reaction(
+                shoutout_id=shoutout_id,
+                user_id=current_user.id,
+                type=reaction_data.type
             )
-            db.add(notification)
+            db.add(new_reaction)
+            adjust_reaction_count(db, shoutout_id, reaction_data.type, 1)
+            action = "added"
+
+        if action == "added":
+            enqueue_event(
+                db, models.NotificationType.reaction, current_user, f"{shoutout.id}:{current_user.id}",
+                shoutout_id=shoutout.id,
+            )
+
+        db.commit()
+        response_cache.bump()
+        if action == "added":
+            notification_dispatcher.wake()
 
-    db.commit()
-    
-    return {"message": f"Reaction {action}", "action": action}
+        return {"message": f"Reaction {action}", "action": action}
+
+    return await db.run_sync(toggle)
 
 @app.get("/api/shoutouts/{shoutout_id}/reactions", response_model=List[schemas.ReactionResponse])
-def get_shoutout_reactions(
+async def get_shoutout_reactions(
     shoutout_id: int,
+    response: Response,
     type: Optional[models.ReactionType] = None,
-    page: int = 1,
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(models.Reaction).filter(models.Reaction.shoutout_id == shoutout_id)
-    
-    if type:
-        query = query.filter(models.Reaction.type == type)
-        
-    reactions = query.offset((page - 1) * limit).limit(limit).all()
-    
-    return reactions
+    def page(db: Session):
+        query = (
+            db.query(models.Reaction)
+            .options(joinedload(models.Reaction.user))
+            .filter(models.Reaction.shoutout_id == shoutout_id)
+        )
+
+        if type:
+            query = query.filter(models.Reaction.type == type)
+
+        reactions, next_cursor = paginate(query, (models.Reaction.id,), cursor, limit, key=lambda r: (r.id,))
+        set_next_cursor(response, next_cursor)
+        return reactions
+
+    return await db.run_sync(page)
 
 @app.post("/api/reports", status_code=status.HTTP_201_CREATED)
-def create_report(
+async def create_report(
     report: schemas.ReportCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    try:
+    def create(db: Session):
         new_report = models.Report(
             shoutout_id=report.shoutout_id,
             comment_id=report.comment_id,
@@ -436,23 +613,12 @@ def create_report(
         db.add(new_report)
         db.flush()
 
-        admins = db.query(models.User).filter(models.User.role == models.UserRole.admin).all()
-        for admin in admins:
-            if report.comment_id is not None:
-                message = f"{current_user.name} reported a comment on shout-out #{report.shoutout_id}"
-            else:
-                message = f"{current_user.name} reported shout-out #{report.shoutout_id}"
-            
-            notification = models.Notification(
-                user_id=admin.id,
-                type=models.NotificationType.report,
-                message=message,
-                shoutout_id=report.shoutout_id,
-                is_read=False
-            )
-            db.add(notification)
-        
+        enqueue_event(
+            db, models.NotificationType.report, current_user, new_report.id,
+            shoutout_id=report.shoutout_id, comment_id=report.comment_id,
+        )
         db.commit()
+        notification_dispatcher.wake()
         db.refresh(new_report)
 
         return {
@@ -466,146 +632,206 @@ def create_report(
                 "created_at": new_report.created_at,
             }
         }
+
+    try:
+        return await db.run_sync(create)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating report: {e}")
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error while creating report."})
 
-@app.get("/api/admin/reports", response_model=List[schemas.ReportResponse])
-def get_reports(
+@app.get("/api/admin/reports", response_model=Union[List[schemas.ReportResponse], List[schemas.ReportGroupResponse]])
+async def get_reports(
+    response: Response,
     status: Optional[models.ReportStatus] = None,
-    db: Session = Depends(get_db),
+    target_type: Optional[str] = Query(None, pattern="^(shoutout|comment)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    group_by_target: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.User = Depends(get_current_admin),
 ):
     """
     Return the list of reports for admin dashboard.
-    If `status` is provided, filter by that status (e.g. pending, reviewed, resolved).
-    Order by created_at DESC.
+    If `status` is provided, filter by that status (e.g. pending, reviewed, resolved);
+    `target_type` and `start_date`/`end_date` (end exclusive) narrow it further.
+    With `group_by_target`, reports of the same shout-out or comment collapse
+    into one entry with counts, ordered by their latest report.
+    Order by created_at DESC, paged with an opaque `cursor`; the cursor for
+    the next page is returned in the X-Next-Cursor header.
     """
     try:
-        query = db.query(models.Report).outerjoin(models.User, models.Report.reporter_id == models.User.id)
-
-        if status:
-            query = query.filter(models.Report.status == status)
-        
-        reports = query.order_by(models.Report.created_at.desc()).all()
-
-        response_reports = []
-        for report in reports:
-            reporter_info = schemas.ReporterInfo(
-                id=report.reporter.id,
-                name=report.reporter.name
-            ) if report.reporter else None
-
-            target_type = None
-            target_user_name = None
-            if report.shoutout_id:
-                target_type = "shoutout"
-                shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == report.shoutout_id).first()
-                if shoutout and shoutout.sender:
-                    target_user_name = shoutout.sender.name
-            elif report.comment_id:
-                target_type = "comment"
-                comment = db.query(models.Comment).filter(models.Comment.id == report.comment_id).first()
-                if comment and comment.user:
-                    target_user_name = comment.user.name
-            
-            response_reports.append(
-                schemas.ReportResponse(
-                    id=report.id,
-                    shoutout_id=report.shoutout_id,
-                    comment_id=report.comment_id,
-                    reporter=reporter_info,
-                    reason=report.reason,
-                    created_at=report.created_at,
-                    status=report.status,
-                    target_type=target_type,
-                    target_user_name=target_user_name
-                )
+        start_date = pytz.UTC.localize(start_date) if start_date and start_date.tzinfo is None else start_date
+        end_date = pytz.UTC.localize(end_date) if end_date and end_date.tzinfo is None else end_date
+        list_page = list_report_groups if group_by_target else list_reports
+        reports, next_cursor = await db.run_sync(
+            lambda db: list_page(
+                db, cursor, limit,
+                status=status, target_type=target_type, start_date=start_date, end_date=end_date,
             )
-        return response_reports
+        )
+        set_next_cursor(response, next_cursor)
+        return reports
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting reports: {e}")
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error while getting reports."})
 
 
 @app.patch("/api/admin/reports/{report_id}/status", response_model=schemas.ReportResponse)
-def update_report_status(
+async def update_report_status(
     report_id: int,
     status: models.ReportStatus = Body(..., embed=True),
     current_user: models.User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
-    if not report:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    def update(db: Session):
+        report = db.query(models.Report).filter(models.Report.id == report_id).first()
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
 
-    report.status = status
-    db.commit()
-    db.refresh(report)
-    return report
+        report.status = status
+        db.commit()
+        db.refresh(report)
+        return schemas.ReportResponse.from_orm(report)
+
+    return await db.run_sync(update)
 
 @app.delete("/api/shoutouts/{shoutout_id}", status_code=status.HTTP_200_OK)
-def delete_shoutout(
+async def delete_shoutout(
     shoutout_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
-    if not shoutout:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shout-out not found")
+    def delete(db: Session):
+        shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == shoutout_id).first()
+        if not shoutout:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shout-out not found")
 
-    if shoutout.sender_id != current_user.id and current_user.role != models.UserRole.admin:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this shout-out")
+        if shoutout.sender_id != current_user.id and current_user.role != models.UserRole.admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this shout-out")
 
-    # Manually delete related notifications, as they don't have a direct relationship with cascade
-    db.query(models.Notification).filter(models.Notification.shoutout_id == shoutout_id).delete(synchronize_session=False)
+        # Manually delete related notifications, as they don't have a direct relationship with cascade
+        db.query(models.Notification).filter(models.Notification.shoutout_id == shoutout_id).delete(synchronize_session=False)
 
-    # Manually delete related reports to prevent foreign key constraint errors
-    db.query(models.Report).filter(models.Report.shoutout_id == shoutout_id).delete(synchronize_session=False)
+        # Manually delete related reports to prevent foreign key constraint errors
+        db.query(models.Report).filter(models.Report.shoutout_id == shoutout_id).delete(synchronize_session=False)
 
-    db.delete(shoutout)
-    db.commit()
+        prune_shoutout(db, shoutout_id)
+        discard_shoutout_events(db, shoutout_id)
+        record_shoutout(db, shoutout_id, -1)
+        search_index.remove_shoutout(db, shoutout_id)
+        db.delete(shoutout)
+        db.commit()
+        response_cache.bump()
+
+    await db.run_sync(delete)
     return {"message": "Shout-out deleted successfully"}
 
 @app.delete("/api/users/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
     current_user: models.User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_to_delete = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user_to_delete:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    db.delete(user_to_delete)
-    db.commit()
+    def delete(db: Session):
+        user_to_delete = db.query(models.User).filter(models.User.id == user_id).first()
+        if not user_to_delete:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        email = user_to_delete.email
+        picture_hash, picture_url = user_to_delete.profile_picture_hash, user_to_delete.profile_picture_url
+        record_user_deleted(db, user_to_delete)
+        search_index.remove_user(db, user_to_delete.id)
+        db.delete(user_to_delete)
+        db.commit()
+        response_cache.bump()
+        user_directory.invalidate()
+        invalidate_user(email)
+        _remove_picture_files(db, picture_hash, picture_url)
+
+    await db.run_sync(delete)
     return {"message": "User deleted successfully"}
 
+@app.patch("/api/users/{user_id}/role", response_model=schemas.UserResponse)
+async def update_user_role(
+    user_id: int,
+    role: models.UserRole,
+    current_user: models.User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    def update(db: Session):
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        user.role = role
+        db.commit()
+        response_cache.bump()
+        invalidate_user(user.email)
+        db.refresh(user)
+        return schemas.UserResponse.from_orm(user)
+
+    return await db.run_sync(update)
+
+@app.get("/api/admin/metrics/user-cache")
+async def get_user_cache_metrics(current_user: models.User = Depends(get_current_admin)):
+    return user_cache.stats()
+
+@app.get("/api/admin/metrics/password-hashing")
+async def get_password_hashing_metrics(current_user: models.User = Depends(get_current_admin)):
+    return password_hasher.stats()
+
+@app.get("/api/admin/metrics/image-processing")
+async def get_image_processing_metrics(current_user: models.User = Depends(get_current_admin)):
+    return image_processor.stats()
+
+@app.get("/api/admin/metrics/user-directory")
+async def get_user_directory_metrics(current_user: models.User = Depends(get_current_admin)):
+    return user_directory.stats()
+
+@app.get("/api/admin/metrics/db-pool")
+async def get_db_pool_metrics(current_user: models.User = Depends(get_current_admin)):
+    return pool_stats()
+
+@app.get("/api/admin/metrics/response-cache")
+async def get_response_cache_metrics(current_user: models.User = Depends(get_current_admin)):
+    return response_cache.stats()
+
 @app.delete("/api/comments/{comment_id}", status_code=status.HTTP_200_OK)
-def delete_comment(
+async def delete_comment(
     comment_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-
-    if comment.user_id != current_user.id and current_user.role != models.UserRole.admin:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this comment")
+    def delete(db: Session):
+        comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
+        if not comment:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+
+        if comment.user_id != current_user.id and current_user.role != models.UserRole.admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this comment")
+
+        discard_comment_events(db, comment.id)
+        db.delete(comment)
+        adjust_comment_count(db, comment.shoutout_id, -1)
+        search_index.remove_comment(db, comment.id)
+        db.commit()
+        response_cache.bump()
 
-    db.delete(comment)
-    db.commit()
+    await db.run_sync(delete)
     return {"message": "Comment deleted successfully"}
 
 @app.get("/api/notifications", response_model=List[schemas.NotificationResponse])
-def get_notifications(
+async def get_notifications(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    notifications = (
-        db.query(models.Notification)
+    notifications = await db.run_sync(
+        lambda db: db.query(models.Notification)
         .filter(models.Notification.user_id == current_user.id)
         .order_by(models.Notification.is_read.asc(), models.Notification.created_at.desc())
         .limit(50)
@@ -613,96 +839,164 @@ def get_notifications(
     )
     return notifications
 
+@app.get("/api/notifications/unread-count", response_model=schemas.UnreadCountResponse)
+async def get_unread_notification_count(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return {"unread_count": await db.run_sync(count_unread, current_user.id)}
+
+@app.get("/api/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    token: Optional[str] = None,
+    last_event_id: Optional[int] = Query(None, alias="last_event_id"),
+    authorization: Optional[str] = Header(None),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-Sent Events stream of new notifications and unread counts.
+    EventSource cannot send headers, so the access token may be passed as
+    `?token=`. Reconnecting clients resume after `Last-Event-ID`.
+    """
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    user_id = await resolve_stream_user(token)
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    return StreamingResponse(
+        notification_stream(request, user_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/api/notifications/{notification_id}/read", response_model=schemas.NotificationResponse)
-def mark_notification_as_read(
+async def mark_notification_as_read(
     notification_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    notification = db.query(models.Notification).filter(
-        models.Notification.id == notification_id,
-        models.Notification.user_id == current_user.id
-    ).first()
-
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
-
-    notification.is_read = True
-    db.commit()
-    db.refresh(notification)
-    
+    def mark(db: Session):
+        notification = db.query(models.Notification).filter(
+            models.Notification.id == notification_id,
+            models.Notification.user_id == current_user.id
+        ).first()
+
+        if not notification:
+            raise HTTPException(status_code=404, detail="Notification not found")
+
+        notification.is_read = True
+        db.commit()
+        db.refresh(notification)
+        return schemas.NotificationResponse.from_orm(notification)
+
+    user_id = current_user.id
+    notification = await db.run_sync(mark)
+    notification_hub.publish([user_id])
+
     return notification
 
 @app.post("/api/notifications/mark-all-read", status_code=status.HTTP_200_OK)
-def mark_all_notifications_as_read(
+async def mark_all_notifications_as_read(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db.query(models.Notification).filter(
-        models.Notification.user_id == current_user.id,
-        models.Notification.is_read == False
-    ).update({"is_read": True})
-    
-    db.commit()
-    
+    def mark_all(db: Session):
+        db.query(models.Notification).filter(
+            models.Notification.user_id == current_user.id,
+            models.Notification.is_read == False
+        ).update({"is_read": True})
+
+        db.commit()
+
+    user_id = current_user.id
+    await db.run_sync(mark_all)
+    notification_hub.publish([user_id])
+
     return {"status": "ok"}
 
 @app.get("/api/admin/stats", response_model=schemas.AdminStatsResponse)
-def get_admin_stats(
+async def get_admin_stats(
+    request: Request,
+    response: Response,
+    window: Optional[str] = Query(None, description="7d, 30d, quarter or all"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=50),
     current_user: models.User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    total_users = db.query(models.User).count()
-    total_shoutouts = db.query(models.ShoutOut).count()
-
-    most_recognized_users_data = (
-        db.query(
-            models.User.id,
-            models.User.name,
-            models.User.profile_picture_url,
-            func.count(models.ShoutOutRecipient.id).label("count"),
+    days = resolve_window(window, start_date, end_date)
+    window_name = "custom" if start_date or end_date else (window or "all")
+    return await db.run_sync(
+        lambda db: response_cache.respond(
+            request, response, schemas.AdminStatsResponse,
+            lambda: _admin_stats(db, response, window_name, days, department, limit),
         )
-        .join(models.ShoutOutRecipient, models.User.id == models.ShoutOutRecipient.recipient_id)
-        .group_by(models.User.id)
-        .order_by(desc("count"))
-        .limit(5)
-        .all()
     )
-    
+
+def _admin_stats(db: Session, response: Response, window: str, days, department: Optional[str], limit: int):
+    state = rollup_state(db)
+    set_rollup_headers(response, state)
+
     most_recognized_users = [
         schemas.MostRecognizedUser(
             id=user.id,
             name=user.name,
             profile_picture_url=user.profile_picture_url,
-            count=user.count
+            count=count
         )
-        for user in most_recognized_users_data
+        for user, count in leaderboard(db, "shoutouts_received", days, department, limit)
     ]
+    top_contributors = [
+        schemas.TopContributor(
+            id=user.id,
+            name=user.name,
+            department=user.department,
+            profile_picture_url=user.profile_picture_url,
+            total_shoutouts_sent=count,
+        )
+        for user, count in leaderboard(db, "shoutouts_sent", days, department, limit)
+    ]
+    series = daily_shoutouts(db, days, department)
 
     return {
-        "total_users": total_users,
-        "total_shoutouts": total_shoutouts,
+        "total_users": state.total_users,
+        "total_shoutouts": state.total_shoutouts,
         "most_recognized_users": most_recognized_users,
+        "top_contributors": top_contributors,
+        "window": window,
+        "start_date": series[0]["day"] if series else None,
+        "end_date": series[-1]["day"] if series else None,
+        "department": department,
+        "window_shoutouts": sum(point["count"] for point in series),
+        "daily_shoutouts": series,
+        "rollups_updated_at": state.updated_at,
+        "rollups_rebuilt_at": state.rebuilt_at,
     }
 
 @app.get("/api/admin/stats/top-contributors", response_model=List[schemas.TopContributor])
-def get_top_contributors(
+async def get_top_contributors(
+    request: Request,
+    response: Response,
     limit: int = 5,
     current_user: models.User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    top_contributors_data = (
-        db.query(
-            models.User,
-            func.count(models.ShoutOut.id).label("total_shoutouts_sent"),
+    return await db.run_sync(
+        lambda db: response_cache.respond(
+            request, response, List[schemas.TopContributor], lambda: _top_contributors(db, response, limit)
         )
-        .join(models.ShoutOut, models.User.id == models.ShoutOut.sender_id)
-        .group_by(models.User.id)
-        .order_by(desc("total_shoutouts_sent"))
-        .limit(limit)
-        .all()
     )
 
+def _top_contributors(db: Session, response: Response, limit: int):
+    set_rollup_headers(response, rollup_state(db))
+    top_contributors_data = leaderboard(db, "shoutouts_sent", None, None, limit)
+
     return [
         schemas.TopContributor(
             id=user.id,
@@ -716,15 +1010,19 @@ def get_top_contributors(
 
 @app.get("/api/admin/stats/shoutouts-by-department",
          response_model=List[schemas.DepartmentShoutOutStats])
-def get_shoutouts_by_department(current_user: models.User = Depends(get_current_admin),
-                                db: Session = Depends(get_db)):
-    results = (
-        db.query(models.User.department,
-                 func.count(models.ShoutOut.id).label("shoutout_count"))
-        .join(models.ShoutOut, models.ShoutOut.sender_id == models.User.id)
-        .group_by(models.User.department)
-        .all()
+async def get_shoutouts_by_department(request: Request,
+                                      response: Response,
+                                      current_user: models.User = Depends(get_current_admin),
+                                      db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(
+        lambda db: response_cache.respond(
+            request, response, List[schemas.DepartmentShoutOutStats], lambda: _shoutouts_by_department(db, response)
+        )
     )
+
+def _shoutouts_by_department(db: Session, response: Response):
+    set_rollup_headers(response, rollup_state(db))
+    results = department_totals(db)
     return [
         schemas.DepartmentShoutOutStats(
             department=d or "Unknown",
@@ -732,4 +1030,55 @@ def get_shoutouts_by_department(current_user: models.User = Depends(get_current_
         ) for d, c in results
     ]
 
-    
+@app.get("/api/admin/exports/{name}")
+async def export_data(
+    name: str,
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    window: Optional[str] = Query(None, description="7d, 30d, quarter or all"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    current_user: models.User = Depends(get_current_admin),
+):
+    """
+    Stream `shoutouts` (with recipients, reaction counts and comments) or
+    `user-stats` (per-user sent/received counts) as CSV or NDJSON.
+    """
+    export = EXPORTS.get(name)
+    if export is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export; use one of {', '.join(EXPORTS)}")
+    media_type = export_media_type(export_format)
+    # Exports stream their rows, so any range is fine.
+    days = resolve_window(window, start_date, end_date, max_days=None)
+    return StreamingResponse(
+        stream_export(SessionLocal, export, export_format, days, department),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(export, export_format, days, department)}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+@app.post("/api/admin/users/import", response_model=schemas.UserImportResponse)
+async def import_users(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", description="csv or ndjson; defaults from Content-Type"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_admin),
+):
+    """
+    Create employees from a CSV (header row) or NDJSON request body with
+    name, email, department and password per row. Rows that fail validation
+    or whose email is already taken are reported and skipped.
+    """
+    fmt = resolve_import_format(import_format, request.headers.get("content-type", ""))
+    job = UserImport()
+    with await spool_request(request) as lines:
+        for batch in batches(parse_rows(lines, fmt)):
+            prepared = await db.run_sync(job.prepare, batch)
+            hashes = await password_hasher.hash_many_async([user.password for _, user in prepared])
+            await db.run_sync(job.insert, prepared, hashes)
+    if job.created:
+        response_cache.bump()
+        user_directory.invalidate()
+    return job.report()
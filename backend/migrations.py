@@ -0,0 +1,107 @@
+"""
+In-place schema upgrades for databases created by an older version.
+
+`Base.metadata.create_all` creates missing tables but never alters existing
+ones, so columns and indexes that were added to tables which already exist
+(e.g. `notifications.event_id`, the shout-out counters, the keyset
+pagination indexes) are applied here. On SQLite it also rewrites timestamps
+stored by `CURRENT_TIMESTAMP` defaults into the format the app writes. Every
+step inspects the live schema and only issues what is missing, so it is safe
+to run repeatedly.
+The API runs it at startup right after `create_all`; to apply it ahead of a
+deploy, or to print the statements without running them:
+
+    python -m backend.migrations [--dry-run]
+
+Added columns start out at their defaults. Backfill the derived data with
+`python -m backend.counters`, `backend.timeline`, `backend.rollups` and
+`backend.search` afterwards.
+"""
+import argparse
+import logging
+from typing import List, Union
+from sqlalchemy import DateTime, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateIndex, DDLElement
+from backend.database import Base
+
+logger = logging.getLogger(__name__)
+
+def _add_column(conn: Connection, table, column) -> str:
+    preparer = conn.dialect.identifier_preparer
+    spec = CreateColumn(column).compile(dialect=conn.dialect)
+    return f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"
+
+def _short_timestamps(conn: Connection, table, column) -> bool:
+    # CURRENT_TIMESTAMP server defaults stored 'YYYY-MM-DD HH:MM:SS'.
+    return conn.execute(
+        text(f"SELECT 1 FROM {table.name} WHERE length({column.name}) = 19 LIMIT 1")
+    ).first() is not None
+
+def pending_upgrades(conn: Connection) -> List[Union[DDLElement, str]]:
+    """The statements needed to bring existing tables up to the current models."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    statements: List[Union[DDLElement, str]] = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all creates it with every column and index
+
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        added = set()
+        for column in table.columns:
+            if column.name not in columns:
+                statements.append(_add_column(conn, table, column))
+                added.add(column.name)
+        if added and conn.dialect.name != "sqlite":
+            # SQLite cannot add constraints to an existing table.
+            for fk in table.foreign_key_constraints:
+                if set(fk.column_keys) <= added:
+                    statements.append(AddConstraint(fk))
+
+        if conn.dialect.name == "sqlite":
+            # Rewrite timestamps into the driver's '.ffffff' format so keyset
+            # cursors can compare the raw column text.
+            for column in table.columns:
+                if isinstance(column.type, DateTime) and column.name in columns and _short_timestamps(conn, table, column):
+                    statements.append(
+                        f"UPDATE {table.name} SET {column.name} = {column.name} || '.000000' "
+                        f"WHERE length({column.name}) = 19"
+                    )
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        indexes |= {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in indexes:
+                statements.append(CreateIndex(index))
+    return statements
+
+def upgrade_schema(engine: Engine, dry_run: bool = False) -> List[str]:
+    """Apply `pending_upgrades` in one transaction; returns the SQL it ran."""
+    with engine.begin() as conn:
+        applied = []
+        for statement in pending_upgrades(conn):
+            sql = statement if isinstance(statement, str) else str(statement.compile(dialect=conn.dialect)).strip()
+            if not dry_run:
+                logger.info("Schema upgrade: %s", sql)
+                conn.exec_driver_sql(sql)
+            applied.append(sql)
+        return applied
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Add missing columns and indexes to existing tables and normalize SQLite timestamps.")
+    parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    args = parser.parse_args()
+
+    from backend import models  # noqa: F401 - registers the tables on Base
+    from backend.database import engine
+
+    if not args.dry_run:
+        Base.metadata.create_all(bind=engine)
+    applied = upgrade_schema(engine, dry_run=args.dry_run)
+    for sql in applied:
+        print(f"{sql};")
+    print(f"{len(applied)} schema change(s) {'pending' if args.dry_run else 'applied'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, CheckConstraint, Boolean
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum, CheckConstraint, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from datetime import timezone
+from datetime import datetime, timezone
 from backend.database import Base
+from backend.images import variant_urls
+
+# Timestamps are also set client-side so SQLite stores every row in the
+# driver's 'YYYY-MM-DD HH:MM:SS.ffffff' format (CURRENT_TIMESTAMP has no
+# fraction); keyset cursors compare the raw text. backend.migrations
+# rewrites older rows into the same format.
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 class UserRole(str, enum.Enum):
     employee = "employee"
@@ -23,8 +31,9 @@ class User(Base):
     password = Column(String, nullable=False)
     department = Column(String, nullable=False)
     role = Column(Enum(UserRole), default=UserRole.employee, nullable=False)
-    joined_at = Column(DateTime(timezone=True), server_default=func.now())
+    joined_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     profile_picture_url = Column(String, nullable=True)
+    profile_picture_hash = Column(String, nullable=True, index=True)
     
     sent_shoutouts = relationship("ShoutOut", foreign_keys="ShoutOut.sender_id", back_populates="sender")
     received_shoutouts = relationship("ShoutOutRecipient", back_populates="recipient")
@@ -32,19 +41,37 @@ class User(Base):
     reactions = relationship("Reaction", back_populates="user")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_users_joined_at_id", "joined_at", "id"),
+        Index("ix_users_department_joined_at_id", "department", "joined_at", "id"),
+    )
+
+    @property
+    def profile_picture_variants(self):
+        return variant_urls(self.profile_picture_hash) if self.profile_picture_hash else []
+
 class ShoutOut(Base):
     __tablename__ = "shoutouts"
     
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
+    clap_count = Column(Integer, default=0, server_default="0", nullable=False)
+    star_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
     
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_shoutouts")
     recipients = relationship("ShoutOutRecipient", back_populates="shoutout", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="shoutout", cascade="all, delete-orphan")
     reactions = relationship("Reaction", back_populates="shoutout", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_shoutouts_created_at_id", "created_at", "id"),
+        Index("ix_shoutouts_sender_id_created_at_id", "sender_id", "created_at", "id"),
+    )
+
 class ShoutOutRecipient(Base):
     __tablename__ = "shoutout_recipients"
     
@@ -55,6 +82,11 @@ class ShoutOutRecipient(Base):
     shoutout = relationship("ShoutOut", back_populates="recipients")
     recipient = relationship("User", back_populates="received_shoutouts")
 
+    __table_args__ = (
+        Index("ix_shoutout_recipients_recipient_id_shoutout_id", "recipient_id", "shoutout_id"),
+        Index("ix_shoutout_recipients_shoutout_id", "shoutout_id"),
+    )
+
 class Comment(Base):
     __tablename__ = "comments"
     
@@ -62,7 +94,7 @@ class Comment(Base):
     shoutout_id = Column(Integer, ForeignKey("shoutouts.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     
     shoutout = relationship("ShoutOut", back_populates="comments")
     user = relationship("User", back_populates="comments")
@@ -78,6 +110,11 @@ class Reaction(Base):
     shoutout = relationship("ShoutOut", back_populates="reactions")
     user = relationship("User", back_populates="reactions")
 
+    __table_args__ = (
+        Index("ix_reactions_shoutout_id_id", "shoutout_id", "id"),
+        Index("ix_reactions_shoutout_id_type_id", "shoutout_id", "type", "id"),
+    )
+
 class ReportStatus(str, enum.Enum):
     pending = "pending"
     reviewed = "reviewed"
@@ -97,7 +134,7 @@ class Report(Base):
     comment_id = Column(Integer, ForeignKey("comments.id"), nullable=True) # New field
     reporter_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     reason = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     status = Column(Enum(ReportStatus), default=ReportStatus.pending, nullable=False)
 
     __table_args__ = (
@@ -105,6 +142,8 @@ class Report(Base):
             (shoutout_id.isnot(None)) | (comment_id.isnot(None)),
             name='ck_report_shoutout_or_comment_id'
         ),
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        Index("ix_reports_status_created_at_id", "status", "created_at", "id"),
     )
 
     shoutout = relationship("ShoutOut")
@@ -120,7 +159,148 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     shoutout_id = Column(Integer, ForeignKey("shoutouts.id"), nullable=True)
     is_read = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    event_id = Column(Integer, ForeignKey("notification_outbox.id"), nullable=True) # Outbox event that produced this row
 
     user = relationship("User", back_populates="notifications")
     shoutout = relationship("ShoutOut")
+
+    __table_args__ = (
+        # A unique index rather than a constraint so backend.migrations can add
+        # it to existing SQLite tables.
+        Index("uq_notifications_event_user", "event_id", "user_id", unique=True),
+        Index("ix_notifications_user_is_read_created_at", "user_id", "is_read", "created_at"),
+        # Partial index so unread badge counts only touch unread rows.
+        Index(
+            "ix_notifications_user_unread", "user_id",
+            postgresql_where=is_read.is_(False),
+            sqlite_where=is_read.is_(False),
+        ),
+        Index("ix_notifications_is_read_created_at_id", "is_read", "created_at", "id"),
+    )
+
+class OutboxStatus(str, enum.Enum):
+    pending = "pending"
+    done = "done"
+    failed = "failed"
+
+class NotificationEvent(Base):
+    """
+    A notification-worthy event written in the request transaction and
+    expanded into per-user Notification rows by the background dispatcher.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String, unique=True, nullable=False)
+    type = Column(Enum(NotificationType), nullable=False)
+    actor_id = Column(Integer, nullable=False)
+    actor_name = Column(String, nullable=False)
+    shoutout_id = Column(Integer, nullable=True)
+    comment_id = Column(Integer, nullable=True)
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.pending, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_available_at", "status", "available_at", "id"),
+    )
+
+class TimelineKind(str, enum.Enum):
+    sent = "sent"
+    tagged = "tagged"
+
+class TimelineEntry(Base):
+    """
+    Materialized per-user timeline: one row per shout-out a user sent or was
+    tagged in, written when the shout-out is created so the personal views
+    are a single range scan on (user_id, kind, created_at, shoutout_id).
+    """
+    __tablename__ = "user_timeline"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    shoutout_id = Column(Integer, ForeignKey("shoutouts.id"), nullable=False)
+    kind = Column(Enum(TimelineKind), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", "shoutout_id", name="uq_user_timeline_user_kind_shoutout"),
+        Index("ix_user_timeline_user_kind_created_at", "user_id", "kind", "created_at", "shoutout_id"),
+        Index("ix_user_timeline_shoutout_id", "shoutout_id"),
+    )
+
+class UserStats(Base):
+    """
+    Per-user all-time recognition counts, maintained by backend.rollups so
+    the admin leaderboards are an index scan over the top k rows.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    department = Column(String, nullable=False)
+    shoutouts_sent = Column(Integer, default=0, server_default="0", nullable=False)
+    shoutouts_received = Column(Integer, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_stats_shoutouts_sent", "shoutouts_sent", "user_id"),
+        Index("ix_user_stats_shoutouts_received", "shoutouts_received", "user_id"),
+        Index("ix_user_stats_department_sent", "department", "shoutouts_sent", "user_id"),
+        Index("ix_user_stats_department_received", "department", "shoutouts_received", "user_id"),
+    )
+
+class UserDailyStats(Base):
+    """
+    Per-user sent/received counts per UTC day, the buckets windowed
+    leaderboards sum over.
+    """
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    department = Column(String, nullable=False)
+    shoutouts_sent = Column(Integer, default=0, server_default="0", nullable=False)
+    shoutouts_received = Column(Integer, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_daily_stats_day_user", "day", "user_id"),
+        Index("ix_user_daily_stats_department_day", "department", "day", "user_id"),
+    )
+
+class DepartmentDailyStats(Base):
+    """Shout-outs sent per sender department per UTC day."""
+    __tablename__ = "department_daily_stats"
+
+    department = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    shoutouts_sent = Column(Integer, default=0, server_default="0", nullable=False)
+
+class DepartmentStats(Base):
+    """
+    All-time user and shout-out counts per department, kept beside the daily
+    buckets so board totals read one row per department. `updated_at` is the
+    last write that changed the row.
+    """
+    __tablename__ = "department_stats"
+
+    department = Column(String, primary_key=True)
+    users = Column(Integer, default=0, server_default="0", nullable=False)
+    shoutouts_sent = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+class AnalyticsState(Base):
+    """
+    Single-row table written only by a full rollup rebuild: the board totals
+    it counted and when it ran. Live totals come from `department_stats`.
+    """
+    __tablename__ = "analytics_state"
+
+    id = Column(Integer, primary_key=True)
+    total_users = Column(Integer, default=0, server_default="0", nullable=False)
+    total_shoutouts = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    rebuilt_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,274 @@
+"""
+Notification outbox.
+
+Write endpoints record a single NotificationEvent row in their own
+transaction via `enqueue_event`, so request latency no longer depends on
+how many users get notified. A background `NotificationDispatcher` thread
+expands pending events into Notification rows in batches, retrying failed
+events with exponential backoff.
+
+Each event's idempotency key is derived from the row that triggered it, so
+the same comment or reaction never queues two events. A dispatcher claims
+due events before expanding them by moving their `available_at` past a
+lease with a conditional UPDATE, so two dispatchers (or processes) never
+expand the same event; an event whose dispatcher dies becomes due again
+when the lease runs out. The (event_id, user_id) unique constraint on
+notifications keeps an expansion from ever being applied twice.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional, Set, Union
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_DISPATCH_INTERVAL", "1.0"))
+DISPATCH_BATCH_SIZE = int(os.getenv("NOTIFICATION_DISPATCH_BATCH_SIZE", "100"))
+INSERT_CHUNK_SIZE = int(os.getenv("NOTIFICATION_INSERT_CHUNK_SIZE", "500"))
+MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = 2
+# How long a claimed event is hidden from other dispatchers.
+CLAIM_LEASE_SECONDS = float(os.getenv("NOTIFICATION_CLAIM_LEASE_SECONDS", "60"))
+
+def enqueue_event(
+    db: Session,
+    type: models.NotificationType,
+    actor: models.User,
+    source: Union[int, str],
+    shoutout_id: Optional[int] = None,
+    comment_id: Optional[int] = None,
+) -> None:
+    """
+    Add an outbox event to the caller's transaction. It is dispatched once the
+    caller commits; call `dispatcher.wake()` after the commit to skip the
+    polling delay. `source` identifies what triggered the event within its
+    type (the shout-out, comment or report id, or "shoutout:user" for a
+    reaction); an event whose key is already queued is skipped.
+    """
+    try:
+        with db.begin_nested():
+            db.add(models.NotificationEvent(
+                idempotency_key=f"{type.value}:{source}",
+                type=type,
+                actor_id=actor.id,
+                actor_name=actor.name,
+                shoutout_id=shoutout_id,
+                comment_id=comment_id,
+            ))
+    except IntegrityError:
+        pass
+
+def _shoutout_participants(db: Session, shoutout: models.ShoutOut) -> List[int]:
+    recipient_ids = [
+        row.recipient_id for row in
+        db.query(models.ShoutOutRecipient.recipient_id)
+        .filter(models.ShoutOutRecipient.shoutout_id == shoutout.id)
+        .distinct()
+    ]
+    return [shoutout.sender_id] + [r for r in recipient_ids if r != shoutout.sender_id]
+
+def _event_notifications(db: Session, event: models.NotificationEvent) -> Iterable[dict]:
+    """
+    Yield the Notification rows (as insert parameters) an event expands to.
+    """
+    def row(user_id: int, message: str) -> dict:
+        return {
+            "user_id": user_id,
+            "type": event.type,
+            "message": message,
+            "shoutout_id": event.shoutout_id,
+            "is_read": False,
+            "event_id": event.id,
+        }
+
+    actor = event.actor_name
+
+    if event.type == models.NotificationType.report:
+        if event.comment_id is not None:
+            message = f"{actor} reported a comment on shout-out #{event.shoutout_id}"
+        else:
+            message = f"{actor} reported shout-out #{event.shoutout_id}"
+        admins = db.query(models.User.id).filter(models.User.role == models.UserRole.admin)
+        for admin in admins:
+            yield row(admin.id, message)
+        return
+
+    shoutout = db.query(models.ShoutOut).filter(models.ShoutOut.id == event.shoutout_id).first()
+    if not shoutout:
+        return
+
+    for user_id in _shoutout_participants(db, shoutout):
+        if user_id == event.actor_id:
+            continue
+        if event.type == models.NotificationType.tag:
+            if user_id == shoutout.sender_id:
+                continue
+            message = f"{actor} recognised you in a shout-out"
+        elif event.type == models.NotificationType.comment:
+            if user_id == shoutout.sender_id:
+                message = f"{actor} commented on your shout-out"
+            else:
+                message = f"{actor} commented on a shout-out you are part of"
+        else:
+            if user_id == shoutout.sender_id:
+                message = f"{actor} reacted to your shout-out"
+            else:
+                message = f"{actor} reacted to a shout-out you are part of"
+        yield row(user_id, message)
+
+def expand_event(db: Session, event: models.NotificationEvent) -> List[int]:
+    """
+    Insert the notifications for one event in chunks of INSERT_CHUNK_SIZE.
+    Returns the ids of the users notified.
+    """
+    notified = []
+    chunk = []
+    for params in _event_notifications(db, event):
+        chunk.append(params)
+        if len(chunk) >= INSERT_CHUNK_SIZE:
+            db.execute(insert(models.Notification), chunk)
+            notified.extend(p["user_id"] for p in chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(models.Notification), chunk)
+        notified.extend(p["user_id"] for p in chunk)
+    return notified
+
+def dispatch_pending(
+    db: Session,
+    batch_size: int = DISPATCH_BATCH_SIZE,
+    on_delivered: Optional[Callable[[Set[int]], None]] = None,
+) -> int:
+    """
+    Expand up to `batch_size` due events and commit. Each event runs in its own
+    savepoint so one failing event is retried later without holding back the
+    rest of the batch. After the commit, `on_delivered` is called with the ids
+    of every user who received a notification. Returns the number of events
+    claimed.
+    """
+    delivered: Set[int] = set()
+    now = datetime.now(timezone.utc)
+    outbox = models.NotificationEvent
+    due = [
+        event_id for (event_id,) in
+        db.query(outbox.id)
+        .filter(outbox.status == models.OutboxStatus.pending, outbox.available_at <= now)
+        .order_by(outbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ]
+    if not due:
+        db.rollback()
+        return 0
+    # Claim before expanding: the UPDATE only matches events still due, so
+    # each one is claimed by exactly one dispatcher even where row locks are
+    # not available (SQLite).
+    claimed = [
+        event_id for (event_id,) in db.execute(
+            update(outbox)
+            .where(outbox.id.in_(due), outbox.status == models.OutboxStatus.pending, outbox.available_at <= now)
+            .values(available_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS))
+            .returning(outbox.id)
+        )
+    ]
+    db.commit()
+    events = db.query(outbox).filter(outbox.id.in_(claimed)).order_by(outbox.id).all()
+
+    for event in events:
+        try:
+            with db.begin_nested():
+                delivered.update(expand_event(db, event))
+        except Exception as e:
+            event.attempts += 1
+            event.last_error = str(e)[:1000]
+            if event.attempts >= MAX_ATTEMPTS:
+                event.status = models.OutboxStatus.failed
+                logger.error("Notification event %s failed permanently: %s", event.idempotency_key, e)
+            else:
+                event.available_at = now + timedelta(seconds=RETRY_BASE_SECONDS ** event.attempts)
+                logger.warning("Notification event %s failed, retrying: %s", event.idempotency_key, e)
+            continue
+        event.status = models.OutboxStatus.done
+        event.processed_at = now
+
+    db.commit()
+    if on_delivered and delivered:
+        on_delivered(delivered)
+    return len(events)
+
+def _discard_events(db: Session, *filters) -> None:
+    # Dropping the events also frees their idempotency keys, which matters
+    # where ids are reused after a delete (SQLite without AUTOINCREMENT).
+    events = select(models.NotificationEvent.id).where(*filters)
+    db.query(models.Notification).filter(models.Notification.event_id.in_(events)).delete(synchronize_session=False)
+    db.query(models.NotificationEvent).filter(*filters).delete(synchronize_session=False)
+
+def discard_shoutout_events(db: Session, shoutout_id: int) -> None:
+    """Remove every event about a shout-out, and what it delivered, before deleting it."""
+    _discard_events(db, models.NotificationEvent.shoutout_id == shoutout_id)
+
+def discard_comment_events(db: Session, comment_id: int) -> None:
+    """Remove the event a comment queued, and what it delivered, before deleting it."""
+    _discard_events(
+        db, models.NotificationEvent.idempotency_key == f"{models.NotificationType.comment.value}:{comment_id}"
+    )
+
+class NotificationDispatcher:
+    """
+    Background thread that drains the outbox. It polls every `interval`
+    seconds and can be woken early with `wake()` after a write commits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = DISPATCH_INTERVAL_SECONDS,
+        batch_size: int = DISPATCH_BATCH_SIZE,
+        on_delivered: Optional[Callable[[Set[int]], None]] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_delivered = on_delivered
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return dispatch_pending(db, self.batch_size, self.on_delivered)
+        except Exception:
+            db.rollback()
+            logger.exception("Notification dispatch failed")
+            return 0
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.run_once() < self.batch_size:
+                self._wake.wait(self.interval)
+                self._wake.clear()
@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decode an opaque cursor back into values for `columns`, using each
+    column's Python type to restore datetimes.
+    """
+    invalid_cursor = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise invalid_cursor
+        values = []
+        for column, value in zip(columns, payload):
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, column.type.python_type):
+                raise invalid_cursor
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise invalid_cursor
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    key: Callable[[Any], Tuple[Any, ...]],
+) -> Tuple[list, Optional[str]]:
+    """
+    Keyset-paginate `query` in descending order of `columns` (e.g.
+    (created_at, id)). `key` extracts the same column values from a result
+    row so the next cursor can be built from the last row of the page.
+
+    Returns the rows of this page and the cursor for the next one, or None
+    when there are no more rows.
+    """
+    if cursor:
+        # Bind each value with its column's type so it is rendered in the
+        # stored format and the comparison can seek the (columns) index.
+        values = [literal(v, c.type) for c, v in zip(columns, decode_cursor(cursor, columns))]
+        if len(columns) == 1:
+            query = query.filter(columns[0] < values[0])
+        else:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    rows = query.order_by(*[c.desc() for c in columns]).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
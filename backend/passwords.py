@@ -0,0 +1,184 @@
+"""
+Password hashing off the request threads.
+
+Hashing and verification run on a dedicated, bounded executor (a process
+pool by default, since sha256_crypt holds the GIL) so a login storm cannot
+pin the server's worker threads. The hash cost is configurable with
+PASSWORD_HASH_ROUNDS; hashes made with a different cost verify normally and
+are reported for transparent rehash on the next successful login.
+
+This module must stay importable on its own (no database or settings
+imports) because pool workers import it.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "535000"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256"))
+# Passwords per pool job when hashing in bulk.
+HASH_MANY_CHUNK_SIZE = 16
+
+@lru_cache(maxsize=4)
+def _context(rounds: int) -> CryptContext:
+    # min == max == default so any hash made at another cost needs an update.
+    return CryptContext(
+        schemes=["sha256_crypt"],
+        deprecated="auto",
+        sha256_crypt__default_rounds=rounds,
+        sha256_crypt__min_rounds=rounds,
+        sha256_crypt__max_rounds=rounds,
+    )
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+def _hash_many(passwords: Sequence[str], rounds: int) -> List[str]:
+    context = _context(rounds)
+    return [context.hash(password) for password in passwords]
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, hashed)
+
+class PasswordHasher:
+    """
+    Runs hashing work on a bounded executor. At most `max_pending` jobs may be
+    queued or running; beyond that callers get a 503 instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int, kind: str = "process"):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def _run(self, fn, *args):
+        return self._submit(fn, *args).result()
+
+    async def _run_async(self, fn, *args):
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def _chunks(self, passwords: Sequence[str], chunk_size: int) -> List[Sequence[str]]:
+        return [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+
+    def hash_many(self, passwords: Sequence[str], chunk_size: int = HASH_MANY_CHUNK_SIZE) -> List[str]:
+        """
+        Hash a bulk batch (e.g. a user import) across the pool, in order.
+        Passwords go out `chunk_size` per job, with at most `workers` jobs in
+        flight, so logins queue behind a few chunks rather than the whole batch.
+        """
+        hashes: List[str] = []
+        in_flight: Deque[Future] = deque()
+        for chunk in self._chunks(passwords, chunk_size):
+            if len(in_flight) >= self.workers:
+                hashes += in_flight.popleft().result()
+            in_flight.append(self._submit(_hash_many, chunk, self.rounds))
+        for future in in_flight:
+            hashes += future.result()
+        return hashes
+
+    async def hash_many_async(self, passwords: Sequence[str], chunk_size: int = HASH_MANY_CHUNK_SIZE) -> List[str]:
+        hashes: List[str] = []
+        in_flight: Deque[Future] = deque()
+        for chunk in self._chunks(passwords, chunk_size):
+            if len(in_flight) >= self.workers:
+                hashes += await asyncio.wrap_future(in_flight.popleft())
+            in_flight.append(self._submit(_hash_many, chunk, self.rounds))
+        for future in in_flight:
+            hashes += await asyncio.wrap_future(future)
+        return hashes
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify `password`; when it matches a hash made with another cost,
+        also return a fresh hash at the configured cost to store.
+        """
+        return self._run(_verify_and_update, password, hashed, self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.verify_and_update(password, hashed)[0]
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password, self.rounds)
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await self._run_async(_verify_and_update, password, hashed, self.rounds)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.workers),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+password_hasher = PasswordHasher(
+    rounds=PASSWORD_HASH_ROUNDS,
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    kind=PASSWORD_HASH_EXECUTOR,
+)
@@ -0,0 +1,278 @@
+"""
+Per-request database profiling and Prometheus-style route metrics.
+
+`ProfilingMiddleware` opens a `RequestProfile` for every HTTP request. The
+SQLAlchemy hooks installed by `instrument_engine` add each statement's
+duration to it. The profile lives in a context variable, which SQLAlchemy's
+greenlet bridge and the threadpool both carry over. `ProfiledRoute` marks
+when the endpoint returns, so the remaining time until the response starts
+is counted as serialization.
+
+At the end of the request the profile feeds per-route histograms, served in
+the Prometheus text format at /metrics. With PROFILE_HEADERS on, it is also
+returned as headers: X-Query-Count, X-DB-Time-Ms, X-Serialization-Ms,
+X-Slowest-Queries and Server-Timing.
+
+Statements slower than SLOW_QUERY_MS are logged with their route. A
+SLOW_QUERY_EXPLAIN_SAMPLE fraction of slow SELECTs also logs an EXPLAIN of
+the statement, run on the same connection.
+"""
+import asyncio
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADERS = os.getenv("PROFILE_HEADERS", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOWEST_QUERIES_KEPT = 3
+
+class RequestProfile:
+    __slots__ = ("scope", "started", "query_count", "db_time", "slowest", "endpoint_done")
+
+    def __init__(self, scope: Dict[str, Any]):
+        # The router adds the matched route to this same scope dict.
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        # (duration, statement), slowest first
+        self.slowest: List[Tuple[float, str]] = []
+        self.endpoint_done: Optional[float] = None
+
+    def record_query(self, duration: float, statement: str) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        if len(self.slowest) < SLOWEST_QUERIES_KEPT or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_QUERIES_KEPT:]
+
+    @property
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "path", None) or "unmatched"
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+# Metrics
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # one count per bucket, then +Inf, sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def totals(self) -> Tuple[int, float]:
+        """Observation count and sum across every label set."""
+        with self._lock:
+            return (
+                sum(sum(series[:-1]) for series in self._series.values()),
+                sum(series[-1] for series in self._series.values()),
+            )
+
+    def render(self, label_names: Sequence[str]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for labels, series in items:
+                base = _labels(label_names, labels)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+                cumulative += series[len(self.buckets)]
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + 1
+
+    def render(self, label_names: Sequence[str]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                suffix = f"{{{_labels(label_names, labels)}}}" if labels else ""
+                lines.append(f"{self.name}{suffix} {value}")
+        return lines
+
+def _labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+_ROUTE_LABELS = ("method", "route")
+_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+request_duration = Histogram("http_request_duration_seconds", "Time from request to response start.", _SECONDS)
+request_queries = Histogram("http_request_db_queries", "Database statements per request.", (0, 1, 2, 3, 5, 10, 20, 50, 100))
+request_db_time = Histogram("http_request_db_seconds", "Time spent in database statements per request.", _SECONDS)
+request_serialization = Histogram(
+    "http_request_serialization_seconds", "Time from endpoint return to response start.", _SECONDS
+)
+requests_total = Counter("http_requests_total", "Requests by route and status.")
+slow_queries_total = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS.")
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for histogram in (request_duration, request_queries, request_db_time, request_serialization):
+        lines += histogram.render(_ROUTE_LABELS)
+    lines += requests_total.render(_ROUTE_LABELS + ("status",))
+    lines += slow_queries_total.render(())
+    return "\n".join(lines) + "\n"
+
+# SQLAlchemy hooks
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on `engine`; pass `async_engine.sync_engine` for async engines."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("profiling_started")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    if conn.info.get("profiling_explaining"):
+        return
+    profile = _profile.get()
+    if profile is not None:
+        profile.record_query(duration, statement)
+    if duration * 1000 >= SLOW_QUERY_MS:
+        _log_slow_query(conn, statement, parameters, executemany, duration, profile)
+
+def _log_slow_query(conn, statement, parameters, executemany, duration, profile) -> None:
+    slow_queries_total.inc()
+    route = profile.route if profile else "-"
+    logger.warning("Slow query (%.1f ms) on %s: %s", duration * 1000, route, " ".join(statement.split()))
+    if executemany or random.random() >= SLOW_QUERY_EXPLAIN_SAMPLE:
+        return
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    conn.info["profiling_explaining"] = True
+    try:
+        plan = conn.exec_driver_sql(prefix + statement, parameters).all()
+        logger.warning("Plan for slow query on %s:\n%s", route, "\n".join(" | ".join(str(c) for c in row) for row in plan))
+    except Exception:
+        logger.debug("EXPLAIN failed for slow query", exc_info=True)
+    finally:
+        conn.info["profiling_explaining"] = False
+
+# ASGI middleware and route class
+
+class ProfilingMiddleware:
+    def __init__(self, app, headers: bool = PROFILE_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = _profile.set(profile)
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+                self._finish(profile, status[0])
+                if self.headers:
+                    message["headers"] = list(message.get("headers", [])) + _profile_headers(profile)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+
+    @staticmethod
+    def _finish(profile: RequestProfile, status: str) -> None:
+        labels = (profile.scope.get("method", ""), profile.route)
+        now = time.perf_counter()
+        serialization = now - profile.endpoint_done if profile.endpoint_done else 0.0
+        request_duration.observe(labels, now - profile.started)
+        request_queries.observe(labels, profile.query_count)
+        request_db_time.observe(labels, profile.db_time)
+        request_serialization.observe(labels, serialization)
+        requests_total.inc(labels + (status,))
+
+def _profile_headers(profile: RequestProfile) -> List[Tuple[bytes, bytes]]:
+    serialization = time.perf_counter() - profile.endpoint_done if profile.endpoint_done else 0.0
+    slowest = "; ".join(
+        f"{duration * 1000:.1f}ms {' '.join(statement.split())[:120]}" for duration, statement in profile.slowest
+    )
+    values = {
+        "X-Query-Count": str(profile.query_count),
+        "X-DB-Time-Ms": f"{profile.db_time * 1000:.2f}",
+        "X-Serialization-Ms": f"{serialization * 1000:.2f}",
+        "X-Slowest-Queries": slowest,
+        "Server-Timing": f"db;dur={profile.db_time * 1000:.2f}, serialize;dur={serialization * 1000:.2f}",
+    }
+    return [(k.lower().encode(), v.encode("latin-1", "replace")) for k, v in values.items() if v]
+
+def _mark_endpoint_done() -> None:
+    profile = _profile.get()
+    if profile is not None:
+        profile.endpoint_done = time.perf_counter()
+
+class ProfiledRoute(APIRoute):
+    """Route that records when its endpoint returns, to time serialization."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _timed(endpoint), **kwargs)
+
+def _timed(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+    return timed
@@ -0,0 +1,145 @@
+"""
+Real-time notification push over Server-Sent Events.
+
+`NotificationHub` is an in-process pub/sub keyed by user id. Publishers
+(the outbox dispatcher thread, read/unread endpoints) only signal that a
+user's notifications changed; each open stream then fetches the rows newer
+than the last event id it sent. Signals are coalesced per connection, so a
+burst of notifications costs one query per connected user, and resuming
+with `Last-Event-ID` is a plain `id > ?` range read.
+"""
+import asyncio
+import json
+import os
+import threading
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import Request
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend import models, schemas
+from backend.auth import authenticate_token
+from backend.database import run_in_session
+
+HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))
+RESUME_BACKLOG_LIMIT = 50
+CLIENT_RETRY_MS = 5000
+
+class NotificationHub:
+    """
+    Thread-safe registry of open notification streams. `publish` may be
+    called from any thread; subscribers are asyncio queues living on the
+    server's event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            for entry in [e for e in subscribers if e[1] is queue]:
+                subscribers.discard(entry)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            targets = [entry for uid in set(user_ids) for entry in self._subscribers.get(uid, ())]
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_signal, queue)
+            except RuntimeError:
+                # The subscriber's loop has shut down; it will unsubscribe itself.
+                pass
+
+def _signal(queue: asyncio.Queue) -> None:
+    if queue.empty():
+        queue.put_nowait(True)
+
+hub = NotificationHub()
+
+async def resolve_stream_user(token: str) -> int:
+    """
+    Authenticate a stream with a short-lived session, so the long-running
+    response does not hold a pooled connection open.
+    """
+    return await run_in_session(lambda db: authenticate_token(token, db).id)
+
+def _latest_notification_id(db: Session, user_id: int) -> int:
+    latest = db.query(func.max(models.Notification.id)).filter(models.Notification.user_id == user_id).scalar()
+    return latest or 0
+
+def count_unread(db: Session, user_id: int) -> int:
+    """
+    Unread badge count, answered from the partial ix_notifications_user_unread
+    index.
+    """
+    return db.query(func.count(models.Notification.id)).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.is_read == False,
+    ).scalar()
+
+def _fetch_updates(db: Session, user_id: int, after_id: int) -> Tuple[List[schemas.NotificationResponse], int]:
+    rows = (
+        db.query(models.Notification)
+        .filter(models.Notification.user_id == user_id, models.Notification.id > after_id)
+        .order_by(models.Notification.id)
+        .limit(RESUME_BACKLOG_LIMIT)
+        .all()
+    )
+    unread = count_unread(db, user_id)
+    return [schemas.NotificationResponse.from_orm(n) for n in rows], unread
+
+def _format_event(event: str, data: str, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+async def notification_stream(request: Request, user_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    """
+    Yield SSE frames for one client: any backlog after `last_event_id`, then
+    new notifications and unread counts as they are published, with a comment
+    heartbeat every HEARTBEAT_SECONDS to keep proxies from closing the stream.
+    """
+    queue = hub.subscribe(user_id)
+    try:
+        if last_event_id is None:
+            last_event_id = await run_in_session(_latest_notification_id, user_id)
+
+        yield f"retry: {CLIENT_RETRY_MS}\n\n"
+        pending = True
+        while True:
+            if pending:
+                notifications, unread = await run_in_session(_fetch_updates, user_id, last_event_id)
+                for notification in notifications:
+                    last_event_id = notification.id
+                    yield _format_event("notification", notification.model_dump_json(), notification.id)
+                yield _format_event("unread_count", json.dumps({"unread_count": unread}))
+                # A full page means there may be more backlog; keep draining.
+                pending = len(notifications) == RESUME_BACKLOG_LIMIT
+                if pending:
+                    continue
+
+            if await request.is_disconnected():
+                break
+            try:
+                await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                pending = True
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+    finally:
+        hub.unsubscribe(user_id, queue)
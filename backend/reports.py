@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Query, Session, aliased, joinedload
+from backend import models, schemas
+from backend.pagination import paginate
+
+TARGET_TYPES = ("shoutout", "comment")
+
+def _filtered(
+    query: Query,
+    status: Optional[models.ReportStatus],
+    target_type: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> Query:
+    if status:
+        query = query.filter(models.Report.status == status)
+    # Comment reports carry their shout-out's id too, so the comment id decides.
+    if target_type == "shoutout":
+        query = query.filter(models.Report.comment_id.is_(None))
+    elif target_type == "comment":
+        query = query.filter(models.Report.comment_id.isnot(None))
+    if start_date:
+        query = query.filter(models.Report.created_at >= start_date)
+    if end_date:
+        query = query.filter(models.Report.created_at < end_date)
+    return query
+
+def list_reports(
+    db: Session,
+    cursor: Optional[str],
+    limit: int,
+    status: Optional[models.ReportStatus] = None,
+    target_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Tuple[List[schemas.ReportResponse], Optional[str]]:
+    """
+    One page of reports, newest first. Reporters and the reported
+    shout-out's sender or comment's author are joined into the same query,
+    so the page costs one round trip however many reports it holds.
+    """
+    query = db.query(models.Report).options(
+        joinedload(models.Report.reporter),
+        joinedload(models.Report.shoutout).joinedload(models.ShoutOut.sender),
+        joinedload(models.Report.comment).joinedload(models.Comment.user),
+    )
+    query = _filtered(query, status, target_type, start_date, end_date)
+    reports, next_cursor = paginate(
+        query, (models.Report.created_at, models.Report.id), cursor, limit,
+        key=lambda r: (r.created_at, r.id),
+    )
+
+    response_reports = []
+    for report in reports:
+        reporter_info = schemas.ReporterInfo(
+            id=report.reporter.id,
+            name=report.reporter.name
+        ) if report.reporter else None
+
+        target_type = None
+        target_user_name = None
+        if report.comment_id:
+            target_type = "comment"
+            if report.comment and report.comment.user:
+                target_user_name = report.comment.user.name
+        elif report.shoutout_id:
+            target_type = "shoutout"
+            if report.shoutout and report.shoutout.sender:
+                target_user_name = report.shoutout.sender.name
+
+        response_reports.append(
+            schemas.ReportResponse(
+                id=report.id,
+                shoutout_id=report.shoutout_id,
+                comment_id=report.comment_id,
+                reporter=reporter_info,
+                reason=report.reason,
+                created_at=report.created_at,
+                status=report.status,
+                target_type=target_type,
+                target_user_name=target_user_name
+            )
+        )
+    return response_reports, next_cursor
+
+def list_report_groups(
+    db: Session,
+    cursor: Optional[str],
+    limit: int,
+    status: Optional[models.ReportStatus] = None,
+    target_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Tuple[List[schemas.ReportGroupResponse], Optional[str]]:
+    """
+    One page of reported targets: all matching reports of the same comment,
+    or of the same shout-out when no comment is named, collapse into one
+    entry with counts, ordered by the most recent report. Grouping, paging
+    and resolving the target's author happen in a single query.
+    """
+    Report = models.Report
+    shoutout_target = case((Report.comment_id.is_(None), Report.shoutout_id), else_=None)
+    groups = _filtered(
+        db.query(
+            # Every report of a comment names the same shout-out (if any).
+            func.max(Report.shoutout_id).label("shoutout_id"),
+            Report.comment_id.label("comment_id"),
+            func.count(Report.id).label("report_count"),
+            func.sum(case((Report.status == models.ReportStatus.pending, 1), else_=0)).label("pending_count"),
+            func.min(Report.created_at).label("first_reported_at"),
+            func.max(Report.created_at).label("latest_reported_at"),
+            func.max(Report.id).label("latest_report_id"),
+        ),
+        status, target_type, start_date, end_date,
+    ).group_by(shoutout_target, Report.comment_id).subquery()
+
+    sender = aliased(models.User)
+    author = aliased(models.User)
+    query = (
+        db.query(groups, sender.name.label("sender_name"), author.name.label("author_name"))
+        .outerjoin(models.ShoutOut, (models.ShoutOut.id == groups.c.shoutout_id) & groups.c.comment_id.is_(None))
+        .outerjoin(sender, sender.id == models.ShoutOut.sender_id)
+        .outerjoin(models.Comment, models.Comment.id == groups.c.comment_id)
+        .outerjoin(author, author.id == models.Comment.user_id)
+    )
+    rows, next_cursor = paginate(
+        query, (groups.c.latest_reported_at, groups.c.latest_report_id), cursor, limit,
+        key=lambda r: (r.latest_reported_at, r.latest_report_id),
+    )
+
+    return [
+        schemas.ReportGroupResponse(
+            target_type="comment" if row.comment_id else "shoutout",
+            shoutout_id=row.shoutout_id,
+            comment_id=row.comment_id,
+            target_user_name=row.author_name if row.comment_id else row.sender_name,
+            report_count=row.report_count,
+            pending_count=row.pending_count or 0,
+            first_reported_at=row.first_reported_at,
+            latest_reported_at=row.latest_reported_at,
+            latest_report_id=row.latest_report_id,
+        )
+        for row in rows
+    ], next_cursor
@@ -0,0 +1,159 @@
+"""
+HTTP response caching for read-heavy endpoints.
+
+Cached responses are keyed by path, query string and (for per-viewer
+endpoints) the viewer id, and versioned by a "board generation" that every
+write endpoint bumps after committing, so a bump invalidates everything at
+once. The ETag is a hash of the cached body. A request whose If-None-Match
+matches a live entry gets its 304 without running the endpoint's queries;
+once the entry expires or the generation moves, the endpoint runs again and
+a 304 is only sent if the fresh body is unchanged.
+
+Storage goes through `ResponseCacheBackend`. The default keeps entries and
+the generation in process memory; set RESPONSE_CACHE_BACKEND to
+"module:Class" to use a shared implementation (e.g. Redis) when running
+several workers.
+"""
+import hashlib
+import importlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from backend.cache import TTLCache
+
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "1000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "")
+CACHE_CONTROL = "private, no-cache"
+
+# (body, extra headers, ETag)
+CachedResponse = Tuple[bytes, Dict[str, str], str]
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+class ResponseCacheBackend(ABC):
+    """
+    Storage for cached responses and the board generation. Implementations
+    must be safe to call from several threads, and must drop entries once
+    they are stale, since a live entry is what answers If-None-Match.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: CachedResponse) -> None:
+        ...
+
+    @abstractmethod
+    def generation(self) -> int:
+        ...
+
+    @abstractmethod
+    def bump_generation(self) -> int:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class MemoryBackend(ResponseCacheBackend):
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, value: CachedResponse) -> None:
+        self._cache.set(key, value)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        # Entries from older generations can never be served again.
+        self._cache.clear()
+        return generation
+
+    def stats(self) -> Dict[str, Any]:
+        return {"generation": self._generation, **self._cache.stats()}
+
+class ResponseCache:
+    def __init__(self, backend: ResponseCacheBackend):
+        self.backend = backend
+        self.not_modified = 0
+
+    def bump(self) -> None:
+        """Call after committing any write that changes cached payloads."""
+        self.backend.bump_generation()
+
+    @staticmethod
+    def _key(request: Request, viewer_id: Optional[int]) -> Tuple:
+        return (request.url.path, tuple(sorted(request.query_params.multi_items())), viewer_id)
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+    def respond(
+        self,
+        request: Request,
+        response: Response,
+        response_type: Any,
+        build: Callable[[], Any],
+        viewer_id: Optional[int] = None,
+        serialize: Optional[Callable[[Any], bytes]] = None,
+    ) -> Response:
+        """
+        Serve `build()` through the cache. `response_type` is the endpoint's
+        response model, used to serialize the payload once; headers the
+        endpoint set on `response` (e.g. X-Next-Cursor) are cached with it.
+        Pass `viewer_id` for payloads that differ per user, and `serialize`
+        (e.g. `backend.serialization.dumps`) when `build()` already returns
+        trusted payloads in the response shape, to encode them without
+        validating.
+        """
+        key = self._key(request, viewer_id)
+        generation = self.backend.generation()
+        if_none_match = request.headers.get("if-none-match", "")
+
+        cached = self.backend.get((generation, key))
+        if cached is None:
+            payload = build()
+            if serialize is not None:
+                body = serialize(payload)
+            else:
+                adapter = _adapter(response_type)
+                body = adapter.dump_json(adapter.validate_python(payload, from_attributes=True))
+            extra = {k: v for k, v in response.headers.items() if k != "content-length"}
+            cached = (body, extra, self._etag(body))
+            self.backend.set((generation, key), cached)
+        body, extra, etag = cached
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers={**extra, **headers})
+
+    def stats(self) -> Dict[str, Any]:
+        return {"not_modified": self.not_modified, **self.backend.stats()}
+
+def _load_backend() -> ResponseCacheBackend:
+    if not RESPONSE_CACHE_BACKEND:
+        return MemoryBackend(RESPONSE_CACHE_MAX_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+    module_name, _, class_name = RESPONSE_CACHE_BACKEND.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+response_cache = ResponseCache(_load_backend())
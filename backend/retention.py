@@ -0,0 +1,83 @@
+"""
+Notification retention.
+
+Deletes read notifications older than NOTIFICATION_RETENTION_DAYS, then the
+processed outbox events no notification refers to any more. Rows are
+removed in id batches, each in its own transaction, so the job never holds
+long locks on the notifications table. Run it from cron:
+
+    python -m backend.retention [--days N] [--batch-size N]
+"""
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "5000"))
+
+def _delete_in_batches(db: Session, model, id_query, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        ids = [row[0] for row in id_query.limit(batch_size).all()]
+        if not ids:
+            break
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+        logger.info("Deleted %d %s rows", deleted, model.__tablename__)
+    return deleted
+
+def purge_read_notifications(db: Session, older_than_days: int = RETENTION_DAYS, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Delete read notifications created more than `older_than_days` ago.
+    Returns the number of rows deleted.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    ids = (
+        db.query(models.Notification.id)
+        .filter(models.Notification.is_read == True, models.Notification.created_at < cutoff)
+        .order_by(models.Notification.id)
+    )
+    return _delete_in_batches(db, models.Notification, ids, batch_size)
+
+def purge_processed_events(db: Session, older_than_days: int = RETENTION_DAYS, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Delete dispatched (or permanently failed) outbox events older than
+    `older_than_days` that no remaining notification points at.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    ids = (
+        db.query(models.NotificationEvent.id)
+        .filter(
+            models.NotificationEvent.status != models.OutboxStatus.pending,
+            models.NotificationEvent.created_at < cutoff,
+            ~exists().where(models.Notification.event_id == models.NotificationEvent.id),
+        )
+        .order_by(models.NotificationEvent.id)
+    )
+    return _delete_in_batches(db, models.NotificationEvent, ids, batch_size)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete old read notifications and processed outbox events.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        notifications = purge_read_notifications(db, args.days, args.batch_size)
+        events = purge_processed_events(db, args.days, args.batch_size)
+    finally:
+        db.close()
+    print(f"Deleted {notifications} notifications and {events} outbox events")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Pre-aggregated admin analytics.
+
+The admin dashboard reads `user_stats` (per-user sent/received counts),
+`user_daily_stats` (the same per UTC day, for windowed leaderboards),
+`department_daily_stats` (shout-outs per sender department per UTC day) and
+`department_stats` (all-time users and shout-outs per department) instead of
+aggregating the base tables. Register, create/delete shout-out and delete
+user adjust them inside their own transaction. Board totals are summed over
+the per-department rows when read, so writers from different departments
+never contend for one counter row. Anything those paths miss (users created
+before the tables existed, manual SQL, cascaded deletes) is reconciled by a
+full rebuild, which should also run once after deploying:
+
+    python -m backend.rollups
+
+The newest `department_stats.updated_at` and `analytics_state.rebuilt_at`
+are returned with every admin stats response so the dashboard can show how
+fresh the numbers are.
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, func, insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = 1
+ROLLUPS_UPDATED_HEADER = "X-Rollups-Updated-At"
+ROLLUPS_REBUILT_HEADER = "X-Rollups-Rebuilt-At"
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def utc_day_column(db: Session, column):
+    """SQL expression for the UTC calendar day of a timestamp column."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", column))
+    return func.date(column)
+
+def _increment(db: Session, model, keys: Dict, deltas: Dict[str, int], assign: Optional[Dict] = None) -> None:
+    """
+    Add `deltas` to the row of `model` identified by `keys`, creating the
+    row when it is missing and the deltas are positive.
+    """
+    filters = [getattr(model, k) == v for k, v in keys.items()]
+    values = {getattr(model, col): getattr(model, col) + delta for col, delta in deltas.items()}
+    values.update({getattr(model, col): value for col, value in (assign or {}).items()})
+    if db.query(model).filter(*filters).update(values, synchronize_session=False):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        return
+    try:
+        with db.begin_nested():
+            db.add(model(**keys, **deltas, **(assign or {})))
+    except IntegrityError:
+        # A concurrent transaction created the row first.
+        db.query(model).filter(*filters).update(values, synchronize_session=False)
+
+def _adjust_department(db: Session, department: str, **deltas: int) -> None:
+    _increment(
+        db, models.DepartmentStats, {"department": department}, deltas,
+        assign={"updated_at": datetime.now(timezone.utc)},
+    )
+
+def record_user_created(db: Session, user: models.User) -> None:
+    db.add(models.UserStats(user_id=user.id, department=user.department, shoutouts_sent=0, shoutouts_received=0))
+    _adjust_department(db, user.department, users=1)
+
+def record_users_created(db: Session, users: Sequence[Tuple[int, str]]) -> None:
+    """Set-based `record_user_created` for (user_id, department) pairs inserted in bulk."""
+    if not users:
+        return
+    db.execute(
+        insert(models.UserStats),
+        [{"user_id": user_id, "department": department, "shoutouts_sent": 0, "shoutouts_received": 0}
+         for user_id, department in users],
+    )
+    for department, count in Counter(department for _, department in users).items():
+        _adjust_department(db, department, users=count)
+
+def record_user_deleted(db: Session, user: models.User) -> None:
+    db.query(models.UserStats).filter(models.UserStats.user_id == user.id).delete(synchronize_session=False)
+    db.query(models.UserDailyStats).filter(models.UserDailyStats.user_id == user.id).delete(synchronize_session=False)
+    _adjust_department(db, user.department, users=-1)
+
+def _ensure_user_days(db: Session, user_ids, day: date) -> None:
+    """
+    Create zeroed `user_daily_stats` rows for `day` for every id selected by
+    `user_ids` that lacks one, so the caller can adjust them with a plain
+    UPDATE.
+    """
+    missing = select(models.User.id, literal(day), models.User.department, literal(0), literal(0)).where(
+        models.User.id.in_(user_ids),
+        ~select(models.UserDailyStats.user_id).where(
+            models.UserDailyStats.user_id == models.User.id,
+            models.UserDailyStats.day == day,
+        ).exists(),
+    )
+    statement = insert(models.UserDailyStats).from_select(
+        ["user_id", "day", "department", "shoutouts_sent", "shoutouts_received"], missing
+    )
+    try:
+        with db.begin_nested():
+            db.execute(statement)
+    except IntegrityError:
+        # A concurrent transaction created some of them; the rest are
+        # still missing, so try once more.
+        with db.begin_nested():
+            db.execute(statement)
+
+def record_shoutout(db: Session, shoutout_id: int, delta: int) -> None:
+    """
+    Count a shout-out in (delta=1) or out of (delta=-1) the rollups. Call
+    after its recipients are written, or before they are deleted.
+    """
+    row = (
+        db.query(models.ShoutOut.sender_id, models.ShoutOut.created_at, models.User.department)
+        .join(models.User, models.User.id == models.ShoutOut.sender_id)
+        .filter(models.ShoutOut.id == shoutout_id)
+        .one()
+    )
+    db.query(models.UserStats).filter(models.UserStats.user_id == row.sender_id).update(
+        {models.UserStats.shoutouts_sent: models.UserStats.shoutouts_sent + delta}, synchronize_session=False
+    )
+    recipients = select(models.ShoutOutRecipient.recipient_id).where(
+        models.ShoutOutRecipient.shoutout_id == shoutout_id
+    )
+    db.query(models.UserStats).filter(models.UserStats.user_id.in_(recipients)).update(
+        {models.UserStats.shoutouts_received: models.UserStats.shoutouts_received + delta},
+        synchronize_session=False,
+    )
+
+    day = _utc_day(row.created_at)
+    if delta > 0:
+        _ensure_user_days(db, [row.sender_id], day)
+        _ensure_user_days(db, recipients, day)
+    daily = models.UserDailyStats
+    db.query(daily).filter(daily.user_id == row.sender_id, daily.day == day).update(
+        {daily.shoutouts_sent: daily.shoutouts_sent + delta}, synchronize_session=False
+    )
+    db.query(daily).filter(daily.user_id.in_(recipients), daily.day == day).update(
+        {daily.shoutouts_received: daily.shoutouts_received + delta}, synchronize_session=False
+    )
+
+    _increment(
+        db, models.DepartmentDailyStats,
+        {"department": row.department, "day": day},
+        {"shoutouts_sent": delta},
+    )
+    _adjust_department(db, row.department, shoutouts_sent=delta)
+
+def rebuild_rollups(db: Session) -> models.AnalyticsState:
+    """
+    Recompute every rollup from the base tables in one transaction and mark
+    the state as rebuilt.
+    """
+    sent = (
+        select(func.count(models.ShoutOut.id))
+        .where(models.ShoutOut.sender_id == models.User.id)
+        .scalar_subquery()
+    )
+    received = (
+        select(func.count(models.ShoutOutRecipient.id))
+        .where(models.ShoutOutRecipient.recipient_id == models.User.id)
+        .scalar_subquery()
+    )
+    db.query(models.UserStats).delete(synchronize_session=False)
+    db.execute(
+        insert(models.UserStats).from_select(
+            ["user_id", "department", "shoutouts_sent", "shoutouts_received"],
+            select(models.User.id, models.User.department, sent, received),
+        )
+    )
+
+    day = utc_day_column(db, models.ShoutOut.created_at)
+    events = union_all(
+        select(
+            models.ShoutOut.sender_id.label("user_id"), day.label("day"),
+            literal(1).label("sent"), literal(0).label("received"),
+        ),
+        select(
+            models.ShoutOutRecipient.recipient_id, day, literal(0), literal(1),
+        ).join(models.ShoutOut, models.ShoutOut.id == models.ShoutOutRecipient.shoutout_id),
+    ).subquery()
+    db.query(models.UserDailyStats).delete(synchronize_session=False)
+    db.execute(
+        insert(models.UserDailyStats).from_select(
+            ["user_id", "day", "department", "shoutouts_sent", "shoutouts_received"],
+            select(
+                events.c.user_id, events.c.day, models.User.department,
+                func.sum(events.c.sent), func.sum(events.c.received),
+            )
+            .join(models.User, models.User.id == events.c.user_id)
+            .group_by(events.c.user_id, events.c.day, models.User.department),
+        )
+    )
+
+    db.query(models.DepartmentDailyStats).delete(synchronize_session=False)
+    db.execute(
+        insert(models.DepartmentDailyStats).from_select(
+            ["department", "day", "shoutouts_sent"],
+            select(models.User.department, day, func.count(models.ShoutOut.id))
+            .join(models.User, models.User.id == models.ShoutOut.sender_id)
+            .group_by(models.User.department, day),
+        )
+    )
+
+    now = datetime.now(timezone.utc)
+    departments = union_all(
+        select(models.User.department.label("department"), literal(1).label("users"), literal(0).label("sent")),
+        select(models.User.department, literal(0), literal(1))
+        .join(models.ShoutOut, models.ShoutOut.sender_id == models.User.id),
+    ).subquery()
+    db.query(models.DepartmentStats).delete(synchronize_session=False)
+    db.execute(
+        insert(models.DepartmentStats).from_select(
+            ["department", "users", "shoutouts_sent", "updated_at"],
+            select(
+                departments.c.department, func.sum(departments.c.users), func.sum(departments.c.sent),
+                literal(now, models.DepartmentStats.updated_at.type),
+            ).group_by(departments.c.department),
+        )
+    )
+
+    state = db.get(models.AnalyticsState, STATE_ID)
+    if state is None:
+        state = models.AnalyticsState(id=STATE_ID)
+        db.add(state)
+    state.total_users = db.query(func.count(models.User.id)).scalar()
+    state.total_shoutouts = db.query(func.count(models.ShoutOut.id)).scalar()
+    state.updated_at = now
+    state.rebuilt_at = now
+    db.commit()
+    logger.info("Rebuilt analytics rollups: %d users, %d shout-outs", state.total_users, state.total_shoutouts)
+    return state
+
+WINDOWS = ("7d", "30d", "quarter", "all")
+# Longest custom start_date..end_date range the stats endpoints accept; the
+# daily series has one point per day.
+MAX_WINDOW_DAYS = 366
+
+def resolve_window(
+    window: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    max_days: Optional[int] = MAX_WINDOW_DAYS,
+) -> Optional[Tuple[date, date]]:
+    """
+    Turn the stats query parameters into an inclusive (start, end) UTC day
+    range, or None for all time. An explicit start/end date overrides
+    `window`; "quarter" is the current calendar quarter to date. A range
+    with an explicit start longer than `max_days` (None for no limit) is
+    rejected; an end date alone means everything up to that day.
+    """
+    today = datetime.now(timezone.utc).date()
+    if start_date or end_date:
+        start, end = start_date or date.min, end_date or today
+        if start > end:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+        if start_date and max_days is not None and (end - start).days + 1 > max_days:
+            raise HTTPException(status_code=400, detail=f"Date range must not exceed {max_days} days")
+        return start, end
+    if window in (None, "all"):
+        return None
+    if window == "7d":
+        return today - timedelta(days=6), today
+    if window == "30d":
+        return today - timedelta(days=29), today
+    if window == "quarter":
+        return date(today.year, 3 * ((today.month - 1) // 3) + 1, 1), today
+    raise HTTPException(status_code=400, detail=f"window must be one of {', '.join(WINDOWS)}")
+
+def leaderboard(
+    db: Session,
+    column: str,
+    window: Optional[Tuple[date, date]],
+    department: Optional[str],
+    limit: int,
+) -> List[Tuple[models.User, int]]:
+    """
+    Top `limit` users by `column` ("shoutouts_sent" or "shoutouts_received"),
+    all time from `user_stats` or summed over `user_daily_stats` buckets.
+    """
+    if window is None:
+        stats = models.UserStats
+        count = getattr(stats, column)
+        query = db.query(models.User, count).join(stats, stats.user_id == models.User.id).filter(count > 0)
+        if department:
+            query = query.filter(stats.department == department)
+        return query.order_by(count.desc(), stats.user_id.desc()).limit(limit).all()
+
+    daily = models.UserDailyStats
+    filters = [daily.day >= window[0], daily.day <= window[1]]
+    if department:
+        filters.append(daily.department == department)
+    total = func.sum(getattr(daily, column))
+    ranked = (
+        select(daily.user_id, total.label("count"))
+        .where(and_(*filters))
+        .group_by(daily.user_id)
+        .having(total > 0)
+        .order_by(total.desc(), daily.user_id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        db.query(models.User, ranked.c.count)
+        .join(ranked, ranked.c.user_id == models.User.id)
+        .order_by(ranked.c.count.desc(), models.User.id.desc())
+        .all()
+    )
+
+def daily_shoutouts(
+    db: Session, window: Optional[Tuple[date, date]], department: Optional[str]
+) -> List[Dict[str, object]]:
+    """
+    Shout-outs sent per UTC day over the window, with empty days filled in.
+    For all time the series starts at the first day with any shout-out.
+    """
+    stats = models.DepartmentDailyStats
+    query = db.query(stats.day, func.sum(stats.shoutouts_sent)).group_by(stats.day)
+    if department:
+        query = query.filter(stats.department == department)
+    if window:
+        query = query.filter(stats.day >= window[0], stats.day <= window[1])
+    counts = {day: count for day, count in query.all() if count}
+    if window:
+        start, end = window
+        if start == date.min:
+            start = min(counts, default=end)
+    elif counts:
+        start, end = min(counts), datetime.now(timezone.utc).date()
+    else:
+        return []
+    return [
+        {"day": start + timedelta(days=offset), "count": counts.get(start + timedelta(days=offset), 0)}
+        for offset in range((end - start).days + 1)
+    ]
+
+class RollupState(NamedTuple):
+    total_users: int
+    total_shoutouts: int
+    updated_at: Optional[datetime]
+    rebuilt_at: Optional[datetime]
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def rollup_state(db: Session) -> RollupState:
+    """
+    Board totals summed over the `department_stats` rows, one per
+    department, with `updated_at` the newest write or rebuild they reflect.
+    """
+    stats = models.DepartmentStats
+    row = db.execute(select(
+        func.coalesce(func.sum(stats.users), 0),
+        func.coalesce(func.sum(stats.shoutouts_sent), 0),
+        func.max(stats.updated_at),
+        select(models.AnalyticsState.rebuilt_at).where(models.AnalyticsState.id == STATE_ID).scalar_subquery(),
+    )).one()
+    users, shoutouts, updated_at, rebuilt_at = row
+    times = [_as_utc(value) for value in (updated_at, rebuilt_at) if value is not None]
+    return RollupState(users, shoutouts, max(times, default=None), _as_utc(rebuilt_at))
+
+def department_totals(db: Session) -> List[Tuple[str, int]]:
+    """All-time shout-outs sent per department, skipping empty ones."""
+    stats = models.DepartmentStats
+    return db.query(stats.department, stats.shoutouts_sent).filter(stats.shoutouts_sent > 0).all()
+
+def set_rollup_headers(response: Response, state: RollupState) -> None:
+    if state.updated_at:
+        response.headers[ROLLUPS_UPDATED_HEADER] = state.updated_at.isoformat()
+    if state.rebuilt_at:
+        response.headers[ROLLUPS_REBUILT_HEADER] = state.rebuilt_at.isoformat()
+
+def main() -> None:
+    argparse.ArgumentParser(description="Rebuild the admin analytics rollup tables.").parse_args()
+
+    from backend.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        state = rebuild_rollups(db)
+        print(f"Rebuilt rollups for {state.total_users} users and {state.total_shoutouts} shout-outs")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
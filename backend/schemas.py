@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, field_serializer, root_validator
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 from backend.models import UserRole, ReactionType, ReportStatus
 import pytz
@@ -12,11 +12,17 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class ProfilePictureVariant(BaseModel):
+    size: int
+    jpeg: str
+    webp: str
+
 class UserResponse(UserBase):
     id: int
     role: UserRole
     joined_at: datetime
     profile_picture_url: Optional[str] = None
+    profile_picture_variants: List[ProfilePictureVariant] = []
     
     @field_serializer('joined_at')
     def serialize_joined_at(self, value: datetime) -> str:
@@ -47,7 +53,8 @@ class Token(BaseModel): # This will remain for refresh token functionality if ne
 
 class ShoutOutCreate(BaseModel):
     message: str
-    recipient_ids: List[int]
+    recipient_ids: List[int] = []
+    department: Optional[str] = None # Tag everyone in this department (except the sender)
 
 class RecipientResponse(BaseModel):
     id: int
@@ -95,6 +102,7 @@ class ShoutOutResponse(BaseModel):
     recipients: List[RecipientResponse]
     comments: List[CommentResponse]
     reaction_counts: List[ReactionCount]
+    comment_count: int = 0
     user_reaction: Optional[ReactionType] = None
     
     @field_serializer('created_at')
@@ -118,11 +126,6 @@ class MostRecognizedUser(BaseModel):
     profile_picture_url: Optional[str] = None
     count: int
 
-class AdminStatsResponse(BaseModel):
-    total_shoutouts: int
-    total_users: int
-    most_recognized_users: List[MostRecognizedUser] = []
-
 class TopContributor(BaseModel):
     id: int
     name: str
@@ -130,6 +133,24 @@ class TopContributor(BaseModel):
     profile_picture_url: Optional[str] = None
     total_shoutouts_sent: int
 
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+class AdminStatsResponse(BaseModel):
+    total_shoutouts: int
+    total_users: int
+    most_recognized_users: List[MostRecognizedUser] = []
+    top_contributors: List[TopContributor] = []
+    window: str = "all"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    department: Optional[str] = None
+    window_shoutouts: int = 0
+    daily_shoutouts: List[DailyCount] = []
+    rollups_updated_at: Optional[datetime] = None
+    rollups_rebuilt_at: Optional[datetime] = None
+
 class ReportCreate(BaseModel):
     shoutout_id: Optional[int] = None
     comment_id: Optional[int] = None
@@ -168,12 +189,46 @@ class ReportResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ReportGroupResponse(BaseModel):
+    target_type: str
+    shoutout_id: Optional[int] = None
+    comment_id: Optional[int] = None
+    target_user_name: Optional[str] = None
+    report_count: int
+    pending_count: int
+    first_reported_at: datetime
+    latest_reported_at: datetime
+    latest_report_id: int
+
+    @field_serializer('first_reported_at', 'latest_reported_at')
+    def serialize_reported_at(self, value: datetime) -> str:
+        if value.tzinfo is None:
+            value = pytz.UTC.localize(value)
+        return value.isoformat()
+
 class DepartmentShoutOutStats(BaseModel):
     department: str
     shoutout_count: int
     class Config:
         from_attributes = True
 
+class DirectoryUser(BaseModel):
+    id: int
+    name: str
+    department: Optional[str] = None
+    profile_picture_url: Optional[str] = None
+
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    shoutout_id: Optional[int] = None
+    title: str
+    snippet: str
+    score: float
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
 class NotificationResponse(BaseModel):
     id: int
     type: str
@@ -190,3 +245,16 @@ class NotificationResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class UserImportError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class UserImportResponse(BaseModel):
+    received: int
+    created: int
+    duplicates: int
+    failed: int
+    errors: List[UserImportError] = []
+    errors_truncated: bool = False
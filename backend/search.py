@@ -0,0 +1,513 @@
+"""
+Full-text search over shout-outs, comments and users.
+
+Every searchable row becomes a document (title, body) in one index, so
+results from all three kinds are ranked against each other:
+
+- shout-out: title = sender name, body = message
+- comment:   title = author name, body = content
+- user:      title = name, body = department
+
+The index lives in an FTS5 table on SQLite, a tsvector column with a GIN
+index on PostgreSQL, or an in-process BM25 inverted index when neither is
+available (SEARCH_BACKEND=memory forces it; it only sees writes made by its
+own process). The write endpoints update it incrementally; the SQL
+backends write in the request transaction, the memory backend applies
+changes when that transaction commits. The last query term matches as a
+prefix, so the same endpoint serves typeahead. Rebuild from the base
+tables with:
+
+    python -m backend.search [--batch-size N]
+"""
+import argparse
+import bisect
+import logging
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import event, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from backend import models, schemas
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+KINDS = ("shoutout", "comment", "user")
+_KIND_CODES = {"shoutout": 1, "comment": 2, "user": 3}
+SNIPPET_LENGTH = 160
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+class SearchDocument(NamedTuple):
+    kind: str
+    ref_id: int
+    shoutout_id: Optional[int]
+    title: str
+    body: str
+
+    @property
+    def doc_id(self) -> int:
+        return document_id(self.kind, self.ref_id)
+
+def document_id(kind: str, ref_id: int) -> int:
+    return ref_id * 4 + _KIND_CODES[kind]
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN.findall(value.lower())
+
+def _query_terms(query: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Split a query into whole terms and a trailing prefix term. The last
+    word is a prefix unless the query ends with whitespace.
+    """
+    terms = tokenize(query)
+    if not terms or query[-1:].isspace():
+        return terms, None
+    return terms[:-1], terms[-1]
+
+# Loading documents from the base tables
+
+def shoutout_documents(db: Session, ids: Optional[Sequence[int]] = None) -> Iterator[SearchDocument]:
+    query = (
+        db.query(models.ShoutOut.id, models.ShoutOut.message, models.User.name)
+        .outerjoin(models.User, models.User.id == models.ShoutOut.sender_id)
+    )
+    if ids is not None:
+        query = query.filter(models.ShoutOut.id.in_(ids))
+    for row in query.yield_per(1000):
+        yield SearchDocument("shoutout", row.id, row.id, row.name or "", row.message)
+
+def comment_documents(db: Session, ids: Optional[Sequence[int]] = None) -> Iterator[SearchDocument]:
+    query = (
+        db.query(models.Comment.id, models.Comment.shoutout_id, models.Comment.content, models.User.name)
+        .outerjoin(models.User, models.User.id == models.Comment.user_id)
+    )
+    if ids is not None:
+        query = query.filter(models.Comment.id.in_(ids))
+    for row in query.yield_per(1000):
+        yield SearchDocument("comment", row.id, row.shoutout_id, row.name or "", row.content)
+
+def user_documents(db: Session, ids: Optional[Sequence[int]] = None) -> Iterator[SearchDocument]:
+    query = db.query(models.User.id, models.User.name, models.User.department)
+    if ids is not None:
+        query = query.filter(models.User.id.in_(ids))
+    for row in query.yield_per(1000):
+        yield SearchDocument("user", row.id, None, row.name, row.department or "")
+
+def all_documents(db: Session) -> Iterator[SearchDocument]:
+    yield from user_documents(db)
+    yield from shoutout_documents(db)
+    yield from comment_documents(db)
+
+# Backends
+
+class SearchBackend(ABC):
+    name = "base"
+
+    def ensure_schema(self, engine: Engine) -> None:
+        pass
+
+    @abstractmethod
+    def upsert(self, db: Session, documents: List[SearchDocument]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, db: Session, doc_ids: List[int]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self, db: Session) -> None:
+        ...
+
+    @abstractmethod
+    def search(self, db: Session, query: str, kinds: Sequence[str], limit: int) -> List[Tuple[SearchDocument, float]]:
+        ...
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 table keyed by the encoded document id as rowid; ranked by bm25."""
+    name = "fts5"
+
+    def ensure_schema(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+                "title, body, kind UNINDEXED, ref_id UNINDEXED, shoutout_id UNINDEXED, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+
+    def upsert(self, db: Session, documents: List[SearchDocument]) -> None:
+        if not documents:
+            return
+        self.delete(db, [d.doc_id for d in documents])
+        db.execute(
+            text(
+                "INSERT INTO search_fts (rowid, title, body, kind, ref_id, shoutout_id) "
+                "VALUES (:rowid, :title, :body, :kind, :ref_id, :shoutout_id)"
+            ),
+            [{"rowid": d.doc_id, **d._asdict()} for d in documents],
+        )
+
+    def delete(self, db: Session, doc_ids: List[int]) -> None:
+        if doc_ids:
+            db.execute(text("DELETE FROM search_fts WHERE rowid = :rowid"), [{"rowid": i} for i in doc_ids])
+
+    def clear(self, db: Session) -> None:
+        db.execute(text("DELETE FROM search_fts"))
+
+    def search(self, db: Session, query: str, kinds: Sequence[str], limit: int) -> List[Tuple[SearchDocument, float]]:
+        terms, prefix = _query_terms(query)
+        match = " ".join([f'"{t}"' for t in terms] + ([f'"{prefix}"*'] if prefix else []))
+        if not match:
+            return []
+        kind_params = {f"kind{i}": kind for i, kind in enumerate(kinds)}
+        rows = db.execute(
+            text(
+                "SELECT kind, ref_id, shoutout_id, title, body, bm25(search_fts, 10.0, 1.0) AS score "
+                "FROM search_fts WHERE search_fts MATCH :match "
+                f"AND kind IN ({', '.join(':' + k for k in kind_params)}) "
+                "ORDER BY score LIMIT :limit"
+            ),
+            {"match": match, "limit": limit, **kind_params},
+        ).all()
+        # bm25() is lower-is-better; flip it so scores grow with relevance.
+        return [(SearchDocument(r.kind, r.ref_id, r.shoutout_id, r.title, r.body), -r.score) for r in rows]
+
+class PostgresBackend(SearchBackend):
+    """
+    `search_documents` with a generated, weighted tsvector (title A, body B)
+    and a GIN index; ranked by ts_rank.
+    """
+    name = "postgres"
+
+    def ensure_schema(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS search_documents ("
+                "id BIGINT PRIMARY KEY, kind TEXT NOT NULL, ref_id INTEGER NOT NULL, shoutout_id INTEGER, "
+                "title TEXT NOT NULL, body TEXT NOT NULL, "
+                "document tsvector GENERATED ALWAYS AS ("
+                "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')"
+                ") STORED)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_search_documents_document ON search_documents USING GIN (document)"
+            ))
+
+    def upsert(self, db: Session, documents: List[SearchDocument]) -> None:
+        if not documents:
+            return
+        db.execute(
+            text(
+                "INSERT INTO search_documents (id, kind, ref_id, shoutout_id, title, body) "
+                "VALUES (:id, :kind, :ref_id, :shoutout_id, :title, :body) "
+                "ON CONFLICT (id) DO UPDATE SET shoutout_id = EXCLUDED.shoutout_id, "
+                "title = EXCLUDED.title, body = EXCLUDED.body"
+            ),
+            [{"id": d.doc_id, **d._asdict()} for d in documents],
+        )
+
+    def delete(self, db: Session, doc_ids: List[int]) -> None:
+        if doc_ids:
+            db.execute(text("DELETE FROM search_documents WHERE id = ANY(:ids)"), {"ids": list(doc_ids)})
+
+    def clear(self, db: Session) -> None:
+        db.execute(text("TRUNCATE search_documents"))
+
+    def search(self, db: Session, query: str, kinds: Sequence[str], limit: int) -> List[Tuple[SearchDocument, float]]:
+        terms, prefix = _query_terms(query)
+        tsquery = " & ".join(terms + ([f"{prefix}:*"] if prefix else []))
+        if not tsquery:
+            return []
+        rows = db.execute(
+            text(
+                "SELECT kind, ref_id, shoutout_id, title, body, ts_rank(document, q) AS score "
+                "FROM search_documents, to_tsquery('simple', :tsquery) AS q "
+                "WHERE document @@ q AND kind = ANY(:kinds) "
+                "ORDER BY score DESC LIMIT :limit"
+            ),
+            {"tsquery": tsquery, "kinds": list(kinds), "limit": limit},
+        ).all()
+        return [(SearchDocument(r.kind, r.ref_id, r.shoutout_id, r.title, r.body), r.score) for r in rows]
+
+class MemoryBackend(SearchBackend):
+    """
+    In-process inverted index with BM25 ranking. Title terms count
+    TITLE_WEIGHT times. Changes are staged on the session and applied when
+    it commits, so rolled-back writes never reach the index.
+    """
+    name = "memory"
+    TITLE_WEIGHT = 3
+    K1 = 1.2
+    B = 0.75
+    MAX_PREFIX_EXPANSIONS = 64
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._vocabulary: List[str] = []
+        self._documents: Dict[int, Tuple[SearchDocument, int, List[str]]] = {}
+        self._total_length = 0
+        self._loaded = False
+        # Documents committed before the first load finished; that load must
+        # not overwrite them with what it read.
+        self._committed: Set[int] = set()
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def _stage(self, db: Session, op: str, payload) -> None:
+        db.info.setdefault("search_ops", []).append((op, payload))
+
+    def _after_commit(self, session: Session) -> None:
+        ops = session.info.pop("search_ops", None)
+        if not ops:
+            return
+        with self._lock:
+            for op, payload in ops:
+                if op == "upsert":
+                    for document in payload:
+                        self._add(document)
+                    if not self._loaded:
+                        self._committed.update(document.doc_id for document in payload)
+                elif op == "delete":
+                    for doc_id in payload:
+                        self._remove(doc_id)
+                    if not self._loaded:
+                        self._committed.update(payload)
+                else:
+                    self._reset()
+                    self._loaded = True
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop("search_ops", None)
+
+    def _reset(self) -> None:
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._documents.clear()
+        self._total_length = 0
+
+    def _add(self, document: SearchDocument) -> None:
+        self._remove(document.doc_id)
+        frequencies: Dict[str, int] = defaultdict(int)
+        for token in tokenize(document.title):
+            frequencies[token] += self.TITLE_WEIGHT
+        for token in tokenize(document.body):
+            frequencies[token] += 1
+        for token, frequency in frequencies.items():
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token][document.doc_id] = frequency
+        length = sum(frequencies.values())
+        self._documents[document.doc_id] = (document, length, list(frequencies))
+        self._total_length += length
+
+    def _remove(self, doc_id: int) -> None:
+        entry = self._documents.pop(doc_id, None)
+        if entry is None:
+            return
+        _, length, tokens = entry
+        self._total_length -= length
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    self._vocabulary.pop(index)
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        # Read outside the lock: under run_sync the query yields to the event
+        # loop, and a search waiting on the lock there would block the loop.
+        documents = list(all_documents(db))
+        with self._lock:
+            if self._loaded:
+                return
+            for document in documents:
+                if document.doc_id not in self._committed:
+                    self._add(document)
+            self._committed.clear()
+            self._loaded = True
+
+    def upsert(self, db: Session, documents: List[SearchDocument]) -> None:
+        if documents:
+            self._stage(db, "upsert", list(documents))
+
+    def delete(self, db: Session, doc_ids: List[int]) -> None:
+        if doc_ids:
+            self._stage(db, "delete", list(doc_ids))
+
+    def clear(self, db: Session) -> None:
+        self._stage(db, "clear", None)
+        self._loaded = True
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        expansions = []
+        for token in self._vocabulary[start:start + self.MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            expansions.append(token)
+        return expansions
+
+    def search(self, db: Session, query: str, kinds: Sequence[str], limit: int) -> List[Tuple[SearchDocument, float]]:
+        self._ensure_loaded(db)
+        terms, prefix = _query_terms(query)
+        groups = [[t] for t in terms]
+        with self._lock:
+            if prefix:
+                groups.append(self._expand(prefix))
+            if not groups or not all(groups):
+                return []
+            count = len(self._documents) or 1
+            average_length = self._total_length / count or 1
+            scores: Optional[Dict[int, float]] = None
+            # Every term (or, for the prefix, any of its expansions) must match.
+            for group in groups:
+                group_scores: Dict[int, float] = defaultdict(float)
+                for token in group:
+                    postings = self._postings.get(token, {})
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, frequency in postings.items():
+                        length = self._documents[doc_id][1]
+                        norm = frequency + self.K1 * (1 - self.B + self.B * length / average_length)
+                        group_scores[doc_id] += idf * frequency * (self.K1 + 1) / norm
+                if scores is None:
+                    scores = dict(group_scores)
+                else:
+                    scores = {d: s + group_scores[d] for d, s in scores.items() if d in group_scores}
+            wanted = set(kinds)
+            ranked = sorted(
+                ((self._documents[d][0], s) for d, s in scores.items() if self._documents[d][0].kind in wanted),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            return ranked[:limit]
+
+def _fts5_available(engine: Engine) -> bool:
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)"))
+            conn.execute(text("DROP TABLE temp._fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+def select_backend(engine: Engine, name: str = SEARCH_BACKEND) -> SearchBackend:
+    dialect = engine.dialect.name
+    if name == "memory":
+        return MemoryBackend()
+    if name in ("auto", "postgres") and dialect == "postgresql":
+        return PostgresBackend()
+    if name in ("auto", "fts5") and dialect == "sqlite" and _fts5_available(engine):
+        return SQLiteFTSBackend()
+    if name not in ("auto",):
+        logger.warning("Search backend %r is not available on %s; using the in-memory index", name, dialect)
+    return MemoryBackend()
+
+# The index API used by the endpoints
+
+class SearchIndex:
+    def __init__(self, backend: SearchBackend):
+        self.backend = backend
+
+    def ensure_schema(self, engine: Engine) -> None:
+        self.backend.ensure_schema(engine)
+
+    def index_shoutout(self, db: Session, shoutout_id: int) -> None:
+        self.backend.upsert(db, list(shoutout_documents(db, [shoutout_id])))
+
+    def index_comment(self, db: Session, comment_id: int) -> None:
+        self.backend.upsert(db, list(comment_documents(db, [comment_id])))
+
+    def index_user(self, db: Session, user_id: int, with_content: bool = False) -> None:
+        """
+        Reindex a user; with `with_content`, also the shout-outs and comments
+        whose title is their name.
+        """
+        documents = list(user_documents(db, [user_id]))
+        if with_content:
+            shoutout_ids = select(models.ShoutOut.id).where(models.ShoutOut.sender_id == user_id)
+            comment_ids = select(models.Comment.id).where(models.Comment.user_id == user_id)
+            documents += shoutout_documents(db, [i for (i,) in db.execute(shoutout_ids)])
+            documents += comment_documents(db, [i for (i,) in db.execute(comment_ids)])
+        self.backend.upsert(db, documents)
+
+    def index_users(self, db: Session, user_ids: Sequence[int]) -> None:
+        """Index newly created users in one pass."""
+        self.backend.upsert(db, list(user_documents(db, user_ids)))
+
+    def remove_shoutout(self, db: Session, shoutout_id: int) -> None:
+        """Remove a shout-out and its comments; call before deleting them."""
+        comment_ids = db.query(models.Comment.id).filter(models.Comment.shoutout_id == shoutout_id).all()
+        self.backend.delete(
+            db, [document_id("shoutout", shoutout_id)] + [document_id("comment", i) for (i,) in comment_ids]
+        )
+
+    def remove_comment(self, db: Session, comment_id: int) -> None:
+        self.backend.delete(db, [document_id("comment", comment_id)])
+
+    def remove_user(self, db: Session, user_id: int) -> None:
+        self.backend.delete(db, [document_id("user", user_id)])
+
+    def search(self, db: Session, query: str, kinds: Iterable[str] = KINDS, limit: int = 20) -> List[schemas.SearchResult]:
+        results = self.backend.search(db, query, list(kinds), limit)
+        return [
+            schemas.SearchResult(
+                kind=document.kind,
+                id=document.ref_id,
+                shoutout_id=document.shoutout_id,
+                title=document.title,
+                snippet=document.body[:SNIPPET_LENGTH],
+                score=round(score, 6),
+            )
+            for document, score in results
+        ]
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        self.backend.clear(db)
+        indexed = 0
+        batch: List[SearchDocument] = []
+        for document in all_documents(db):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                self.backend.upsert(db, batch)
+                indexed += len(batch)
+                batch = []
+        self.backend.upsert(db, batch)
+        indexed += len(batch)
+        db.commit()
+        return indexed
+
+def _create_index() -> SearchIndex:
+    from backend.database import engine
+
+    return SearchIndex(select_backend(engine))
+
+search_index = _create_index()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the full-text search index.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal, engine
+
+    search_index.ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        indexed = search_index.rebuild(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Indexed {indexed} documents with the {search_index.backend.name} backend")
+
+if __name__ == "__main__":
+    main()
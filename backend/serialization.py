@@ -0,0 +1,81 @@
+"""
+Fast JSON output for large list responses.
+
+The default path builds Pydantic models, validates them again against the
+endpoint's `response_model` and encodes the result with the standard json
+module. For payloads built straight from ORM rows in the response shape
+(see `backend.feed.shoutout_payloads`), that validation finds nothing to
+fix. `FastJSONResponse` encodes such dicts and lists once with orjson, and
+`NDJSONResponse` streams one JSON document per line for lists too big to
+hold as one body.
+
+Endpoints opt in by returning these responses. `response_model` still
+documents the shape in OpenAPI. Payloads may hold datetimes (naive ones are
+UTC, matching the schemas' serializers) and enums as they come from the ORM.
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Lines joined into one chunk of a streamed body.
+NDJSON_CHUNK_ITEMS = 100
+
+_OPTIONS = orjson.OPT_NAIVE_UTC
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, without response_model validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def ndjson_lines(items: Iterable[Any]) -> Iterator[bytes]:
+    chunk: List[bytes] = []
+    for item in items:
+        chunk.append(orjson.dumps(item, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE))
+        if len(chunk) >= NDJSON_CHUNK_ITEMS:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+async def _ndjson_lines_async(items: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    chunk: List[bytes] = []
+    async for item in items:
+        chunk.append(orjson.dumps(item, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE))
+        if len(chunk) >= NDJSON_CHUNK_ITEMS:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Stream `items` as newline-delimited JSON. A plain iterable is consumed
+    on the threadpool, so it may read from a blocking Session as it goes.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(self, items: Union[Iterable[Any], AsyncIterable[Any]], status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None, **kwargs):
+        lines = _ndjson_lines_async(items) if hasattr(items, "__aiter__") else ndjson_lines(items)
+        super().__init__(lines, status_code=status_code, headers=headers, media_type=NDJSON_MEDIA_TYPE, **kwargs)
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def list_response(request: Request, response: Response, items: List[Any]) -> Response:
+    """
+    Return trusted list payloads as NDJSON when the client asks for it
+    (Accept: application/x-ndjson), otherwise as one orjson-encoded array.
+    Headers the endpoint set on `response` (e.g. X-Next-Cursor) are kept.
+    """
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    if wants_ndjson(request):
+        return NDJSONResponse(items, headers=headers)
+    return FastJSONResponse(items, headers=headers)
@@ -0,0 +1,78 @@
+"""
+Serving for /uploads.
+
+Avatar variants are content-addressed (see backend.images), so their URLs
+are served with a strong ETag derived from the file name and
+`Cache-Control: immutable`; browsers never revalidate them, and a
+conditional request that does arrive gets its 304 without touching the
+filesystem. Other files (pictures uploaded before variants existed) are
+served with `no-cache` and revalidated against Starlette's stat-based ETag.
+
+Avatar URLs also accept `?size=N` to get the smallest stored variant of at
+least N pixels, and with UPLOADS_NEGOTIATE_WEBP enabled, clients that
+accept WebP get the WebP sibling of a requested JPEG. Range requests and
+zero-copy sends (where the server supports them) come from FileResponse.
+"""
+import os
+import re
+from typing import Optional, Tuple
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from backend.images import AVATAR_SIZES
+
+NEGOTIATE_WEBP = os.getenv("UPLOADS_NEGOTIATE_WEBP", "false").lower() in ("1", "true", "yes")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_AVATAR_PATH = re.compile(r"^avatars/(?P<hash>[0-9a-f]{32})_(?P<size>\d+)\.(?P<ext>jpeg|webp)$")
+
+def _requested_size(scope: Scope) -> Optional[int]:
+    value = QueryParams(scope.get("query_string", b"")).get("size")
+    if value is None or not value.isdigit():
+        return None
+    wanted = int(value)
+    return next((size for size in sorted(AVATAR_SIZES) if size >= wanted), max(AVATAR_SIZES))
+
+class UploadFiles(StaticFiles):
+    def _resolve_avatar(self, path: str, scope: Scope) -> Optional[Tuple[str, bool]]:
+        """
+        Map a content-addressed avatar request to the variant to serve.
+        Returns (path, negotiated) or None for any other file.
+        """
+        match = _AVATAR_PATH.match(path)
+        if not match:
+            return None
+        size = _requested_size(scope) or int(match["size"])
+        ext = match["ext"]
+        negotiated = NEGOTIATE_WEBP and ext == "jpeg"
+        if negotiated and "image/webp" in Headers(scope=scope).get("accept", ""):
+            ext = "webp"
+        return f"avatars/{match['hash']}_{size}.{ext}", negotiated
+
+    @staticmethod
+    def _immutable_headers(path: str, negotiated: bool) -> dict:
+        headers = {"etag": f'"{os.path.basename(path)}"', "cache-control": IMMUTABLE_CACHE_CONTROL}
+        if negotiated:
+            headers["vary"] = "Accept"
+        return headers
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        avatar = self._resolve_avatar(path, scope)
+        if avatar is None:
+            response = await super().get_response(path, scope)
+            if response.status_code in (200, 206, 304):
+                response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+            return response
+
+        path, negotiated = avatar
+        headers = self._immutable_headers(path, negotiated)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and headers["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return NotModifiedResponse(Headers(headers))
+
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 206, 304):
+            response.headers.update(headers)
+        return response
@@ -0,0 +1,122 @@
+"""
+Fan-out-on-write personal timelines (`user_timeline`).
+
+`fan_out_shoutout` is called by create_shoutout after the recipients are
+flushed; delete_shoutout removes the entries with `prune_shoutout`. To
+backfill timelines for shout-outs created before the table existed, run:
+
+    python -m backend.timeline
+"""
+import argparse
+import logging
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+from backend import models
+
+logger = logging.getLogger(__name__)
+
+def _sent_entries(shoutout_filter):
+    return (
+        select(
+            models.ShoutOut.sender_id,
+            models.ShoutOut.id,
+            literal(models.TimelineKind.sent, models.TimelineEntry.kind.type),
+            models.ShoutOut.created_at,
+        )
+        .where(shoutout_filter)
+    )
+
+def _tagged_entries(shoutout_filter):
+    return (
+        select(
+            models.ShoutOutRecipient.recipient_id,
+            models.ShoutOut.id,
+            literal(models.TimelineKind.tagged, models.TimelineEntry.kind.type),
+            models.ShoutOut.created_at,
+        )
+        .join(models.ShoutOut, models.ShoutOut.id == models.ShoutOutRecipient.shoutout_id)
+        .where(shoutout_filter)
+        .distinct()
+    )
+
+def _insert_entries(db: Session, shoutout_filter) -> None:
+    columns = [
+        models.TimelineEntry.user_id,
+        models.TimelineEntry.shoutout_id,
+        models.TimelineEntry.kind,
+        models.TimelineEntry.created_at,
+    ]
+    for entries in (_sent_entries(shoutout_filter), _tagged_entries(shoutout_filter)):
+        db.execute(insert(models.TimelineEntry).from_select(columns, entries))
+
+def fan_out_shoutout(db: Session, shoutout_id: int) -> None:
+    """
+    Write the sender's and every recipient's timeline entry for a shout-out
+    with two INSERT ... SELECT statements. The recipients must already be
+    flushed.
+    """
+    _insert_entries(db, models.ShoutOut.id == shoutout_id)
+
+def prune_shoutout(db: Session, shoutout_id: int) -> None:
+    db.query(models.TimelineEntry).filter(
+        models.TimelineEntry.shoutout_id == shoutout_id
+    ).delete(synchronize_session=False)
+
+def timeline_query(db: Session, user_id: int, kind: models.TimelineKind):
+    """
+    Query (shoutout_id, created_at) rows of a user's timeline, ready to be
+    keyset-paginated on (TimelineEntry.created_at, TimelineEntry.shoutout_id).
+    """
+    return db.query(models.TimelineEntry.shoutout_id, models.TimelineEntry.created_at).filter(
+        models.TimelineEntry.user_id == user_id,
+        models.TimelineEntry.kind == kind,
+    )
+
+def rebuild_timelines(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuild every timeline from `shoutouts` and `shoutout_recipients`,
+    one committed id range at a time. Returns the number of shout-outs
+    processed.
+    """
+    db.query(models.TimelineEntry).delete(synchronize_session=False)
+    db.commit()
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = [
+            row.id for row in
+            db.query(models.ShoutOut.id)
+            .filter(models.ShoutOut.id > last_id)
+            .order_by(models.ShoutOut.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            break
+
+        _insert_entries(db, models.ShoutOut.id.between(ids[0], ids[-1]))
+        db.commit()
+
+        processed += len(ids)
+        last_id = ids[-1]
+        logger.info("Rebuilt timelines for %d shout-outs", processed)
+
+    return processed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the per-user shout-out timelines.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        processed = rebuild_timelines(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Rebuilt timelines for {processed} shout-outs")
+
+if __name__ == "__main__":
+    main()
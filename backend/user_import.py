@@ -0,0 +1,248 @@
+"""
+Bulk user provisioning from CSV or NDJSON.
+
+Each row needs `name`, `email`, `department` and `password`. CSV files
+carry them as a header row and NDJSON as one object per line. Rows are
+processed in batches of USER_IMPORT_BATCH_SIZE:
+
+1. Validate each row and drop emails already seen in this import.
+2. Check the rest against existing users with one query.
+3. Hash the passwords in parallel on the password pool.
+4. Insert the users with one multi-row INSERT, then create their rollup rows
+   and search documents set-based and commit.
+
+Failed and duplicate rows are reported by row number and never abort the
+import. Admins call POST /api/admin/users/import with the file as the
+request body; from a shell:
+
+    python -m backend.user_import users.csv [--format ndjson]
+
+Password hashing dominates the run time at the default PASSWORD_HASH_ROUNDS;
+everything else is a handful of statements per batch.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend import models, schemas
+from backend.rollups import record_users_created
+from backend.search import search_index
+
+USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "1000"))
+USER_IMPORT_MAX_BYTES = int(os.getenv("USER_IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+USER_IMPORT_MAX_ERRORS = 1000
+# Request bodies stay in memory up to this size, then spill to a temp file.
+SPOOL_BYTES = 1024 * 1024
+FORMATS = ("csv", "ndjson")
+REQUIRED_FIELDS = ("name", "email", "department", "password")
+
+# (row number, parsed row or the reason it could not be parsed)
+ParsedRow = Tuple[int, Union[Dict[str, Any], str]]
+
+def resolve_format(explicit: Optional[str], content_type: str = "", filename: str = "") -> str:
+    if explicit:
+        if explicit not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+        return explicit
+    if "ndjson" in content_type or "jsonl" in content_type or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+def parse_rows(lines: Iterable[str], import_format: str) -> Iterator[ParsedRow]:
+    """Rows are numbered from 1, not counting the CSV header."""
+    if import_format == "csv":
+        for number, record in enumerate(csv.DictReader(lines), start=1):
+            yield number, record
+        return
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, f"invalid JSON: {e}"
+            continue
+        yield number, record if isinstance(record, dict) else "each line must be a JSON object"
+
+def batches(rows: Iterable[ParsedRow], size: int = USER_IMPORT_BATCH_SIZE) -> Iterator[List[ParsedRow]]:
+    batch: List[ParsedRow] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def spool_request(request: Request, max_bytes: int = USER_IMPORT_MAX_BYTES) -> io.TextIOWrapper:
+    """
+    Copy the request body into a spooled temp file with a size cap and
+    return it as text lines, so large imports are never held in memory.
+    """
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            body.close()
+            raise HTTPException(status_code=413, detail=f"Import is larger than {max_bytes} bytes")
+        body.write(chunk)
+    body.seek(0)
+    return io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+class UserImport:
+    """Tallies one import; feed it batches through `prepare` and `insert`."""
+
+    def __init__(self, max_errors: int = USER_IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.received = 0
+        self.created = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._seen: Set[str] = set()
+
+    def _error(self, row: int, email: Optional[str], message: str) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "email": email, "error": message})
+
+    def _fail(self, row: int, email: Optional[str], message: str) -> None:
+        self.failed += 1
+        self._error(row, email, message)
+
+    def _duplicate(self, row: int, email: str, message: str) -> None:
+        self.duplicates += 1
+        self._error(row, email, message)
+
+    @staticmethod
+    def _existing_emails(db: Session, emails: Sequence[str]) -> Set[str]:
+        if not emails:
+            return set()
+        return {email for (email,) in db.query(models.User.email).filter(models.User.email.in_(emails))}
+
+    def prepare(self, db: Session, batch: Sequence[ParsedRow]) -> List[Tuple[int, schemas.UserCreate]]:
+        """Validate a batch and drop duplicates; returns the rows to create."""
+        candidates: List[Tuple[int, schemas.UserCreate]] = []
+        for row, record in batch:
+            self.received += 1
+            if isinstance(record, str):
+                self._fail(row, None, record)
+                continue
+            email = record.get("email")
+            missing = [field for field in REQUIRED_FIELDS if not str(record.get(field) or "").strip()]
+            if missing:
+                self._fail(row, email, f"missing {', '.join(missing)}")
+                continue
+            try:
+                user = schemas.UserCreate(**{field: record[field] for field in REQUIRED_FIELDS})
+            except ValidationError as e:
+                self._fail(row, email, _validation_message(e))
+                continue
+            if user.email in self._seen:
+                self._duplicate(row, user.email, "Email appears earlier in this import")
+                continue
+            self._seen.add(user.email)
+            candidates.append((row, user))
+
+        existing = self._existing_emails(db, [user.email for _, user in candidates])
+        prepared = []
+        for row, user in candidates:
+            if user.email in existing:
+                self._duplicate(row, user.email, "Email already registered")
+            else:
+                prepared.append((row, user))
+        return prepared
+
+    def insert(self, db: Session, prepared: Sequence[Tuple[int, schemas.UserCreate]], hashes: Sequence[str]) -> None:
+        """Create the prepared users with their password hashes and commit."""
+        pending = list(zip(prepared, hashes))
+        while pending:
+            try:
+                created = db.execute(
+                    insert(models.User).returning(models.User.id, models.User.department),
+                    [
+                        {
+                            "name": user.name,
+                            "email": user.email,
+                            "password": hashed,
+                            "department": user.department,
+                            "role": models.UserRole.employee,
+                        }
+                        for (_, user), hashed in pending
+                    ],
+                ).all()
+                record_users_created(db, [(row.id, row.department) for row in created])
+                search_index.index_users(db, [row.id for row in created])
+                db.commit()
+            except IntegrityError:
+                # Someone registered one of these emails since `prepare`;
+                # report those and retry the rest.
+                db.rollback()
+                taken = self._existing_emails(db, [user.email for (_, user), _ in pending])
+                if not taken:
+                    raise
+                for (row, user), _ in pending:
+                    if user.email in taken:
+                        self._duplicate(row, user.email, "Email already registered")
+                pending = [item for item in pending if item[0][1].email not in taken]
+                continue
+            self.created += len(created)
+            return
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.duplicates + self.failed > len(self.errors),
+        }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import users from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to ndjson for .ndjson/.jsonl files, else csv")
+    parser.add_argument("--batch-size", type=int, default=USER_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+    from backend.passwords import password_hasher
+    from backend.response_cache import response_cache
+
+    import_format = resolve_format(args.format, filename=args.path)
+    job = UserImport()
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            for batch in batches(parse_rows(lines, import_format), args.batch_size):
+                prepared = job.prepare(db, batch)
+                hashes = password_hasher.hash_many([user.password for _, user in prepared])
+                job.insert(db, prepared, hashes)
+                print(f"Imported {job.created} of {job.received} rows", flush=True)
+    finally:
+        db.close()
+        password_hasher.shutdown()
+    if job.created:
+        # Reaches other servers with a shared cache backend; their user
+        # directories pick the new users up when the TTL expires.
+        response_cache.bump()
+    print(json.dumps(job.report(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,24 @@ export default function CreateShoutout({ onSuccess, onCancel }) {
     const [showNoUserMessage, setShowNoUserMessage] = useState(false);
   
     useEffect(() => {
-      usersAPI.getUsers().then((response) => {
-        setUsers(response.data);
-      });
-    }, []);
+      if (!searchTerm.trim()) {
+        setUsers([]);
+        return;
+      }
+      let cancelled = false;
+      const timer = setTimeout(() => {
+        usersAPI.searchDirectory(searchTerm, undefined, 5 + selectedRecipients.length).then((response) => {
+          if (!cancelled) setUsers(response.data);
+        });
+      }, 150);
+      return () => {
+        cancelled = true;
+        clearTimeout(timer);
+      };
+    }, [searchTerm, selectedRecipients.length]);
   
     const filteredUsers = users.filter(
-      (user) =>
-        user.name.toLowerCase().includes(searchTerm.toLowerCase()) &&
-        !selectedRecipients.find((r) => r.id === user.id)
+      (user) => !selectedRecipients.find((r) => r.id === user.id)
     );
   
     const handleSubmit = async (e) => {
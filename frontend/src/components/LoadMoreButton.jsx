@@ -0,0 +1,12 @@
+export default function LoadMoreButton({ hasMore, loading, onClick }) {
+  if (!hasMore) return null;
+  return (
+    <button
+      onClick={onClick}
+      disabled={loading}
+      className="w-full mt-4 px-4 py-2 bg-purple-600 text-white rounded-md hover:bg-purple-700 disabled:opacity-60 dark:bg-purple-500 dark:hover:bg-purple-600"
+    >
+      {loading ? 'Loading...' : 'Show More'}
+    </button>
+  );
+}
@@ -1,6 +1,6 @@
 import { useState, useEffect, useRef } from 'react';
 import { FaBell } from 'react-icons/fa';
-import { notificationsAPI } from '../services/api';
+import api, { notificationsAPI } from '../services/api';
 import { formatDistanceToNow } from 'date-fns';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext'; // Import useAuth
@@ -30,10 +30,12 @@ export default function Notifications() {
 
   const fetchNotifications = async () => {
     try {
-      const response = await notificationsAPI.getNotifications();
-      const data = response.data;
-      setNotifications(data);
-      setUnreadCount(data.filter(n => !n.is_read).length);
+      const [response, unread] = await Promise.all([
+        notificationsAPI.getNotifications(),
+        notificationsAPI.getUnreadCount(),
+      ]);
+      setNotifications(response.data);
+      setUnreadCount(unread.data.unread_count);
     } catch (error) {
       console.error("Failed to fetch notifications:", error);
     }
@@ -41,8 +43,40 @@ export default function Notifications() {
 
   useEffect(() => {
     fetchNotifications();
-    const interval = setInterval(fetchNotifications, 30000);
-    return () => clearInterval(interval);
+
+    // Prefer the server-sent event stream; fall back to polling when the
+    // browser lacks EventSource or the stream is closed for good.
+    let interval = null;
+    let source = null;
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchNotifications, 30000);
+    };
+
+    const token = localStorage.getItem('access_token');
+    if (token && typeof EventSource !== 'undefined') {
+      source = new EventSource(
+        `${api.defaults.baseURL}/api/notifications/stream?token=${encodeURIComponent(token)}`
+      );
+      source.addEventListener('notification', (event) => {
+        const notification = JSON.parse(event.data);
+        setNotifications(prev =>
+          [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 50)
+        );
+      });
+      source.addEventListener('unread_count', (event) => {
+        setUnreadCount(JSON.parse(event.data).unread_count);
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) startPolling();
+      };
+    } else {
+      startPolling();
+    }
+
+    return () => {
+      if (interval) clearInterval(interval);
+      if (source) source.close();
+    };
   }, []);
 
   useEffect(() => {
@@ -4,8 +4,8 @@ import { shoutoutsAPI } from '../services/api';
 const ReactionViewer = ({ shoutoutId, onClose }) => {
     const [reactions, setReactions] = useState([]);
     const [loading, setLoading] = useState(false);
-    const [page, setPage] = useState(1);
-    const [hasMore, setHasMore] = useState(true);
+    const [cursor, setCursor] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
     const [filter, setFilter] = useState('');
 
     const reactionTypes = ['like', 'clap', 'star'];
@@ -20,12 +20,12 @@ const ReactionViewer = ({ shoutoutId, onClose }) => {
             setLoading(true);
             try {
                 const response = await shoutoutsAPI.getShoutoutReactions(shoutoutId, {
-                    page,
+                    cursor: cursor || undefined,
                     limit: 10,
                     type: filter || undefined,
                 });
-                setReactions(prev => (page === 1 ? response.data : [...prev, ...response.data]));
-                setHasMore(response.data.length > 0);
+                setReactions(prev => (cursor === null ? response.data : [...prev, ...response.data]));
+                setNextCursor(response.headers['x-next-cursor'] || null);
             } catch (error) {
                 console.error('Failed to fetch reactions:', error);
             } finally {
@@ -36,11 +36,11 @@ const ReactionViewer = ({ shoutoutId, onClose }) => {
         if (shoutoutId) {
             fetchReactions();
         }
-    }, [shoutoutId, page, filter]);
+    }, [shoutoutId, cursor, filter]);
 
     const handleFilterChange = (newFilter) => {
         setFilter(newFilter);
-        setPage(1);
+        setCursor(null);
         setReactions([]);
     };
 
@@ -98,9 +98,9 @@ const ReactionViewer = ({ shoutoutId, onClose }) => {
 
                     {loading && <p className="text-center">Loading...</p>}
 
-                    {!loading && hasMore && (
+                    {!loading && nextCursor && (
                         <button
-                            onClick={() => setPage(prev => prev + 1)}
+                            onClick={() => setCursor(nextCursor)}
                             className="w-full mt-4 px-4 py-2 bg-blue-500 text-white rounded-md hover:bg-blue-600"
                         >
                             Show More
@@ -120,10 +120,20 @@ const DropdownMenu = ({ isOwnerOrAdmin, onDelete, onReportClick, itemId, current
 };
 
 
+// Mention suggestions come from the user directory as the @query is typed,
+// shared by every card rather than each card loading the user list.
+const searchMentionUsers = (query, callback) => {
+  usersAPI.searchDirectory(query, undefined, 8)
+    .then((response) => callback(response.data.map((user) => ({ id: user.id, display: user.name }))))
+    .catch((error) => {
+      console.error('Failed to search users:', error);
+      callback([]);
+    });
+};
+
 export default function ShoutoutCard({ shoutout, onUpdate, onDelete, onReport }) {
   const [comment, setComment] = useState('');
   const [showComments, setShowComments] = useState(false);
-  const [users, setUsers] = useState([]);
   const [showReactionViewer, setShowReactionViewer] = useState(false);
   const [isReportModalOpen, setIsReportModalOpen] = useState(false);
   const [reportingItem, setReportingItem] = useState({ shoutoutId: null, commentId: null });
@@ -131,22 +141,6 @@ export default function ShoutoutCard({ shoutout, onUpdate, onDelete, onReport })
   const [commentToDelete, setCommentToDelete] = useState(null);
   const { user } = useAuth();
 
-  useEffect(() => {
-    const fetchUsers = async () => {
-      try {
-        const response = await usersAPI.getUsers();
-        const formattedUsers = response.data.map((user) => ({
-          id: user.id,
-          display: user.name,
-        }));
-        setUsers(formattedUsers);
-      } catch (error) {
-        console.error('Failed to fetch users:', error);
-      }
-    };
-
-    fetchUsers();
-  }, []);
 
   const reactionIcons = {
     like: FaHeart,
@@ -368,7 +362,7 @@ export default function ShoutoutCard({ shoutout, onUpdate, onDelete, onReport })
               >
                 <Mention
                   trigger="@"
-                  data={users}
+                  data={searchMentionUsers}
                   markup="@[__display__](__id__)"
                   style={{ backgroundColor: '#dbeafe' }}
                   displayTransform={(id, display) => `@${display}`}
@@ -3,11 +3,12 @@ import { FaUsers, FaBullhorn, FaTrash, FaAward, FaStar } from 'react-icons/fa';
 import { adminAPI, usersAPI } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 import toast from 'react-hot-toast';
+import LoadMoreButton from '../components/LoadMoreButton';
+import useCursorList from '../utils/useCursorList';
 
 export default function AdminDashboard() {
   const navigate = useNavigate();
   const [stats, setStats] = useState(null);
-  const [allUsers, setAllUsers] = useState([]);
   const [topContributors, setTopContributors] = useState([]);
   const [deptStats, setDeptStats] = useState([]);
   const [reports, setReports] = useState([]);
@@ -26,14 +27,9 @@ export default function AdminDashboard() {
     }
   }, []);
 
-  const fetchUsers = useCallback(async () => {
-    try {
-      const response = await usersAPI.getUsers();
-      setAllUsers(response.data);
-    } catch (error) {
-      console.error('Failed to load users:', error);
-    }
-  }, []);
+  const {
+    items: allUsers, setItems: setAllUsers, loadingMore: usersLoadingMore, hasMore: hasMoreUsers, loadMore: loadMoreUsers,
+  } = useCursorList(usersAPI.getUsers);
 
   const fetchTopContributors = useCallback(async () => {
     try {
@@ -72,14 +68,14 @@ export default function AdminDashboard() {
   }, []);
 
   useEffect(() => {
-    Promise.all([fetchStats(), fetchUsers(), fetchTopContributors(), fetchDeptStats(), loadReports()]);
-  }, [fetchStats, fetchUsers, fetchTopContributors, fetchDeptStats, loadReports]);
+    Promise.all([fetchStats(), fetchTopContributors(), fetchDeptStats(), loadReports()]);
+  }, [fetchStats, fetchTopContributors, fetchDeptStats, loadReports]);
 
   const handleRoleChange = async (userId, newRole) => {
     if (window.confirm(`Are you sure you want to change the role of this user to ${newRole}?`)) {
       try {
         await adminAPI.updateUserRole(userId, newRole);
-        fetchUsers();
+        setAllUsers((users) => users.map((u) => (u.id === userId ? { ...u, role: newRole } : u)));
       } catch (error) {
         console.error('Failed to update user role:', error);
         alert('Failed to update user role.');
@@ -101,7 +97,7 @@ export default function AdminDashboard() {
     if (userToDelete) {
       try {
         await usersAPI.deleteUser(userToDelete.id);
-        fetchUsers();
+        setAllUsers((users) => users.filter((u) => u.id !== userToDelete.id));
         fetchStats();
         toast.success(`User "${userToDelete.name}" deleted successfully!`);
       } catch (error) {
@@ -445,6 +441,7 @@ export default function AdminDashboard() {
                 ))}
               </tbody>
             </table>
+            <LoadMoreButton hasMore={hasMoreUsers} loading={usersLoadingMore} onClick={loadMoreUsers} />
           </div>
         ) : (
           <p className="text-gray-500 dark:text-gray-400">No users found.</p>
@@ -4,14 +4,16 @@ import { shoutoutsAPI, usersAPI } from '../services/api';
 import { useLocation, useNavigate } from 'react-router-dom';
 import ShoutoutCard from '../components/ShoutoutCard';
 import CreateShoutout from '../components/CreateShoutout';
+import LoadMoreButton from '../components/LoadMoreButton';
+import useCursorList from '../utils/useCursorList';
 import toast from 'react-hot-toast';
 
 export default function Dashboard() {
-  const [shoutouts, setShoutouts] = useState([]);
   const [showCreateForm, setShowCreateForm] = useState(false);
   const [filters, setFilters] = useState({ department: '', senderId: '', startDate: '' });
-  const [loading, setLoading] = useState(true);
-  const [allUsers, setAllUsers] = useState([]);
+  const [senderName, setSenderName] = useState('');
+  const [senderSearch, setSenderSearch] = useState('');
+  const [senderOptions, setSenderOptions] = useState([]);
   const location = useLocation();
   const navigate = useNavigate();
   const [reportMessage, setReportMessage] = useState('');
@@ -22,37 +24,41 @@ export default function Dashboard() {
   const { highlightShoutoutId, highlightCommentId } = location.state || {};
 
   useEffect(() => {
-    const fetchUsers = async () => {
-      try {
-        const response = await usersAPI.getUsers();
-        setAllUsers(response.data);
-      } catch (error) {
-        console.error('Failed to fetch users for filter:', error);
-      }
+    if (!senderSearch.trim()) {
+      setSenderOptions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      usersAPI.searchDirectory(senderSearch, undefined, 8).then((response) => {
+        if (!cancelled) setSenderOptions(response.data);
+      }).catch((error) => console.error('Failed to search colleagues:', error));
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
     };
-    fetchUsers();
-  }, []);
+  }, [senderSearch]);
 
-  const loadShoutouts = useCallback(async () => {
-    setLoading(true);
-    try {
-      const params = {};
-      if (filters.department) params.department = filters.department;
-      if (filters.senderId) params.sender_id = filters.senderId;
-      if (filters.startDate) params.start_date = filters.startDate;
-      
-      const response = await shoutoutsAPI.getAll(params);
-      setShoutouts(response.data);
-    } catch (error) {
-      console.error('Failed to load shout-outs:', error);
-    } finally {
-      setLoading(false);
-    }
-  }, [filters]);
+  const selectSender = (sender) => {
+    setFilters({ ...filters, senderId: sender ? String(sender.id) : '' });
+    setSenderName(sender ? sender.name : '');
+    setSenderSearch('');
+  };
 
-  useEffect(() => {
-    loadShoutouts();
-  }, [filters, location.search, loadShoutouts]);
+  // location.search is a dependency so navigating back here reloads the feed.
+  const fetchShoutouts = useCallback((page) => {
+    const params = { ...page };
+    if (filters.department) params.department = filters.department;
+    if (filters.senderId) params.sender_id = filters.senderId;
+    if (filters.startDate) params.start_date = filters.startDate;
+    return shoutoutsAPI.getAll(params);
+  }, [filters, location.search]);
+
+  const {
+    items: shoutouts, setItems: setShoutouts, loading, loadingMore, hasMore, loadMore,
+    reload: loadShoutouts, refreshItem,
+  } = useCursorList(fetchShoutouts, { fetchItem: shoutoutsAPI.getById });
 
   useEffect(() => {
     if (!shoutouts || shoutouts.length === 0) return;
@@ -208,18 +214,39 @@ export default function Dashboard() {
               <label className="block text-sm font-medium text-gray-700 mb-1 dark:text-gray-300">
                 Colleauges
               </label>
-              <select
-                value={filters.senderId}
-                onChange={(e) => setFilters({ ...filters, senderId: e.target.value })}
-                className="w-full px-4 py-2 border border-gray-300 rounded-md focus:ring-2 focus:ring-purple-500 focus:border-transparent dark:bg-gray-700 dark:border-gray-600 dark:text-gray-100"
-              >
-                <option value="">All Colleauges</option>
-                {allUsers.map((u) => (
-                  <option key={u.id} value={u.id}>
-                    {u.name}
-                  </option>
-                ))}
-              </select>
+              {filters.senderId ? (
+                <div className="w-full px-4 py-2 border border-gray-300 rounded-md flex items-center justify-between dark:bg-gray-700 dark:border-gray-600 dark:text-gray-100">
+                  <span>{senderName}</span>
+                  <button onClick={() => selectSender(null)} className="text-gray-500 hover:text-gray-700 dark:text-gray-400 dark:hover:text-gray-200">
+                    &times;
+                  </button>
+                </div>
+              ) : (
+                <div className="relative">
+                  <input
+                    type="text"
+                    value={senderSearch}
+                    onChange={(e) => setSenderSearch(e.target.value)}
+                    placeholder="All Colleauges"
+                    className="w-full px-4 py-2 border border-gray-300 rounded-md focus:ring-2 focus:ring-purple-500 focus:border-transparent dark:bg-gray-700 dark:border-gray-600 dark:text-gray-100"
+                  />
+                  {senderOptions.length > 0 && (
+                    <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-300 rounded-md shadow-lg max-h-60 overflow-y-auto dark:bg-gray-700 dark:border-gray-600">
+                      {senderOptions.map((u) => (
+                        <li key={u.id}>
+                          <button
+                            onClick={() => selectSender(u)}
+                            className="w-full text-left px-4 py-2 hover:bg-purple-50 dark:text-gray-100 dark:hover:bg-gray-600"
+                          >
+                            {u.name}
+                            {u.department && <span className="ml-2 text-sm text-gray-500 dark:text-gray-400">{u.department}</span>}
+                          </button>
+                        </li>
+                      ))}
+                    </ul>
+                  )}
+                </div>
+              )}
             </div>
             <div>
               <label className="block text-sm font-medium text-gray-700 mb-1 dark:text-gray-300">
@@ -250,11 +277,12 @@ export default function Dashboard() {
               <ShoutoutCard
                 key={shoutout.id}
                 shoutout={shoutout}
-                onUpdate={loadShoutouts}
+                onUpdate={() => refreshItem(shoutout.id)}
                 onDelete={openDeleteModal}
                 onReport={handleReport}
               />
             ))}
+            <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
           </div>
         )}
       </div>
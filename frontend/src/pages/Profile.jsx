@@ -2,14 +2,14 @@ import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { usersAPI, shoutoutsAPI } from '../services/api'; // Added shoutoutsAPI
 import ShoutoutCard from '../components/ShoutoutCard';
+import LoadMoreButton from '../components/LoadMoreButton';
+import useCursorList from '../utils/useCursorList';
 import { FaPencilAlt } from 'react-icons/fa';
 import TaggedMe from './TaggedMe';
 import toast from 'react-hot-toast'; // Added toast
 
 const Profile = () => {
   const { user, setUser, token, setToken } = useAuth();
-  const [shoutouts, setShoutouts] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [isEditModalOpen, setIsEditModalOpen] = useState(false);
   const [isDeleteModalOpen, setIsDeleteModalOpen] = useState(false); // New state for delete modal
   const [shoutoutToDelete, setShoutoutToDelete] = useState(null); // New state for shoutout to delete
@@ -23,17 +23,11 @@ const Profile = () => {
   const fileInputRef = useRef(null);
   const [activeTab, setActiveTab] = useState('my-shoutouts');
 
-  const loadMyShoutouts = useCallback(async () => {
-    setLoading(true);
-    try {
-      const response = await usersAPI.getMyShoutouts();
-      setShoutouts(response.data);
-    } catch (error) {
-      console.error('Failed to load my shout-outs:', error);
-    } finally {
-      setLoading(false);
-    }
-  }, []);
+  // Reloads when the user changes, e.g. after a profile edit renames them.
+  const fetchMyShoutouts = useCallback((page) => usersAPI.getMyShoutouts(page), [user]);
+  const {
+    items: shoutouts, setItems: setShoutouts, loading, loadingMore, hasMore, loadMore, refreshItem,
+  } = useCursorList(fetchMyShoutouts, { fetchItem: shoutoutsAPI.getById });
 
   useEffect(() => {
     if (user) {
@@ -44,11 +38,8 @@ const Profile = () => {
         new_password: '',
         confirm_password: '',
       });
-      if (activeTab === 'my-shoutouts') {
-        loadMyShoutouts();
-      }
     }
-  }, [user, activeTab, loadMyShoutouts]);
+  }, [user]);
 
   const handleUpdateProfile = async (e) => {
     e.preventDefault();
@@ -239,11 +230,12 @@ const Profile = () => {
                   <ShoutoutCard
                     key={shoutout.id}
                     shoutout={shoutout}
-                    onUpdate={loadMyShoutouts}
+                    onUpdate={() => refreshItem(shoutout.id)}
                     onDelete={openDeleteModal}
                     allowUserDelete={true}
                   />
                 ))}
+                <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
               </div>
             )
           ) : (
@@ -1,30 +1,13 @@
-import React, { useState, useEffect } from 'react';
-import { usersAPI } from '../services/api';
+import React from 'react';
+import { shoutoutsAPI, usersAPI } from '../services/api';
 import ShoutoutCard from '../components/ShoutoutCard';
+import LoadMoreButton from '../components/LoadMoreButton';
+import useCursorList from '../utils/useCursorList';
 
 const TaggedMe = () => {
-    const [shoutouts, setShoutouts] = useState([]);
-    const [loading, setLoading] = useState(true);
-
-    const fetchTaggedShoutouts = async () => {
-        setLoading(true);
-        try {
-            const response = await usersAPI.getTaggedShoutouts();
-            setShoutouts(response.data);
-        } catch (error) {
-            console.error('Failed to load tagged shoutouts:', error);
-        } finally {
-            setLoading(false);
-        }
-    };
-
-    useEffect(() => {
-        fetchTaggedShoutouts();
-    }, []);
-    
-    const handleUpdateShoutout = () => {
-        fetchTaggedShoutouts();
-    };
+    const {
+        items: shoutouts, loading, loadingMore, hasMore, loadMore, refreshItem,
+    } = useCursorList(usersAPI.getTaggedShoutouts, { fetchItem: shoutoutsAPI.getById });
 
     if (loading) {
         return <p>Loading...</p>;
@@ -41,9 +24,10 @@ const TaggedMe = () => {
                         <ShoutoutCard
                             key={shoutout.id}
                             shoutout={shoutout}
-                            onUpdate={handleUpdateShoutout}
+                            onUpdate={() => refreshItem(shoutout.id)}
                         />
                     ))}
+                    <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
                 </div>
             )}
         </div>
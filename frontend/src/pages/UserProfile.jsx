@@ -2,14 +2,14 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { useParams } from 'react-router-dom';
 import { shoutoutsAPI, usersAPI } from '../services/api';
 import ShoutoutCard from '../components/ShoutoutCard';
+import LoadMoreButton from '../components/LoadMoreButton';
+import useCursorList from '../utils/useCursorList';
 
 const UserProfile = () => {
   const { id } = useParams();
   // const { user: currentUser } = useAuth(); // Rename current user to avoid conflict
   const [profileUser, setProfileUser] = useState(null);
-  const [shoutouts, setShoutouts] = useState([]);
   const [loading, setLoading] = useState(true);
-  const [shoutoutsLoading, setShoutoutsLoading] = useState(true);
 
   useEffect(() => {
     const fetchUserProfile = async () => {
@@ -30,26 +30,10 @@ const UserProfile = () => {
     }
   }, [id]);
 
-  const loadUserShoutouts = useCallback(async () => {
-    if (!profileUser) return;
-
-    setShoutoutsLoading(true);
-    try {
-      const response = await shoutoutsAPI.getAll({ sender_id: profileUser.id });
-      const userShoutouts = response.data.filter(s => s.sender.id === profileUser.id);
-      setShoutouts(userShoutouts);
-    } catch (error) {
-      console.error('Failed to load user shout-outs:', error);
-    } finally {
-      setShoutoutsLoading(false);
-    }
-  }, [profileUser]);
-
-  useEffect(() => {
-    if (profileUser) {
-      loadUserShoutouts();
-    }
-  }, [profileUser, loadUserShoutouts]);
+  const fetchUserShoutouts = useCallback((page) => shoutoutsAPI.getAll({ ...page, sender_id: id }), [id]);
+  const {
+    items: shoutouts, setItems: setShoutouts, loading: shoutoutsLoading, loadingMore, hasMore, loadMore, refreshItem,
+  } = useCursorList(fetchUserShoutouts, { fetchItem: shoutoutsAPI.getById });
 
   const handleDelete = (shoutoutId) => {
     setShoutouts(shoutouts.filter((s) => s.id !== shoutoutId));
@@ -97,12 +81,13 @@ const UserProfile = () => {
                   <ShoutoutCard
                     key={shoutout.id}
                     shoutout={shoutout}
-                    onUpdate={() => loadUserShoutouts()}
+                    onUpdate={() => refreshItem(shoutout.id)}
                     onDelete={handleDelete}
                     allowUserDelete={true}
                   />
                 ))
               )}
+              <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
             </div>
           )}
         </div>
@@ -48,6 +48,10 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints return one page per request, with the cursor for the next
+// page in the X-Next-Cursor header; pass it back as `cursor` to continue
+// (see utils/useCursorList).
+
 export const authAPI = {
   register: (data) => api.post('/api/auth/register', data),
   login: (data) => api.post('/api/auth/login', data),
@@ -56,7 +60,9 @@ export const authAPI = {
 
 
 export const usersAPI = {
-  getUsers: (department) => api.get('/api/users', { params: { department } }),
+  getUsers: (params) => api.get('/api/users', { params }),
+  searchDirectory: (q, department, limit = 10) =>
+    api.get('/api/users/directory', { params: { q, department, limit } }),
   getUser: (id) => api.get(`/api/users/${id}`),
   updateMe: (data) => api.patch('/api/users/me', data),
   uploadProfilePicture: (data) =>
@@ -64,8 +70,8 @@ export const usersAPI = {
       headers: { 'Content-Type': 'multipart/form-data' },
     }),
   deleteProfilePicture: () => api.delete('/api/users/me/picture'),
-  getMyShoutouts: () => api.get('/api/users/me/shoutouts'),
-  getTaggedShoutouts: () => api.get('/api/users/me/tagged'),
+  getMyShoutouts: (params) => api.get('/api/users/me/shoutouts', { params }),
+  getTaggedShoutouts: (params) => api.get('/api/users/me/tagged', { params }),
   deleteUser: (id) => api.delete(`/api/users/${id}`),
 };
 
@@ -105,6 +111,7 @@ export const adminAPI = {
 
 export const notificationsAPI = {
   getNotifications: () => api.get('/api/notifications'),
+  getUnreadCount: () => api.get('/api/notifications/unread-count'),
   markNotificationRead: (id) => api.post(`/api/notifications/${id}/read`),
   markAllNotificationsRead: () =>
     api.post('/api/notifications/mark-all-read'),
@@ -0,0 +1,65 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+export const PAGE_SIZE = 20;
+
+// Loads the first page of a keyset-paginated list endpoint and appends the
+// next one on loadMore(), following the cursor from the X-Next-Cursor header.
+// fetchPage(params) receives { limit, cursor } and returns the axios response;
+// pass a memoized function, since a new one reloads from the first page.
+// fetchItem(id), when given, enables refreshItem(id) to re-fetch one row in
+// place instead of reloading every page.
+export default function useCursorList(fetchPage, { pageSize = PAGE_SIZE, fetchItem } = {}) {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Bumped by reload so a page requested for an older filter is dropped.
+  const generation = useRef(0);
+
+  const reload = useCallback(async () => {
+    const current = ++generation.current;
+    setLoading(true);
+    try {
+      const response = await fetchPage({ limit: pageSize });
+      if (current !== generation.current) return;
+      setItems(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Failed to load list:', error);
+    } finally {
+      if (current === generation.current) setLoading(false);
+    }
+  }, [fetchPage, pageSize]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    const current = generation.current;
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage({ limit: pageSize, cursor: nextCursor });
+      if (current !== generation.current) return;
+      setItems((prev) => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Failed to load more:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [fetchPage, pageSize, nextCursor, loadingMore]);
+
+  const refreshItem = useCallback(async (id) => {
+    if (!fetchItem) return reload();
+    try {
+      const response = await fetchItem(id);
+      setItems((prev) => prev.map((item) => (item.id === id ? response.data : item)));
+    } catch (error) {
+      console.error('Failed to refresh item:', error);
+    }
+  }, [fetchItem, reload]);
+
+  useEffect(() => {
+    reload();
+  }, [reload]);
+
+  return { items, setItems, loading, loadingMore, hasMore: Boolean(nextCursor), loadMore, reload, refreshItem };
+}
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# The app reads its configuration at import time, so point it at a throwaway
+# SQLite database before anything imports backend.
+_database = os.path.join(tempfile.mkdtemp(prefix="bragboard-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("SESSION_SECRET", "test-secret")
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "1000")
+os.environ.setdefault("SEARCH_BACKEND", "memory")
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    from backend.main import app
+    return TestClient(app)
@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from backend import models
+from backend.auth import create_access_token
+from backend.database import SessionLocal, async_engine, engine
+
+@contextmanager
+def count_queries():
+    counted = [0]
+
+    def before_cursor_execute(*args):
+        counted[0] += 1
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counted
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+def _seed_board(shoutouts: int):
+    db = SessionLocal()
+    try:
+        users = [
+            models.User(name=f"Feed User {i}", email=f"feed{i}@example.com", password="x", department=("Eng", "Ops")[i % 2])
+            for i in range(4)
+        ]
+        db.add_all(users)
+        db.flush()
+        for i in range(shoutouts):
+            sender = users[i % 4]
+            shoutout = models.ShoutOut(sender_id=sender.id, message=f"Thanks #{i}")
+            db.add(shoutout)
+            db.flush()
+            others = [user for user in users if user.id != sender.id]
+            db.add_all(models.ShoutOutRecipient(shoutout_id=shoutout.id, recipient_id=user.id) for user in others[:2])
+            db.add(models.Comment(shoutout_id=shoutout.id, user_id=others[0].id, content="Well deserved"))
+            db.add_all([
+                models.Reaction(shoutout_id=shoutout.id, user_id=others[0].id, type=models.ReactionType.like),
+                models.Reaction(shoutout_id=shoutout.id, user_id=others[1].id, type=models.ReactionType.clap),
+            ])
+            shoutout.like_count, shoutout.clap_count, shoutout.comment_count = 1, 1, 1
+        db.commit()
+        return users[0].email
+    finally:
+        db.close()
+
+def test_feed_query_count_does_not_grow_with_page_size(client):
+    email = _seed_board(20)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    # Warm the per-process user cache so every measured request is alike.
+    assert client.get("/api/shoutouts?limit=2", headers=headers).status_code == 200
+
+    counts = {}
+    for size in (1, 5, 20):
+        with count_queries() as counted:
+            response = client.get(f"/api/shoutouts?limit={size}", headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) == size
+        assert all(len(item["recipients"]) == 2 and len(item["comments"]) == 1 for item in page)
+        counts[size] = counted[0]
+
+    assert counts[1] == counts[5] == counts[20], counts
@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine, inspect
+from backend import models  # noqa: F401 - registers the tables on Base
+from backend.migrations import upgrade_schema
+
+# The notifications table as created before the outbox existed.
+OLD_NOTIFICATIONS = """
+CREATE TABLE notifications (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    type VARCHAR(13) NOT NULL,
+    message TEXT NOT NULL,
+    shoutout_id INTEGER REFERENCES shoutouts (id),
+    is_read BOOLEAN NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+)
+"""
+
+def test_upgrade_adds_missing_columns_and_indexes_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(OLD_NOTIFICATIONS)
+
+    applied = upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert "event_id" in {column["name"] for column in inspector.get_columns("notifications")}
+    unique = {index["name"]: index for index in inspector.get_indexes("notifications")}["uq_notifications_event_user"]
+    assert unique["unique"] and unique["column_names"] == ["event_id", "user_id"]
+    assert any(sql.startswith("ALTER TABLE notifications ADD COLUMN event_id") for sql in applied)
+    assert upgrade_schema(engine) == []
@@ -0,0 +1,82 @@
+from datetime import datetime
+from sqlalchemy import event, text
+from backend import models
+from backend.database import SessionLocal, engine
+from backend.migrations import upgrade_schema
+from backend.pagination import paginate
+
+COLUMNS = (models.ShoutOut.created_at, models.ShoutOut.id)
+
+def _sender(db, email):
+    user = models.User(name="Pager", email=email, password="x", department="Eng")
+    db.add(user)
+    db.flush()
+    return user
+
+def _walk(db, sender_id, limit):
+    query = db.query(models.ShoutOut).filter(models.ShoutOut.sender_id == sender_id)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(query, COLUMNS, cursor, limit, key=lambda r: (r.created_at, r.id))
+        seen += [row.id for row in rows]
+        if not cursor:
+            return seen
+
+def test_pages_through_rows_sharing_a_timestamp(client):
+    db = SessionLocal()
+    try:
+        sender = _sender(db, "pager-same-second@example.com")
+        same_second = datetime(2025, 3, 1, 12, 0, 0)
+        shoutouts = [models.ShoutOut(sender_id=sender.id, message=str(i), created_at=same_second) for i in range(5)]
+        shoutouts.append(models.ShoutOut(sender_id=sender.id, message="earlier", created_at=datetime(2025, 3, 1, 11, 59, 59, 500000)))
+        db.add_all(shoutouts)
+        db.commit()
+
+        assert _walk(db, sender.id, 2) == [s.id for s in reversed(shoutouts[:5])] + [shoutouts[5].id]
+    finally:
+        db.close()
+
+def test_pages_through_legacy_timestamps_after_upgrade(client):
+    db = SessionLocal()
+    try:
+        sender = _sender(db, "pager-legacy@example.com")
+        db.commit()
+        # Rows written by the CURRENT_TIMESTAMP server default, without a fraction.
+        for i, stamp in enumerate(["2025-04-01 09:00:00", "2025-04-01 09:00:00", "2025-04-01 09:00:01"]):
+            db.execute(
+                text("INSERT INTO shoutouts (sender_id, message, created_at) VALUES (:sender, :message, :stamp)"),
+                {"sender": sender.id, "message": f"legacy {i}", "stamp": stamp},
+            )
+        db.commit()
+        ids = [id for (id,) in db.execute(
+            text("SELECT id FROM shoutouts WHERE sender_id = :sender ORDER BY id"), {"sender": sender.id}
+        )]
+
+        upgrade_schema(engine)
+
+        stored = db.execute(text("SELECT DISTINCT length(created_at) FROM shoutouts")).scalars().all()
+        assert stored == [26]
+        assert _walk(db, sender.id, 1) == [ids[2], ids[1], ids[0]]
+    finally:
+        db.close()
+
+def test_cursor_predicate_seeks_the_index(client):
+    db = SessionLocal()
+    try:
+        query = db.query(models.ShoutOut)
+        _, cursor = paginate(query, COLUMNS, None, 1, key=lambda r: (r.created_at, r.id))
+        executed = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            executed.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            paginate(query, COLUMNS, cursor, 1, key=lambda r: (r.created_at, r.id))
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = executed[-1]
+        plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        assert "SEARCH shoutouts USING INDEX ix_shoutouts_created_at_id (created_at<?)" in plan
+    finally:
+        db.close()
@@ -0,0 +1,60 @@
+from backend import models
+from backend.auth import create_access_token
+from backend.database import SessionLocal
+
+def _headers(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+def _add_user(db, name: str, role: models.UserRole = models.UserRole.employee) -> models.User:
+    user = models.User(name=name, email=f"{name.lower().replace(' ', '.')}@reports.example.com",
+                       password="x", department="Eng", role=role)
+    db.add(user)
+    return user
+
+def test_comment_reports_are_their_own_target(client):
+    db = SessionLocal()
+    try:
+        admin = _add_user(db, "Report Admin", models.UserRole.admin)
+        sender, commenter, reporter = (_add_user(db, name) for name in ("Report Sender", "Report Commenter", "Reporter"))
+        db.flush()
+        shoutout = models.ShoutOut(sender_id=sender.id, message="Great launch")
+        db.add(shoutout)
+        db.flush()
+        db.add(models.ShoutOutRecipient(shoutout_id=shoutout.id, recipient_id=commenter.id))
+        comment = models.Comment(shoutout_id=shoutout.id, user_id=commenter.id, content="Meh")
+        db.add(comment)
+        db.commit()
+        admin_email, reporter_email = admin.email, reporter.email
+        shoutout_id, comment_id = shoutout.id, comment.id
+    finally:
+        db.close()
+
+    # The UI sends the shout-out id along with the comment id.
+    reporter_headers = _headers(reporter_email)
+    for body in (
+        {"shoutout_id": shoutout_id, "reason": "spam"},
+        {"shoutout_id": shoutout_id, "comment_id": comment_id, "reason": "rude"},
+        {"shoutout_id": shoutout_id, "comment_id": comment_id, "reason": "still rude"},
+    ):
+        assert client.post("/api/reports", json=body, headers=reporter_headers).status_code == 201
+
+    admin_headers = _headers(admin_email)
+    comments = client.get("/api/admin/reports?target_type=comment", headers=admin_headers).json()
+    assert [r["reason"] for r in comments] == ["still rude", "rude"]
+    assert {(r["target_type"], r["target_user_name"]) for r in comments} == {("comment", "Report Commenter")}
+
+    shoutouts = client.get("/api/admin/reports?target_type=shoutout", headers=admin_headers).json()
+    assert [(r["reason"], r["target_type"], r["target_user_name"]) for r in shoutouts] == [
+        ("spam", "shoutout", "Report Sender")
+    ]
+
+    groups = client.get("/api/admin/reports?group_by_target=true", headers=admin_headers).json()
+    by_target = {(g["target_type"], g["shoutout_id"], g["comment_id"]): g for g in groups}
+    assert by_target.keys() == {("comment", shoutout_id, comment_id), ("shoutout", shoutout_id, None)}
+    assert by_target[("comment", shoutout_id, comment_id)]["report_count"] == 2
+    assert by_target[("comment", shoutout_id, comment_id)]["target_user_name"] == "Report Commenter"
+    assert by_target[("shoutout", shoutout_id, None)]["report_count"] == 1
+    assert by_target[("shoutout", shoutout_id, None)]["target_user_name"] == "Report Sender"
+
+    comment_groups = client.get("/api/admin/reports?group_by_target=true&target_type=comment", headers=admin_headers).json()
+    assert [(g["comment_id"], g["report_count"]) for g in comment_groups] == [(comment_id, 2)]
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from backend import models
+from backend.auth import create_access_token
+from backend.database import SessionLocal, engine
+from backend.rollups import MAX_WINDOW_DAYS, department_totals, rebuild_rollups, resolve_window, rollup_state
+
+def test_resolve_window_accepts_ranges_up_to_the_limit():
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=MAX_WINDOW_DAYS - 1)
+    assert resolve_window(None, start, end) == (start, end)
+
+def test_resolve_window_rejects_longer_ranges():
+    start = date(2025, 1, 1)
+    with pytest.raises(HTTPException) as raised:
+        resolve_window(None, start, start + timedelta(days=MAX_WINDOW_DAYS))
+    assert raised.value.status_code == 400
+
+def test_resolve_window_limit_can_be_lifted():
+    assert resolve_window(None, date(1, 1, 1), date(2025, 1, 1), max_days=None) == (date(1, 1, 1), date(2025, 1, 1))
+
+def test_admin_stats_rejects_unbounded_start_date(client):
+    db = SessionLocal()
+    try:
+        db.add(models.User(name="Range Admin", email="range-admin@example.com", password="x",
+                           department="Ops", role=models.UserRole.admin))
+        db.commit()
+    finally:
+        db.close()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'range-admin@example.com'})}"}
+
+    response = client.get("/api/admin/stats?start_date=0001-01-01", headers=headers)
+    assert response.status_code == 400
+    assert client.get("/api/admin/stats?window=30d", headers=headers).status_code == 200
+
+def test_department_totals_follow_writes_and_rebuild(client):
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        before = rollup_state(db)
+    finally:
+        db.close()
+
+    registered = client.post("/api/auth/register", json={
+        "name": "Rollup Sender", "email": "rollup-sender@example.com", "password": "secret", "department": "Rollup QA",
+    })
+    assert registered.status_code == 201
+    recipient = client.post("/api/auth/register", json={
+        "name": "Rollup Recipient", "email": "rollup-recipient@example.com", "password": "secret", "department": "Ops",
+    }).json()["user"]
+    headers = {"Authorization": f"Bearer {registered.json()['access_token']}"}
+    created = client.post("/api/shoutouts", json={"message": "Thanks", "recipient_ids": [recipient["id"]]}, headers=headers)
+    assert created.status_code == 201
+
+    db = SessionLocal()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    try:
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            after = rollup_state(db)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert (after.total_users, after.total_shoutouts) == (before.total_users + 2, before.total_shoutouts + 1)
+        assert after.updated_at > before.updated_at
+        # Only the per-department rows and the rebuild marker are read.
+        assert not any("FROM users" in sql or "FROM shoutouts" in sql for sql in statements)
+        assert ("Rollup QA", 1) in department_totals(db)
+
+        rebuilt = rebuild_rollups(db)
+        assert (rebuilt.total_users, rebuilt.total_shoutouts) == (after.total_users, after.total_shoutouts)
+    finally:
+        db.close()
@@ -0,0 +1,23 @@
+from backend.images import MAX_UPLOAD_BYTES, MULTIPART_OVERHEAD_BYTES
+
+PICTURE_URL = "/api/users/me/picture"
+
+def test_declared_oversized_upload_is_rejected_before_parsing(client):
+    # Nothing is sent beyond the headers; the declared length alone is enough.
+    response = client.post(
+        PICTURE_URL,
+        content=b"",
+        headers={"Content-Length": str(MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES + 1),
+                 "Content-Type": "multipart/form-data; boundary=x"},
+    )
+    assert response.status_code == 413
+
+def test_chunked_upload_is_cut_off_at_the_limit(client):
+    def body():
+        chunk = b"x" * (1024 * 1024)
+        for _ in range((MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES) // len(chunk) + 4):
+            yield chunk
+
+    response = client.post(PICTURE_URL, content=body(), headers={"Content-Type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
+    assert "at most" in response.json()["detail"]